@@ -0,0 +1,142 @@
+"""
+分析提示词与模型配置
+
+桌面应用的 AnalysisWorker 和批量匹配引擎使用同一份提示词，保证打分口径一致。
+
+提示词由 PromptTemplate 按“从不变到常变”的顺序拼接：系统角色和评分规则（所有请求相同）
+在最前，然后是岗位信息（同一岗位的所有请求相同），简历信息放在最后。DeepSeek 的上下文
+硬盘缓存按请求前缀命中，批量筛选同一岗位的简历时，只有简历部分需要重新计算；命中的
+token 数由响应的 usage.prompt_cache_hit_tokens 返回（见 usage_stats.py）。
+"""
+import hashlib
+
+# 系统角色
+SYSTEM_PROMPT = "你是一个专业的技术招聘专家，精通各类编程语言和技术栈，擅长评估工程师简历与技术岗位的匹配度。"
+
+# 界面上的模型名称 -> DeepSeek API 模型名称
+MODEL_MAP = {
+    "DeepSeek R1": "deepseek-reasoner",
+    "DeepSeek V3": "deepseek-chat",
+}
+
+def resolve_model(model_name):
+    """将界面模型名称转换为API模型名称"""
+    return MODEL_MAP.get(model_name, "deepseek-chat")
+
+
+# 评分规则：所有请求完全相同，放在提示词最前面
+SCORING_RUBRIC = """\
+请详细分析以下岗位信息和简历信息的匹配程度，特别注重以下内容：
+
+1. 核心技术栈匹配度：
+   - 重点关注岗位所需的关键技术和工具
+   - 只要简历中提及了相关技术即可，不要求详细展开
+   - 考虑替代性技术和可迁移技能
+
+2. 职位方向匹配性：
+   - 评估候选人过往工作方向与目标职位的匹配度
+   - 区分相似技术栈但不同职位方向（如DevOps vs SRE，自动化运维 vs 云计算平台工程师）
+   - 考虑岗位实际工作内容、项目职责与候选人经验的一致性
+   - 评分修正规则：如果最近2-3年在知名公司（大厂、行业有影响力的公司、知名的初创企业、公认技术能力强的企业等）具有高匹配工作经验，则对扣分进行60%的衰减。例如：如果原始评分为100-20=80分，修正后为100-(20*0.6)=88分
+
+3. 相关经验时间线分析：
+   - 请分别分析候选人职业生涯中的每一段工作经历，判断每段经历与目标岗位的相关性
+   - 对每段经历单独标注为"高度相关"、"部分相关"或"不相关"
+   - 计算相关经验（高度相关+部分相关）占总工作经验的百分比
+   - 考虑相关经验在时间线上的位置：
+     * 如果最近的经历相关性高，这是有利因素
+     * 如果最近的经历不相关，但早期有相关经历，这是不利因素
+     * 如果早期经历不相关，需要额外减分（支付"不相关经验成本"）
+   - 评分修正规则：如果最近2-3年在知名公司具有高匹配工作经验，则对扣分进行60%的衰减。例如：如果原始评分为100-20=80分，修正后为100-(20*0.6)=88分
+
+4. 项目复杂度和难度：
+   - 评估简历中项目的复杂程度
+   - 如果使用相同技术，更复杂、难度更高的项目应当获得更高评分
+   - 考虑项目规模、挑战性和完成的职责
+
+5. 专业能力评估：
+   - 关注核心专业技能而非次要或辅助技能
+   - 对于简历书写不够详细但方向匹配的情况给予适当容忍
+
+分析输出格式：
+1. 首先列出候选人的工作经历时间线，并对每段经历的相关性进行明确判断
+2. 计算相关经验占比及其在时间线上的分布
+3. 给出核心技术栈匹配度评分(0-100)
+4. 给出职位方向匹配性评分(0-100)
+5. 给出相关经验时间线评分(0-100)
+6. 给出项目复杂度和专业能力匹配评分(0-100)
+7. 根据以上各项计算总体匹配分数(0-100)
+
+最终推荐：
+1. 明确表明这位候选人是否适合进一步推进（面试/下一轮），使用明确的推荐级别标记：
+   - 【强烈推荐】- 95分及以上，非常适合，应立即安排面试
+   - 【推荐】- 80-94分，适合，值得进一步考虑
+   - 【中性/待定】- 60-79分，存在疑问点，需要更多信息
+   - 【不推荐】- 40-59分，不太适合，但可能有部分相关背景
+   - 【完全不推荐】- 低于40分，明显不合适，方向错误
+2. 如果不推荐推进或匹配度较低，请用非技术人员(HR/猎头)能理解的语言说明方向偏差
+3. 提供1-2句建议，帮助招聘人员进一步搜寻更合适的候选人
+
+==============================================
+推荐给客户的评语（独立部分，且仅在评分80分以上触发）：
+请单独提供一段不超过6点的正面评价，每点评价大于20字避免过于精简，用于向客户推荐候选人。这部分评价应该：
+1. 完全独立于上述分析结果
+2. 以正面信息为主
+3. 包括以下方面（如果适用）：
+   a. 学历优势
+   b. 知名公司工作经验（如果工作方向高度匹配）
+   c. 技术栈匹配性（针对岗位要求的技术栈）
+   d. 其他优势
+4. 即使候选人在其他方面存在不足，这部分评价也应聚焦于其优势，除非不足的地方可以自圆其说且很容易被企业方接受，否则不要冒险提出不足之处。
+
+==============================================
+评分汇总（放在回答的最后）：
+用一个 JSON 代码块汇总上述评分，数值为 0-100 的数字，推荐级别为上面五个级别之一（不含括号），不要添加注释：
+```json
+{"相关经验占比": 0, "核心技术栈匹配度": 0, "职位方向匹配性": 0, "相关经验时间线": 0, "项目复杂度和专业能力": 0, "总体匹配分数": 0, "推荐级别": "推荐"}
+```
+"""
+
+
+class PromptTemplate:
+    """
+    提示词模板：消息按稳定程度排列，前缀在同一岗位的请求之间保持逐字节一致
+
+    system: 系统角色
+    user:   评分规则 → 岗位信息 → 简历信息
+    """
+    def __init__(self, system_prompt, rubric, job_heading="岗位信息：", resume_heading="简历信息：",
+                 separator="=" * 46):
+        self.system_prompt = system_prompt
+        self.rubric = rubric.strip()
+        self.separator = separator
+        self.job_heading = job_heading
+        self.resume_heading = resume_heading
+
+    def build_user_prompt(self, job_info, resume_info):
+        """用户消息：评分规则在前，岗位其次，简历最后；首尾空白去掉，避免无意义的差异打断前缀"""
+        return (
+            f"{self.rubric}\n\n{self.separator}\n"
+            f"{self.job_heading}\n{job_info.strip()}\n\n"
+            f"{self.resume_heading}\n{resume_info.strip()}\n"
+        )
+
+    def build_messages(self, job_info, resume_info):
+        """构建发送给 chat.completions 的消息列表"""
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": self.build_user_prompt(job_info, resume_info)}
+        ]
+
+    @property
+    def version(self):
+        """根据模板内容计算版本号，模板一改结果缓存即自动失效"""
+        template = self.system_prompt + self.build_user_prompt("{job_info}", "{resume_info}")
+        return hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
+
+
+# 桌面应用和批量引擎共用的提示词（经 token_budget.PromptBudgeter.fit 构建消息）
+DEFAULT_TEMPLATE = PromptTemplate(SYSTEM_PROMPT, SCORING_RUBRIC)
+
+# 提示词模板版本
+PROMPT_VERSION = DEFAULT_TEMPLATE.version
@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""
+批量匹配引擎：用一个岗位描述批量分析一个文件夹（或通配符）下的全部简历
+
+用法示例:
+    python batch_matcher.py job.txt ./resumes -o results.jsonl --concurrency 16
+    python batch_matcher.py job.pdf "./resumes/**/*.pdf" --model "DeepSeek V3"
+
+每份简历输出一行 JSON 结果，边分析边写入，中途中断也不会丢失已完成的结果。
+
+简历很多时可以先做本地预筛选，只把最相关的简历交给大模型：
+    python batch_matcher.py job.txt ./resumes --prefilter-top-k 50
+    python batch_matcher.py job.txt ./resumes --prefilter-min-score 0.2
+
+简历来源是单个表格文件（xlsx/xls/csv，如猎头导出的候选人名单）时，每行作为一位候选人
+单独分析，边读取边分析，几千行的文件内存占用也不随行数增长：
+    python batch_matcher.py job.txt candidates.xlsx -o results.jsonl
+
+同一份简历的多个副本（不同渠道重复投递、PDF 和 Word 两个版本）只分析一次：其余副本
+标记为 duplicate 并复用第一份的结果（见 resume_dedup.py），--no-dedup 关闭。
+"""
+import os
+import sys
+import json
+import glob
+import time
+import queue
+import asyncio
+import argparse
+import functools
+import concurrent.futures
+
+from document_reader import (
+    extraction_cache, file_cache_key, get_extractor, get_process_pool, is_spreadsheet, iter_spreadsheet_records,
+    read_document, record_id, set_extraction_store, supported_extensions
+)
+from extraction_store import ExtractionStore
+from analysis_prompt import MODEL_MAP, resolve_model
+from deepseek_client import (
+    DEFAULT_POOL_CONFIG, ApiKeyValidator, configure_client_pool, get_client_pool, get_key_validator
+)
+from prefilter import DEFAULT_SKILL_WEIGHT, score_resumes, shortlist
+from result_cache import ResultCache
+from result_parser import parse_scores
+from result_store import ResultStore, format_score
+from resume_index import open_resume_index
+from resume_dedup import DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD, DuplicateIndex, normalize_resume
+from progress_tracker import BatchProgress, LatencyModel
+from usage_stats import USAGE_FIELDS, UsageStats, format_cache_usage, format_token_estimate
+from token_budget import DEFAULT_BUDGET_CONFIG, configure_prompt_budget, get_prompt_budgeter
+from request_scheduler import (
+    PRIORITY_BATCH, configure_request_scheduler, estimate_request_tokens, get_request_scheduler
+)
+
+# 默认同时进行中的请求数
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+def iter_resume_records(spreadsheet_path):
+    """表格中的候选人：逐行产出 (标识, 记录文本)，标识如 candidates.xlsx#Sheet1!12"""
+    get_extractor(spreadsheet_path)
+    for sheet_name, row_number, text in iter_spreadsheet_records(spreadsheet_path):
+        yield record_id(spreadsheet_path, sheet_name, row_number), text
+
+
+def collect_resume_files(source):
+    """收集简历文件：支持单个文件、目录（递归）或通配符"""
+    extensions = supported_extensions()
+    if os.path.isfile(source):
+        return [source]
+
+    if os.path.isdir(source):
+        files = []
+        for root, _, names in os.walk(source):
+            for name in names:
+                if os.path.splitext(name)[1].lower() in extensions:
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+
+    return sorted(
+        path for path in glob.glob(source, recursive=True)
+        if os.path.isfile(path) and os.path.splitext(path)[1].lower() in extensions
+    )
+
+
+class BatchMatcher:
+    """批量匹配引擎，在共享事件循环上以有界并发调用 DeepSeek"""
+    def __init__(self, api_key, model_name="DeepSeek R1", max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+                 client_pool=None, result_cache=None, force_refresh=False, latency_model=None, result_store=None,
+                 usage_stats=None, prefilter_top_k=None, prefilter_min_score=None,
+                 prefilter_skill_weight=DEFAULT_SKILL_WEIGHT, resume_index=None, dedup_index=None,
+                 extraction_store=None):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight 必须大于 0")
+
+        self.api_key = api_key
+        self.model_name = model_name
+        self.model = resolve_model(model_name)
+        self.max_in_flight = max_in_flight
+        # 所有并发请求共用进程级连接池
+        self.client_pool = client_pool or get_client_pool()
+        self.result_cache = result_cache
+        self.force_refresh = force_refresh
+        self.result_store = result_store
+        # 简历库：提取出的简历同时加入倒排索引
+        self.resume_index = resume_index
+        self.usage_stats = usage_stats or UsageStats()
+        self.latency_model = latency_model or LatencyModel()
+        # 本地预筛选：都为 None 时所有简历都交给大模型分析
+        self.prefilter_top_k = prefilter_top_k
+        self.prefilter_min_score = prefilter_min_score
+        self.prefilter_skill_weight = prefilter_skill_weight
+        self.key_validator = ApiKeyValidator(client_pool) if client_pool else get_key_validator()
+        # 近似重复检测（resume_dedup.DuplicateIndex），为 None 时每份简历都单独分析
+        self.dedup_index = dedup_index
+        # 持久化的提取缓存（extraction_store.ExtractionStore）：再次运行时不必重新解析同样的文件
+        self.extraction_store = extraction_store
+        # 本次运行中各简历的结果（future），重复的简历等待并复用代表的结果
+        self._run_results = {}
+        self._future = None
+
+    async def analyze(self, job_info, resume_info):
+        """分析单份简历，返回 (模型输出的原始文本, token 用量, 提示词预算)"""
+        start_time = time.monotonic()
+        # 本地统计 token 数，超出预算的岗位 / 简历先压缩、截断
+        messages, budget = get_prompt_budgeter().fit(job_info, resume_info)
+        estimate = self.latency_model.estimate(self.model)
+        # 批量任务走低优先级通道，界面上的交互式分析可以插队
+        response = await get_request_scheduler().call(
+            lambda: self.client_pool.chat(
+                self.api_key,
+                self.model,
+                messages,
+                stream=False
+            ),
+            self.model,
+            estimate_request_tokens(messages, int(estimate["output_tokens"]), budget["prompt_tokens"]),
+            PRIORITY_BATCH
+        )
+        # 记录本次耗时，用于估计剩余时间
+        self.latency_model.record(
+            self.model,
+            time.monotonic() - start_time,
+            output_tokens=response.usage.completion_tokens if response.usage else None
+        )
+        usage = self.usage_stats.record(self.model, response.usage, budget["prompt_tokens"])
+        return response.choices[0].message.content, usage, budget
+
+    async def extract(self, resume_path):
+        """提取简历文本：先查进程内和持久化的提取缓存，未命中时交给进程池解析，多个文件可同时占满所有CPU核心"""
+        loop = asyncio.get_running_loop()
+        cache_key = file_cache_key(resume_path)
+        text = extraction_cache.get(cache_key)
+        if text is None:
+            store_key = None
+            if self.extraction_store is not None:
+                store_key, text = await loop.run_in_executor(None, self._stored_extraction, resume_path)
+            if text is None:
+                text = await loop.run_in_executor(
+                    get_process_pool(),
+                    functools.partial(read_document, resume_path, parallel=False, use_cache=False)
+                )
+                if store_key is not None:
+                    await loop.run_in_executor(None, self._store_extraction, store_key, text)
+            extraction_cache.put(cache_key, text)
+        if self.resume_index is not None:
+            # 分词、计算向量和写入 SQLite 都在线程池中进行，不阻塞事件循环上进行中的请求
+            await loop.run_in_executor(None, self._add_to_index, resume_path, text)
+        return text
+
+    def _add_to_index(self, resume_path, text):
+        try:
+            self.resume_index.add(resume_path, text)
+        except Exception as e:
+            print(f"加入简历库失败 {resume_path}: {str(e)}", file=sys.stderr)
+
+    def _stored_extraction(self, resume_path):
+        """在持久化提取缓存中查找，返回 (缓存键, 文本或 None)；缓存出错时当作未命中，重新提取"""
+        try:
+            key = self.extraction_store.key(resume_path)
+            return key, self.extraction_store.get(key)
+        except Exception as e:
+            print(f"读取提取缓存失败 {resume_path}: {str(e)}", file=sys.stderr)
+            return None, None
+
+    def _store_extraction(self, key, text):
+        try:
+            self.extraction_store.put(key, text)
+        except Exception as e:
+            print(f"写入提取缓存失败: {str(e)}", file=sys.stderr)
+
+    def _new_result(self, resume_path):
+        return {
+            "resume": resume_path,
+            "model": self.model_name,
+            "status": "ok",
+            "result": None,
+            "error": None,
+            "cached": False,
+            "scores": None,
+            "usage": None,
+            "budget": None,
+            "prefilter": None,
+            "duplicate_of": None,
+        }
+
+    @staticmethod
+    async def _wait_yielding(future, slot):
+        """
+        等待 future 完成，期间让出调用方持有的并发名额（slot 为 asyncio.Semaphore 或 None），返回前重新取得
+
+        重新取得名额的等待被 shield 保护：即使此时被取消，名额最终也会取得，与调用方退出时的释放抵消。
+        """
+        if slot is None:
+            return await asyncio.shield(future)
+        slot.release()
+        try:
+            return await asyncio.shield(future)
+        finally:
+            await asyncio.shield(slot.acquire())
+
+    async def _process(self, job_info, resume_path, resume_info=None, prefilter=None, slot=None):
+        """
+        提取并分析单个简历文件，异常记录在结果中而不是向上抛出
+
+        slot: 调用方为这一份简历占用的并发名额（asyncio.Semaphore），等待同组重复简历的结果时暂时让出
+        """
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        result = self._new_result(resume_path)
+        result["prefilter"] = prefilter
+        key = os.path.abspath(resume_path)
+        done = None
+        if self.dedup_index is not None:
+            done = loop.create_future()
+            self._run_results[key] = done
+        try:
+            if resume_info is None:
+                resume_info = await self.extract(resume_path)
+            resume_info = normalize_resume(resume_info)
+            if not resume_info.strip():
+                raise ValueError("简历内容为空")
+
+            if self.dedup_index is not None:
+                duplicate = await loop.run_in_executor(None, self.dedup_index.match, key, resume_info)
+                if duplicate is not None:
+                    result["duplicate_of"] = {"resume": duplicate["key"], "similarity": duplicate["similarity"]}
+                    original = self._run_results.get(duplicate["key"])
+                    if original is not None:
+                        # 代表在本次运行中：等它分析完直接复用结果，不再写入结果库。
+                        # 等待期间让出并发名额，同一份简历的大量副本不会占满 max_in_flight
+                        original_result = await self._wait_yielding(original, slot)
+                        if original_result["status"] == "ok" and original_result["result"] is not None:
+                            result["status"] = "duplicate"
+                            result["result"] = original_result["result"]
+                            result["scores"] = original_result["scores"]
+                            result["cached"] = True
+                            return result
+                    else:
+                        # 本次运行中之后出现的同一组重复简历等待这一份的结果
+                        self._run_results[duplicate["key"]] = done
+                    # 代表是以前分析过的（或在本次分析失败）：按代表的文本分析，通常直接命中结果缓存
+                    resume_info = duplicate["text"]
+
+            # 结果缓存和结果库的 SQLite 读写都放到线程池中，不阻塞事件循环
+            cached_result = None
+            if self.result_cache is not None and not self.force_refresh:
+                cached_result = await loop.run_in_executor(
+                    None, self.result_cache.get, job_info, resume_info, self.model
+                )
+            if cached_result is not None:
+                result["result"] = cached_result
+                result["cached"] = True
+            else:
+                result["result"], result["usage"], result["budget"] = await self.analyze(job_info, resume_info)
+                if self.result_cache is not None:
+                    await loop.run_in_executor(
+                        None, self.result_cache.put, job_info, resume_info, self.model, result["result"]
+                    )
+
+            # 解析结构化评分，并写入结果库供之后按分数排序查询
+            if self.result_store is not None:
+                result["scores"] = await loop.run_in_executor(
+                    None,
+                    functools.partial(
+                        self.result_store.add, job_info, resume_info, self.model, result["result"],
+                        resume_path=resume_path
+                    )
+                )
+            else:
+                result["scores"] = parse_scores(result["result"])
+        except Exception as e:
+            result["status"] = "error"
+            result["error"] = str(e)
+        finally:
+            result["elapsed"] = round(time.time() - start_time, 3)
+            if done is not None and not done.done():
+                done.set_result(result)
+        return result
+
+    @property
+    def prefilter_enabled(self):
+        return self.prefilter_top_k is not None or self.prefilter_min_score is not None
+
+    async def _prefilter(self, job_info, resume_paths, on_result=None):
+        """
+        第一阶段：提取全部简历并在本地打分，返回入选简历的 {路径: (文本, 预筛信息)}
+
+        提取失败的简历直接生成结果（status 为 error），打分见 _shortlist()。
+        """
+        texts = await asyncio.gather(*(self.extract(path) for path in resume_paths), return_exceptions=True)
+        candidates = []
+        for path, text in zip(resume_paths, texts):
+            if isinstance(text, BaseException) or not text.strip():
+                result = self._new_result(path)
+                result["status"] = "error"
+                result["error"] = str(text) if isinstance(text, BaseException) else "简历内容为空"
+                result["elapsed"] = 0.0
+                if on_result:
+                    on_result(result)
+            else:
+                candidates.append((path, text))
+        return await self._shortlist(job_info, candidates, on_result)
+
+    async def _shortlist(self, job_info, candidates, on_result=None):
+        """
+        在本地给 [(标识, 文本)] 打分，返回入选简历的 {标识: (文本, 预筛信息)}
+
+        未入选的简历直接生成结果（status 为 filtered），不调用大模型。
+        """
+        # 打分是纯 CPU 计算，放到线程中执行，不阻塞事件循环上的其他请求
+        loop = asyncio.get_running_loop()
+        scores, details = await loop.run_in_executor(
+            None, score_resumes, job_info, [text for _, text in candidates], self.prefilter_skill_weight
+        )
+        selected = set(shortlist(scores, top_k=self.prefilter_top_k, min_score=self.prefilter_min_score))
+
+        passed = {}
+        for rank, index in enumerate(sorted(range(len(candidates)), key=lambda i: -scores[i]), 1):
+            path, text = candidates[index]
+            prefilter = dict(score=round(float(scores[index]), 4), rank=rank, **details[index])
+            if index in selected:
+                passed[path] = (text, prefilter)
+            else:
+                result = self._new_result(path)
+                result["status"] = "filtered"
+                result["prefilter"] = prefilter
+                result["elapsed"] = 0.0
+                if on_result:
+                    on_result(result)
+        return passed
+
+    async def run_async(self, job_info, resume_paths, on_result=None):
+        """在事件循环中并发分析所有简历，同时进行中的请求数不超过 max_in_flight"""
+        # 开始前校验一次密钥，避免每份简历都以认证错误失败
+        if not await self.key_validator.validate(self.api_key):
+            raise ValueError("API密钥无效")
+
+        self._run_results = {}
+        collected = {}
+
+        def collect(result):
+            collected[result["resume"]] = result
+            if on_result:
+                on_result(result)
+
+        passed = None
+        if self.prefilter_enabled:
+            passed = await self._prefilter(job_info, resume_paths, on_result=collect)
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def process(path):
+            resume_info, prefilter = passed[path] if passed is not None else (None, None)
+            async with semaphore:
+                result = await self._process(job_info, path, resume_info, prefilter, slot=semaphore)
+            collect(result)
+
+        await asyncio.gather(*(
+            process(path) for path in resume_paths if passed is None or path in passed
+        ))
+        return [collected[path] for path in resume_paths]
+
+    async def run_records_async(self, job_info, records, on_result):
+        """
+        逐条分析表格中的候选人：records 为 (标识, 记录文本) 的迭代器，边读取边分析
+
+        同时只有 max_in_flight 条记录在分析中，读到下一行之前要等其中一条完成，
+        因此内存占用与行数无关；结果只通过 on_result 回调输出。返回分析的条数。
+        """
+        if not await self.key_validator.validate(self.api_key):
+            raise ValueError("API密钥无效")
+
+        self._run_results = {}
+        loop = asyncio.get_running_loop()
+        records = iter(records)
+        if self.prefilter_enabled:
+            # 预筛选要把所有记录放在一起打分，记录文本需要先读入内存（每行通常只有几百字）
+            candidates = await loop.run_in_executor(None, list, records)
+            passed = await self._shortlist(job_info, candidates, on_result)
+            records = iter([(key, *passed[key]) for key, _ in candidates if key in passed])
+        else:
+            records = ((key, text, None) for key, text in records)
+
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+        tasks = set()
+
+        async def process(key, text, prefilter):
+            try:
+                result = await self._process(job_info, key, text, prefilter, slot=semaphore)
+            finally:
+                semaphore.release()
+            on_result(result)
+
+        count = 0
+        try:
+            while True:
+                await semaphore.acquire()
+                # 解析表格是同步的，放到线程中读取下一行，不阻塞事件循环上的请求
+                record = await loop.run_in_executor(None, next, records, None)
+                if record is None:
+                    semaphore.release()
+                    break
+                task = asyncio.ensure_future(process(*record))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                count += 1
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            # 被取消或读取出错时，不留下仍在运行的请求
+            for task in list(tasks):
+                task.cancel()
+        return count
+
+    def _run_in_pool(self, run_coroutine, on_result):
+        """在共享事件循环上运行 run_coroutine(回调)，结果在调用线程中逐个交给 on_result"""
+        completed = queue.Queue()
+        coroutine = run_coroutine(completed.put)
+        try:
+            self._future = self.client_pool.submit(coroutine)
+        except BaseException:
+            coroutine.close()
+            raise
+        # 结束标记由 future 的回调发出：任务在开始前被取消或拒绝时也不会一直等待
+        self._future.add_done_callback(lambda _: completed.put(None))
+        try:
+            while True:
+                result = completed.get()
+                if result is None:
+                    break
+                if on_result:
+                    on_result(result)
+            return self._future.result()
+        except KeyboardInterrupt:
+            self.stop()
+            raise
+
+    def run(self, job_info, resume_paths, on_result=None):
+        """
+        并发分析所有简历，返回与 resume_paths 一一对应的结果列表
+
+        on_result: 每完成一份简历即回调一次（在调用线程中执行）
+        被 stop() 取消时返回已完成的结果。
+        """
+        received = {}
+
+        def receive(result):
+            received.setdefault(result["resume"], result)
+            if on_result:
+                on_result(result)
+
+        try:
+            return self._run_in_pool(
+                lambda put: self.run_async(job_info, resume_paths, on_result=put), receive
+            )
+        except concurrent.futures.CancelledError:
+            return [received[path] for path in resume_paths if path in received]
+
+    def run_records(self, job_info, records, on_result=None):
+        """
+        逐条分析表格中的候选人（见 run_records_async），返回分析的条数
+
+        结果不在内存中汇总，只通过 on_result 回调（在调用线程中执行）；被 stop() 取消时返回 None。
+        """
+        try:
+            return self._run_in_pool(
+                lambda put: self.run_records_async(job_info, records, put), on_result
+            )
+        except concurrent.futures.CancelledError:
+            return None
+
+    def stop(self):
+        """停止批量分析：取消所有未完成的请求"""
+        if self._future is not None:
+            self._future.cancel()
+
+
+def load_api_key(settings_path):
+    """从设置文件中读取API密钥"""
+    try:
+        if os.path.exists(settings_path):
+            with open(settings_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("api_key", "")
+    except Exception as e:
+        print(f"加载设置失败: {str(e)}", file=sys.stderr)
+    return ""
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="批量分析简历与岗位的匹配度")
+    parser.add_argument("job", help="岗位描述文件（txt/pdf/docx/xlsx）")
+    parser.add_argument("resumes", help="简历目录、单个文件或通配符（如 'resumes/**/*.pdf'）；表格文件每行一位候选人")
+    parser.add_argument("--whole-file", action="store_true", help="表格文件整体作为一份简历，不按行拆分")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="结果输出文件（JSON Lines）")
+    parser.add_argument("-m", "--model", default="DeepSeek R1", choices=list(MODEL_MAP), help="使用的模型")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_MAX_IN_FLIGHT, help="同时进行中的请求数上限")
+    parser.add_argument("--max-connections", type=int, default=None, help="连接池最大连接数（默认不小于并发上限）")
+    parser.add_argument("--rpm", type=int, default=None, help="每分钟请求数上限")
+    parser.add_argument("--tpm", type=int, default=None, help="每分钟 token 数上限")
+    parser.add_argument("--max-prompt-tokens", type=int, default=DEFAULT_BUDGET_CONFIG["max_prompt_tokens"],
+                        help="每次请求的输入 token 上限，超出时截断简历")
+    parser.add_argument("--tokenizer", default=None, help="tokenizer.json 路径（需安装 tokenizers），默认按字符估算")
+    parser.add_argument("--cache", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis_cache.db'), help="分析结果缓存文件")
+    parser.add_argument("--no-cache", action="store_true", help="不使用结果缓存")
+    parser.add_argument("--store", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis_results.db'), help="结构化评分结果库")
+    parser.add_argument("--no-store", action="store_true", help="不写入结果库")
+    parser.add_argument("--index", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resume_index.db'), help="简历库（倒排索引）")
+    parser.add_argument("--no-index", action="store_true", help="不把简历加入简历库")
+    parser.add_argument("--no-vectors", action="store_true", help="加入简历库时不计算语义向量")
+    parser.add_argument("--prefilter-top-k", type=int, default=None, help="本地预筛选后只分析得分最高的 K 份简历")
+    parser.add_argument("--prefilter-min-score", type=float, default=None, help="本地预筛选最低分（0-1）")
+    parser.add_argument("--dedup-index", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resume_fingerprints.db'), help="简历指纹库（近似重复检测）")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_DEDUP_THRESHOLD, help="视为重复简历的最低相似度（0-1）")
+    parser.add_argument("--no-dedup", action="store_true", help="不检测重复简历，每份都单独分析")
+    parser.add_argument("--extraction-cache", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'extraction_cache.db'), help="提取文本缓存（按文件内容哈希，跨运行有效）")
+    parser.add_argument("--no-extraction-cache", action="store_true", help="不使用持久化的提取文本缓存")
+    parser.add_argument("--force-refresh", action="store_true", help="忽略已缓存的结果，重新分析并更新缓存")
+    parser.add_argument("--api-key", default=None, help="DeepSeek API密钥（默认读取环境变量 DEEPSEEK_API_KEY 或 settings.json）")
+    args = parser.parse_args(argv)
+
+    api_key = (
+        args.api_key
+        or os.environ.get("DEEPSEEK_API_KEY")
+        or load_api_key(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'settings.json'))
+    )
+    if not api_key:
+        parser.error("未提供API密钥")
+
+    extraction_store = None if args.no_extraction_cache else ExtractionStore(args.extraction_cache)
+    set_extraction_store(extraction_store)
+    job_info = read_document(args.job)
+    if not job_info.strip():
+        parser.error("岗位信息为空")
+
+    # 单个表格文件：每行一位候选人，先数一遍行数用于显示进度
+    by_row = os.path.isfile(args.resumes) and is_spreadsheet(args.resumes) and not args.whole_file
+    if by_row:
+        try:
+            total = sum(1 for _ in iter_resume_records(args.resumes))
+        except Exception as e:
+            parser.error(f"读取表格失败: {str(e)}")
+        if not total:
+            parser.error(f"表格中没有候选人: {args.resumes}")
+    else:
+        resume_paths = collect_resume_files(args.resumes)
+        if not resume_paths:
+            parser.error(f"未找到简历文件: {args.resumes}")
+        total = len(resume_paths)
+
+    configure_client_pool(
+        max_connections=args.max_connections or max(args.concurrency, DEFAULT_POOL_CONFIG["max_connections"]),
+        max_keepalive_connections=max(args.concurrency, DEFAULT_POOL_CONFIG["max_keepalive_connections"])
+    )
+    rate_limits = {}
+    if args.rpm:
+        rate_limits["requests_per_minute"] = args.rpm
+    if args.tpm:
+        rate_limits["tokens_per_minute"] = args.tpm
+    configure_request_scheduler(**rate_limits)
+    configure_prompt_budget(max_prompt_tokens=args.max_prompt_tokens, tokenizer=args.tokenizer)
+    result_cache = None if args.no_cache else ResultCache(args.cache)
+    result_store = None if args.no_store else ResultStore(args.store)
+    resume_index = None if args.no_index else open_resume_index(args.index, semantic=not args.no_vectors)
+    dedup_index = None if args.no_dedup else DuplicateIndex(args.dedup_index, threshold=args.dedup_threshold)
+    latency_model = LatencyModel(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'latency_stats.json'))
+    usage_stats = UsageStats(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'usage_stats.json'))
+    matcher = BatchMatcher(
+        api_key, args.model, max_in_flight=args.concurrency,
+        result_cache=result_cache, force_refresh=args.force_refresh, latency_model=latency_model,
+        result_store=result_store, usage_stats=usage_stats,
+        prefilter_top_k=args.prefilter_top_k, prefilter_min_score=args.prefilter_min_score,
+        resume_index=resume_index, dedup_index=dedup_index, extraction_store=extraction_store
+    )
+    counts = {"ok": 0, "error": 0, "filtered": 0, "duplicate": 0}
+    # 本次运行的 token 用量
+    run_usage = dict.fromkeys(USAGE_FIELDS, 0)
+    # 超出提示词预算被截断的简历数
+    truncated = [0]
+    start_time = time.time()
+    progress = BatchProgress(total, args.concurrency, matcher.model, latency_model)
+    print(f"共 {total} {'行候选人' if by_row else '份简历'}，并发上限 {args.concurrency}，模型 {args.model}", file=sys.stderr)
+    if matcher.prefilter_enabled:
+        print(f"本地预筛选：前 {args.prefilter_top_k or '全部'} 份，"
+              f"最低分 {args.prefilter_min_score if args.prefilter_min_score is not None else '不限'}",
+              file=sys.stderr)
+
+    with open(args.output, 'w', encoding='utf-8') as out:
+        def write_result(result):
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[result["status"]] += 1
+            if result["usage"]:
+                for field in USAGE_FIELDS[1:]:
+                    run_usage[field] += result["usage"].get(field, 0)
+            if result["budget"] and result["budget"]["truncated"]:
+                truncated[0] += 1
+            if result["status"] == "filtered":
+                progress.item_skipped()
+                print(
+                    f"[{progress.completed}/{total}] filtered {result['resume']} "
+                    f"(预筛分 {result['prefilter']['score']:.3f})",
+                    file=sys.stderr
+                )
+                return
+            if result["status"] == "duplicate":
+                progress.item_skipped()
+                print(
+                    f"[{progress.completed}/{total}] duplicate {result['resume']} "
+                    f"(与 {result['duplicate_of']['resume']} 重复，相似度 {result['duplicate_of']['similarity']:.2f})",
+                    file=sys.stderr
+                )
+                return
+            progress.item_done()
+            print(
+                f"[{progress.completed}/{total}] {result['status']} {result['resume']} "
+                f"({result['elapsed']}s，预计剩余 {progress.remaining_seconds():.0f}s)",
+                file=sys.stderr
+            )
+
+        try:
+            if by_row:
+                matcher.run_records(job_info, iter_resume_records(args.resumes), on_result=write_result)
+            else:
+                matcher.run(job_info, resume_paths, on_result=write_result)
+        except KeyboardInterrupt:
+            print("已中断，已完成的结果已写入输出文件", file=sys.stderr)
+            return 130
+        except Exception as e:
+            print(f"批量分析失败: {str(e)}", file=sys.stderr)
+            return 2
+        finally:
+            # 简历库的向量索引延迟同步，结束（包括中断）时写回磁盘
+            if resume_index is not None:
+                resume_index.flush()
+
+    print(
+        f"完成：成功 {counts['ok']}，失败 {counts['error']}，预筛淘汰 {counts['filtered']}，重复 {counts['duplicate']}，"
+        f"耗时 {time.time() - start_time:.1f}s，结果已写入 {args.output}",
+        file=sys.stderr
+    )
+    if result_cache is not None:
+        stats = result_cache.stats()
+        print(f"缓存命中 {stats['hits']}，未命中 {stats['misses']}", file=sys.stderr)
+    if extraction_store is not None:
+        stats = extraction_store.stats()
+        print(f"提取缓存命中 {stats['hits']}，未命中 {stats['misses']}", file=sys.stderr)
+    if run_usage["prompt_tokens"]:
+        print(f"{format_token_estimate(run_usage)}，{format_cache_usage(run_usage)}", file=sys.stderr)
+    if truncated[0]:
+        print(f"{truncated[0]} 份简历超出输入 token 上限（{args.max_prompt_tokens}），已截断后分析", file=sys.stderr)
+    if result_store is not None:
+        top = result_store.top(job_info, limit=5, model=matcher.model)
+        if top:
+            print("该岗位得分最高的候选人：", file=sys.stderr)
+            for row in top:
+                print(f"  {format_score(row['overall']):>5}  {row['recommendation'] or '-':<6} "
+                      f"{row['candidate']}  {row['resume_path'] or ''}", file=sys.stderr)
+    return 0 if counts["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+性能基准测试
+
+mock_server: 本地 OpenAI 兼容的 DeepSeek 模拟服务（可配置延迟分布、流式输出、429/5xx 注入、token 数）
+run:         端到端基准（分析请求、文档提取、历史记录持久化），结果输出为 JSON 便于对比
+
+用法（在项目根目录执行）：
+    python -m benchmarks.run --analyses 200 --concurrency 16
+    python -m benchmarks.mock_server --port 8000 --latency lognormal:1.0,0.4
+"""
@@ -0,0 +1,181 @@
+"""
+Word 提取基准：流式 iterparse 提取器与 python-docx 的耗时和峰值内存对比
+
+生成一个大的 .docx（大量段落 + 一个长表格，模拟表格排版的简历模板），分别用
+document_reader.read_docx（iterparse）和 python-docx（旧实现：只读取 doc.paragraphs）提取。
+每种提取器在独立的子进程中运行，峰值内存为提取开始前到提取过程中峰值的常驻内存（RSS）增量，
+python-docx 通过 lxml 分配的内存也计算在内。
+
+    python -m benchmarks.docx_extraction
+    python -m benchmarks.docx_extraction --paragraphs 50000 --rows 5000 --repeats 3 -o docx.json
+"""
+import os
+import sys
+import json
+import zipfile
+import argparse
+import statistics
+import subprocess
+import tempfile
+from xml.sax.saxutils import escape
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PARAGRAPH = "负责分布式任务调度平台的设计与实现，支撑日均千万级任务，推动服务容器化迁移。"
+
+# 提取器名称 -> 子进程中定义 extract(path) 的代码
+EXTRACTORS = {
+    "iterparse": "from document_reader import read_docx as extract",
+    "python-docx": (
+        "import docx\n"
+        "def extract(path):\n"
+        "    return ''.join(p.text + '\\n' for p in docx.Document(path).paragraphs)"
+    ),
+}
+
+_PROBE = """
+import sys, json, time
+sys.path.insert(0, {root!r})
+from benchmarks.run import current_rss_mb, peak_rss_mb
+{setup}
+before = current_rss_mb() or peak_rss_mb()
+start = time.perf_counter()
+text = extract({path!r})
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "peak_rss_delta_mb": peak_rss_mb() - before, "chars": len(text)}}))
+"""
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_PACKAGE_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+_DOCUMENT_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+)
+_DOCUMENT_END = '<w:sectPr/></w:body></w:document>'
+
+
+def _paragraph(text):
+    return f'<w:p><w:pPr><w:jc w:val="left"/></w:pPr><w:r><w:rPr><w:b/></w:rPr><w:t>{escape(text)}</w:t></w:r></w:p>'
+
+
+def write_docx(path, paragraphs, table_rows, columns=4):
+    """直接写出 document.xml 生成测试用的 .docx（python-docx 逐段生成大文件很慢）"""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _PACKAGE_RELS)
+        with archive.open("word/document.xml", "w") as f:
+            f.write(_DOCUMENT_START.encode("utf-8"))
+            for index in range(paragraphs):
+                f.write(_paragraph(f"{index}. {PARAGRAPH}").encode("utf-8"))
+            if table_rows:
+                f.write(b"<w:tbl><w:tblPr/>")
+                for row in range(table_rows):
+                    cells = "".join(
+                        f"<w:tc><w:tcPr/>{_paragraph(f'第{row}行第{column}列 Python / Kubernetes')}</w:tc>"
+                        for column in range(columns)
+                    )
+                    f.write(f"<w:tr>{cells}</w:tr>".encode("utf-8"))
+                f.write(b"</w:tbl>")
+            f.write(_DOCUMENT_END.encode("utf-8"))
+    return path
+
+
+def probe(extractor, path, timeout=600):
+    """在新的子进程中提取一次，返回耗时、峰值内存增量和字符数"""
+    code = _PROBE.format(root=ROOT_DIR, setup=EXTRACTORS[extractor], path=path)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT_DIR, capture_output=True, text=True, timeout=timeout
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{extractor} 提取失败:\n{completed.stderr[-2000:]}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def available_extractors():
+    names = ["iterparse"]
+    from lazy_import import module_available
+    if module_available("docx"):
+        names.append("python-docx")
+    return names
+
+
+def measure_docx(paragraphs=20000, table_rows=2000, repeats=3, work_dir=None):
+    """生成测试文件并逐个提取器测量，耗时和内存取中位数"""
+    if ROOT_DIR not in sys.path:
+        sys.path.insert(0, ROOT_DIR)
+    own_dir = work_dir is None
+    work_dir = work_dir or tempfile.mkdtemp(prefix="cvmatcher-docx-")
+    path = write_docx(os.path.join(work_dir, "large_resume.docx"), paragraphs, table_rows)
+    try:
+        result = {
+            "paragraphs": paragraphs,
+            "table_rows": table_rows,
+            "file_bytes": os.path.getsize(path),
+            "extractors": {},
+        }
+        for name in available_extractors():
+            runs = [probe(name, path) for _ in range(repeats)]
+            result["extractors"][name] = {
+                "p50_seconds": round(statistics.median(run["seconds"] for run in runs), 4),
+                "peak_rss_delta_mb": round(statistics.median(run["peak_rss_delta_mb"] for run in runs), 1),
+                "chars": runs[-1]["chars"],
+            }
+        extractors = result["extractors"]
+        if "python-docx" in extractors:
+            baseline, current = extractors["python-docx"], extractors["iterparse"]
+            result["speedup"] = round(baseline["p50_seconds"] / max(current["p50_seconds"], 1e-9), 2)
+            result["memory_ratio"] = round(
+                baseline["peak_rss_delta_mb"] / max(current["peak_rss_delta_mb"], 0.1), 2
+            )
+        return result
+    finally:
+        if own_dir:
+            os.remove(path)
+            os.rmdir(work_dir)
+
+
+def print_summary(result):
+    print(f"测试文件：{result['paragraphs']} 段 + {result['table_rows']} 行表格，"
+          f"{result['file_bytes'] / 1024 / 1024:.1f}MB")
+    for name, item in result["extractors"].items():
+        print(f"  {name:<12} {item['p50_seconds'] * 1000:9.1f} ms  峰值内存 +{item['peak_rss_delta_mb']:.1f}MB  "
+              f"{item['chars']} 字")
+    if "speedup" in result:
+        print(f"iterparse 比 python-docx 快 {result['speedup']} 倍，峰值内存为其 1/{result['memory_ratio']}")
+    else:
+        print("未安装 python-docx，跳过对比")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Word 提取耗时与内存对比（iterparse / python-docx）")
+    parser.add_argument("--paragraphs", type=int, default=20000, help="正文段落数")
+    parser.add_argument("--rows", type=int, default=2000, help="表格行数")
+    parser.add_argument("--repeats", type=int, default=3, help="每种提取器的运行次数（取中位数）")
+    parser.add_argument("-o", "--output", default=None, help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    result = measure_docx(args.paragraphs, args.rows, args.repeats)
+    print_summary(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+本地 OpenAI 兼容的 DeepSeek 模拟服务
+
+支持：
+- POST /v1/chat/completions：普通响应和流式（SSE）响应，deepseek-reasoner 额外输出思考过程
+- GET  /v1/models：用于 API 密钥校验，密钥为 "invalid" 时返回 401
+- 首 token 延迟按分布采样（fixed / uniform / normal / lognormal）
+- 按每秒 token 数匀速输出，输出 token 数可配置
+- 按比例注入 429（带 Retry-After）和 5xx 错误
+- 返回 usage（流式请求在 stream_options.include_usage 时返回），并模拟上下文硬盘缓存：
+  与之前请求相同的前缀（按 64 个字符为单位）计为 prompt_cache_hit_tokens
+
+既可在基准测试中作为线程内服务使用，也可单独运行供桌面应用联调：
+    python -m benchmarks.mock_server --port 8000
+然后在 settings.json 中设置 "connection_pool": {"base_url": "http://127.0.0.1:8000/v1"}
+"""
+import json
+import time
+import hashlib
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 密钥为该值时认证失败
+INVALID_API_KEY = "invalid"
+
+# 模拟前缀缓存的粒度（字符数）；token 数按 2 个字符一个 token 粗略换算
+PREFIX_CACHE_UNIT = 64
+CHARS_PER_TOKEN = 2
+
+
+class LatencyDistribution:
+    """
+    延迟分布，由形如 "类型:参数" 的字符串描述（单位：秒）：
+        fixed:0.5            固定值
+        uniform:0.2,1.0      均匀分布 [最小值, 最大值]
+        normal:0.5,0.1       正态分布（均值, 标准差），负值截断为 0
+        lognormal:0.5,0.4    对数正态分布（中位数, sigma）
+    """
+    KINDS = ("fixed", "uniform", "normal", "lognormal")
+
+    def __init__(self, spec="fixed:0"):
+        kind, _, params = spec.partition(":")
+        if kind not in self.KINDS:
+            raise ValueError(f"未知的延迟分布: {kind}（可选: {', '.join(self.KINDS)}）")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p.strip()] or [0.0]
+
+    def sample(self):
+        p = self.params
+        if self.kind == "fixed":
+            value = p[0]
+        elif self.kind == "uniform":
+            value = random.uniform(p[0], p[1] if len(p) > 1 else p[0])
+        elif self.kind == "normal":
+            value = random.gauss(p[0], p[1] if len(p) > 1 else 0.0)
+        else:
+            # 对数正态分布的中位数为 exp(mu)
+            value = p[0] * random.lognormvariate(0.0, p[1] if len(p) > 1 else 0.0)
+        return max(0.0, value)
+
+    def __repr__(self):
+        return f"LatencyDistribution({self.spec!r})"
+
+
+class MockDeepSeekServer:
+    """在后台线程中运行的模拟服务，url 属性为 OpenAI 客户端使用的 base_url"""
+    def __init__(self, host="127.0.0.1", port=0, latency="fixed:0", tokens_per_second=0,
+                 output_tokens=200, reasoning_tokens=50, rate_limit_ratio=0.0, server_error_ratio=0.0,
+                 retry_after=0.1, seed=None):
+        self.latency = latency if isinstance(latency, LatencyDistribution) else LatencyDistribution(latency)
+        # 0 表示不限速，尽快输出
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.reasoning_tokens = reasoning_tokens
+        self.rate_limit_ratio = rate_limit_ratio
+        self.server_error_ratio = server_error_ratio
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "streams": 0, "rate_limited": 0, "server_errors": 0, "model_lists": 0}
+        self._prefixes = set()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-deepseek", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def cached_prefix_chars(self, prompt):
+        """返回 prompt 与之前请求相同的最长前缀长度（按缓存单元取整），并把本次的前缀加入缓存"""
+        digest = hashlib.sha1()
+        hit = 0
+        units = []
+        for start in range(0, len(prompt) - PREFIX_CACHE_UNIT + 1, PREFIX_CACHE_UNIT):
+            digest.update(prompt[start:start + PREFIX_CACHE_UNIT].encode("utf-8"))
+            units.append(digest.copy().digest())
+        with self._lock:
+            for index, key in enumerate(units):
+                if key not in self._prefixes:
+                    break
+                hit = (index + 1) * PREFIX_CACHE_UNIT
+            self._prefixes.update(units)
+        return hit
+
+    def _roll(self):
+        """决定本次请求是否注入错误：返回 429、500 或 None"""
+        with self._lock:
+            value = self.random.random()
+        if value < self.rate_limit_ratio:
+            return 429
+        if value < self.rate_limit_ratio + self.server_error_ratio:
+            return 500
+        return None
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _api_key(self):
+                return self.headers.get("Authorization", "").replace("Bearer ", "", 1)
+
+            def _send_json(self, status, payload, headers=None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_error(self, status, error_type, message, headers=None):
+                self._send_json(status, {"error": {"message": message, "type": error_type}}, headers)
+
+            def do_GET(self):
+                if not self.path.rstrip("/").endswith("/models"):
+                    self._send_error(404, "not_found", "Not Found")
+                    return
+                if self._api_key() == INVALID_API_KEY:
+                    self._send_error(401, "authentication_error", "Authentication Fails")
+                    return
+                server._count("model_lists")
+                self._send_json(200, {"object": "list", "data": [
+                    {"id": model, "object": "model", "created": 0, "owned_by": "deepseek"}
+                    for model in ("deepseek-chat", "deepseek-reasoner")
+                ]})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_error(404, "not_found", "Not Found")
+                    return
+                if self._api_key() == INVALID_API_KEY:
+                    self._send_error(401, "authentication_error", "Authentication Fails")
+                    return
+                server._count("requests")
+
+                retry_headers = {"Retry-After": str(server.retry_after)} if server.retry_after is not None else {}
+                error = server._roll()
+                if error == 429:
+                    server._count("rate_limited")
+                    self._send_error(429, "rate_limit_error", "Rate limit reached", retry_headers)
+                    return
+                if error == 500:
+                    server._count("server_errors")
+                    self._send_error(500, "server_error", "Internal server error", retry_headers)
+                    return
+
+                time.sleep(server.latency.sample())
+                prompt = "".join(
+                    f"{m.get('role')}:{m.get('content') or ''}\n" for m in request.get("messages", [])
+                )
+                prompt_tokens = len(prompt) // CHARS_PER_TOKEN
+                hit_tokens = server.cached_prefix_chars(prompt) // CHARS_PER_TOKEN
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": server.output_tokens,
+                    "total_tokens": prompt_tokens + server.output_tokens,
+                    "prompt_cache_hit_tokens": hit_tokens,
+                    "prompt_cache_miss_tokens": prompt_tokens - hit_tokens,
+                }
+                if request.get("stream"):
+                    server._count("streams")
+                    self._stream(request, usage)
+                else:
+                    self._complete(request, usage)
+
+            def _tokens(self, model):
+                """本次输出的 (字段, 文本) 序列，每项约为一个 token"""
+                tokens = []
+                if model == "deepseek-reasoner":
+                    tokens += [("reasoning_content", "思")] * server.reasoning_tokens
+                tokens += [("content", "评")] * max(0, server.output_tokens - 1)
+                tokens.append(("content", "\n总体匹配分数: 80"))
+                return tokens
+
+            def _pace(self, start, index):
+                """按每秒 token 数限速"""
+                if server.tokens_per_second > 0:
+                    delay = start + index / server.tokens_per_second - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+            def _complete(self, request, usage):
+                start = time.monotonic()
+                tokens = self._tokens(request.get("model"))
+                self._pace(start, len(tokens))
+                message = {"role": "assistant", "content": "".join(t for k, t in tokens if k == "content")}
+                reasoning = "".join(t for k, t in tokens if k == "reasoning_content")
+                if reasoning:
+                    message["reasoning_content"] = reasoning
+                self._send_json(200, {
+                    "id": "mock", "object": "chat.completion", "created": int(time.time()),
+                    "model": request.get("model"),
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+                    "usage": usage,
+                })
+
+            def _write_event(self, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.wfile.write(b"data: " + data + b"\n\n")
+
+            def _stream(self, request, usage):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                model = request.get("model")
+                start = time.monotonic()
+                try:
+                    for index, (field, text) in enumerate(self._tokens(model)):
+                        self._pace(start, index)
+                        self._write_event({
+                            "id": "mock", "object": "chat.completion.chunk", "created": 0, "model": model,
+                            "choices": [{"index": 0, "delta": {field: text}, "finish_reason": None}],
+                        })
+                    self._write_event({
+                        "id": "mock", "object": "chat.completion.chunk", "created": 0, "model": model,
+                        "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                    })
+                    if (request.get("stream_options") or {}).get("include_usage"):
+                        self._write_event({
+                            "id": "mock", "object": "chat.completion.chunk", "created": 0, "model": model,
+                            "choices": [], "usage": usage,
+                        })
+                    self.wfile.write(b"data: [DONE]\n\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端取消了请求
+                    pass
+
+        return Handler
+
+
+def add_server_arguments(parser):
+    """模拟服务的命令行参数（基准测试脚本共用）"""
+    parser.add_argument("--latency", default="fixed:0.05", help="首 token 延迟分布，如 lognormal:0.5,0.4")
+    parser.add_argument("--tokens-per-second", type=float, default=0, help="输出速度，0 表示不限速")
+    parser.add_argument("--output-tokens", type=int, default=200, help="每次输出的 token 数")
+    parser.add_argument("--reasoning-tokens", type=int, default=50, help="R1 思考过程的 token 数")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="返回 429 的请求比例")
+    parser.add_argument("--server-error-ratio", type=float, default=0.0, help="返回 500 的请求比例")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="错误响应的 Retry-After 秒数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+
+
+def server_from_args(args, host="127.0.0.1", port=0):
+    return MockDeepSeekServer(
+        host=host,
+        port=port,
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        reasoning_tokens=args.reasoning_tokens,
+        rate_limit_ratio=args.rate_limit_ratio,
+        server_error_ratio=args.server_error_ratio,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地 DeepSeek 模拟服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = server_from_args(args, args.host, args.port)
+    print(f"模拟服务已启动: {server.url}（Ctrl+C 退出）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(json.dumps(server.stats, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
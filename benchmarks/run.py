@@ -0,0 +1,646 @@
+"""
+端到端基准测试
+
+在本地模拟服务（benchmarks/mock_server.py）上驱动真实的代码路径，并记录资源占用：
+- worker:     桌面应用的 AnalysisWorker（密钥校验 → 调度器 → 客户端连接池 → 流式输出）
+- batch:      BatchMatcher 批量分析（进程池提取 + 并发请求）
+- extraction: 各类文档的文本提取
+- docx:       大 Word 文件的流式提取与 python-docx 的耗时、峰值内存对比（见 benchmarks/docx_extraction.py）
+- history:    历史职位库的保存、列表、搜索、读取与删除
+- prefilter:  本地预筛选（分词 + TF-IDF / 技能覆盖打分）的吞吐量
+- semantic:   哈希向量编码速度，以及在内存映射向量矩阵上的 top-K 余弦检索延迟
+- startup:    桌面应用冷启动到首个窗口出现的时间，以及窗口显示前最慢的导入（见 benchmarks/startup.py）
+
+每项报告 p50/p95 延迟、吞吐量、峰值内存（RSS）和峰值线程数，结果写入 JSON 文件，
+用 --compare 指定之前的结果文件即可对比。
+
+    python -m benchmarks.run --analyses 200 --concurrency 16 --latency lognormal:0.3,0.5
+    python -m benchmarks.run --suites extraction,history --compare benchmarks/results/上次.json
+"""
+import os
+import csv
+import sys
+import json
+import time
+import types
+import shutil
+import platform
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windows 没有 resource 模块
+    resource = None
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.mock_server import add_server_arguments, server_from_args  # noqa: E402
+
+ALL_SUITES = ("worker", "batch", "extraction", "docx", "history", "prefilter", "semantic", "startup")
+DEFAULT_RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+# 对比结果时列出的指标
+COMPARE_METRICS = ("p50_seconds", "p95_seconds", "per_second", "peak_rss_mb", "peak_threads")
+
+SAMPLE_JOB = "岗位：高级后端工程师\n要求：5年以上 Python 开发经验，熟悉分布式系统、Kubernetes、PostgreSQL。\n"
+SAMPLE_RESUME = "姓名：张三\n工作经历：8年 Python 后端开发，负责分布式任务调度平台，熟悉 Kubernetes 与 PostgreSQL。\n"
+
+
+def percentile(values, p):
+    """线性插值的百分位数，values 为空时返回 None"""
+    if not values:
+        return None
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100.0
+    lower = int(k)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (k - lower)
+
+
+def latency_summary(latencies, wall_seconds):
+    """延迟分布与吞吐量"""
+    return {
+        "count": len(latencies),
+        "p50_seconds": _round(percentile(latencies, 50)),
+        "p95_seconds": _round(percentile(latencies, 95)),
+        "max_seconds": _round(max(latencies) if latencies else None),
+        "mean_seconds": _round(sum(latencies) / len(latencies) if latencies else None),
+        "wall_seconds": _round(wall_seconds),
+        "per_second": _round(len(latencies) / wall_seconds if wall_seconds > 0 else None),
+    }
+
+
+def _round(value, digits=4):
+    return None if value is None else round(value, digits)
+
+
+def current_rss_mb():
+    """当前进程的常驻内存（MB），无法获取时返回 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    """进程启动以来的峰值常驻内存（MB）"""
+    if resource is None:
+        return current_rss_mb()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def thread_count():
+    """进程的线程数（含 Qt 等非 Python 线程），无法获取时退回 Python 线程数"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return threading.active_count()
+
+
+class ResourceSampler:
+    """在后台定时采样线程数和内存，记录测试期间的峰值"""
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        self.peak_threads = max(self.peak_threads, thread_count())
+        self.peak_rss = max(self.peak_rss, current_rss_mb() or 0.0)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def report(self):
+        # 采样线程本身不计入
+        return {
+            "peak_threads": self.peak_threads - 1,
+            "peak_rss_mb": _round(self.peak_rss or peak_rss_mb(), 1),
+        }
+
+
+def bench_worker(args, server):
+    """
+    并发运行 AnalysisWorker，测量单次分析的延迟和首 token 时间
+
+    与桌面应用一样在主线程运行 Qt 事件循环，信号以排队方式送达，
+    因此测得的是界面实际看到的时间。
+    """
+    from PySide6.QtCore import QCoreApplication, QEvent, QTimer
+    from deepseek_client import get_client_pool
+    from document_reader import shutdown_process_pool
+    from progress_tracker import LatencyModel
+    from usage_stats import UsageStats
+    import resume_matching_app_pyside6 as app_module
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    latency_model = LatencyModel()
+    usage_stats = UsageStats()
+    latencies, first_tokens, errors = [], [], []
+    workers = []
+    state = {"in_flight": 0, "finished": 0}
+
+    def run_one():
+        worker = app_module.AnalysisWorker(
+            SAMPLE_JOB, SAMPLE_RESUME, args.api_key, args.model,
+            stream=not args.no_stream, latency_model=latency_model, usage_stats=usage_stats
+        )
+        start = time.monotonic()
+        first_token = []
+
+        def on_content(text):
+            if not first_token:
+                first_token.append(time.monotonic() - start)
+                first_tokens.append(first_token[0])
+
+        def on_finished(*_):
+            latencies.append(time.monotonic() - start)
+            state["in_flight"] -= 1
+            state["finished"] += 1
+
+        def on_error(message):
+            errors.append(message)
+            on_finished()
+
+        worker.content_received.connect(on_content)
+        worker.analysis_completed.connect(on_finished)
+        worker.analysis_error.connect(on_error)
+        worker.api_key_invalid.connect(lambda: on_error("API密钥无效"))
+        state["in_flight"] += 1
+        workers.append(worker)
+        worker.start()
+
+    def pump():
+        while len(workers) < args.analyses and state["in_flight"] < args.concurrency:
+            run_one()
+        if state["finished"] >= args.analyses:
+            timer.stop()
+            app.quit()
+
+    timer = QTimer()
+    timer.setInterval(5)
+    timer.timeout.connect(pump)
+    wall_start = time.monotonic()
+    timer.start()
+    app.exec()
+    wall = time.monotonic() - wall_start
+
+    result = latency_summary(latencies, wall)
+    result["first_token_p50_seconds"] = _round(percentile(first_tokens, 50))
+    result["first_token_p95_seconds"] = _round(percentile(first_tokens, 95))
+    result["errors"] = len(errors)
+    result["usage"] = usage_stats.summary()
+
+    # 返回前显式释放 worker、连接池、进程池和应用对象：QObject 和 QCoreApplication 留到解释器退出时
+    # 才析构会在 finalization 中崩溃（bool_dealloc）。连接池和进程池之后再使用时会重新创建
+    for worker in workers:
+        worker.deleteLater()
+    workers.clear()
+    timer.deleteLater()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+    get_client_pool().close()
+    shutdown_process_pool()
+    app.shutdown()
+    return result
+
+
+def bench_batch(args, server, work_dir):
+    """BatchMatcher 批量分析一组简历文件"""
+    from batch_matcher import BatchMatcher
+    from progress_tracker import LatencyModel
+    from usage_stats import UsageStats
+
+    resume_dir = os.path.join(work_dir, "resumes")
+    os.makedirs(resume_dir, exist_ok=True)
+    paths = []
+    for index in range(args.analyses):
+        path = os.path.join(resume_dir, f"resume_{index:05d}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(SAMPLE_RESUME + f"编号：{index}\n")
+        paths.append(path)
+
+    matcher = BatchMatcher(
+        args.api_key, args.model, max_in_flight=args.concurrency, latency_model=LatencyModel(),
+        usage_stats=UsageStats()
+    )
+    wall_start = time.monotonic()
+    results = matcher.run(SAMPLE_JOB, paths)
+    wall = time.monotonic() - wall_start
+
+    result = latency_summary([r["elapsed"] for r in results if r["status"] == "ok"], wall)
+    result["errors"] = sum(1 for r in results if r["status"] != "ok")
+    result["usage"] = matcher.usage_stats.summary()
+    return result
+
+
+def make_fixtures(work_dir, scale):
+    """生成各类型的测试文档，scale 控制文档大小"""
+    paragraph = "负责分布式任务调度平台的设计与实现，支撑日均千万级任务，推动服务容器化迁移。"
+    fixtures = {}
+
+    path = os.path.join(work_dir, "resume.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(paragraph for _ in range(200 * scale)))
+    fixtures["txt"] = path
+
+    from benchmarks.docx_extraction import write_docx
+    fixtures["docx"] = write_docx(os.path.join(work_dir, "resume.docx"), 200 * scale, 20 * scale, columns=3)
+
+    from document_reader import OPENPYXL_SUPPORT, PDF_SUPPORT
+
+    rows = [["姓名", "经历"]] + [[f"候选人{i}", paragraph] for i in range(100 * scale)]
+    if OPENPYXL_SUPPORT:
+        import openpyxl
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("候选人")
+        for row in rows:
+            sheet.append(row)
+        path = os.path.join(work_dir, "candidates.xlsx")
+        workbook.save(path)
+        fixtures["xlsx"] = path
+
+    path = os.path.join(work_dir, "candidates.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        csv.writer(f).writerows(rows)
+    fixtures["csv"] = path
+
+    if PDF_SUPPORT:
+        path = os.path.join(work_dir, "resume.pdf")
+        write_text_pdf(path, pages=10 * scale, lines_per_page=40)
+        fixtures["pdf"] = path
+    return fixtures
+
+
+def write_text_pdf(path, pages, lines_per_page):
+    """写出一个只含 ASCII 文本的最小PDF（PyPDF2 不能生成带文字的页面）"""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"(Page {page} line {i}: Python Kubernetes PostgreSQL distributed systems) Tj T*"
+                 for i in range(lines_per_page)]
+        stream = ("BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(lines) + " ET").encode("ascii")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            b"/Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def bench_extraction(args, work_dir):
+    """逐类型测量文本提取耗时（不使用提取缓存）"""
+    from document_reader import read_document
+
+    results = {}
+    for kind, path in make_fixtures(work_dir, args.fixture_scale).items():
+        latencies = []
+        chars = 0
+        wall_start = time.monotonic()
+        for _ in range(args.repeats):
+            start = time.monotonic()
+            chars = len(read_document(path, use_cache=False))
+            latencies.append(time.monotonic() - start)
+        wall = time.monotonic() - wall_start
+        result = latency_summary(latencies, wall)
+        result["file_bytes"] = os.path.getsize(path)
+        result["chars"] = chars
+        results[kind] = result
+    return results
+
+
+def bench_docx(args, work_dir):
+    """大 Word 文件：iterparse 提取器与 python-docx 对比，各自在子进程中运行"""
+    from benchmarks.docx_extraction import measure_docx
+
+    return measure_docx(args.docx_paragraphs, args.docx_rows, repeats=3, work_dir=work_dir)
+
+
+def bench_history(args, work_dir):
+    """历史职位库：保存一条新岗位、打开列表、搜索、按编号读取和删除的耗时"""
+    import resume_matching_app_pyside6 as app_module
+
+    # 历史职位库的路径由 get_resource_path 决定，测试期间指向临时目录
+    original_get_resource_path = app_module.get_resource_path
+    app_module.get_resource_path = lambda relative_path: os.path.join(work_dir, relative_path)
+    try:
+        store = app_module.ResumeMatchingApp.load_job_store(types.SimpleNamespace())
+        save_latencies, load_latencies, get_latencies, delete_latencies = [], [], [], []
+        wall_start = time.monotonic()
+        for index in range(args.history_entries):
+            start = time.monotonic()
+            store.add(f"岗位{index}", f"公司{index % 50}", SAMPLE_JOB * 20)
+            save_latencies.append(time.monotonic() - start)
+        save_wall = time.monotonic() - wall_start
+
+        wall_start = time.monotonic()
+        for _ in range(args.repeats):
+            start = time.monotonic()
+            loaded = store.list()
+            load_latencies.append(time.monotonic() - start)
+        load_wall = time.monotonic() - wall_start
+
+        # 历史职位对话框的搜索：第一页结果和匹配总数
+        search_latencies = []
+        wall_start = time.monotonic()
+        for index in range(args.repeats):
+            start = time.monotonic()
+            query = ("Kubernetes", "分布式", f"公司{index}", "高级后端 python")[index % 4]
+            store.list(limit=app_module.HISTORY_PAGE_SIZE, query=query)
+            store.count(query)
+            search_latencies.append(time.monotonic() - start)
+        search_wall = time.monotonic() - wall_start
+
+        wall_start = time.monotonic()
+        for job in loaded[:args.repeats]:
+            start = time.monotonic()
+            store.get(job["id"])
+            get_latencies.append(time.monotonic() - start)
+        get_wall = time.monotonic() - wall_start
+
+        wall_start = time.monotonic()
+        for job in loaded[-args.repeats:]:
+            start = time.monotonic()
+            store.delete(job["id"])
+            delete_latencies.append(time.monotonic() - start)
+        delete_wall = time.monotonic() - wall_start
+        store.close()
+    finally:
+        app_module.get_resource_path = original_get_resource_path
+
+    return {
+        "entries": len(loaded),
+        "save": latency_summary(save_latencies, save_wall),
+        "load": latency_summary(load_latencies, load_wall),
+        "search": latency_summary(search_latencies, search_wall),
+        "get": latency_summary(get_latencies, get_wall),
+        "delete": latency_summary(delete_latencies, delete_wall),
+    }
+
+
+def make_resume_corpus(count, seed=0):
+    """生成技能组合各不相同的模拟简历"""
+    import random
+
+    skills = ("Python", "Java", "Golang", "Kubernetes", "Docker", "PostgreSQL", "MySQL", "Redis", "Kafka",
+              "React", "Vue", "TypeScript", "Prometheus", "Linux", "Spark", "PyTorch")
+    duties = ("负责分布式任务调度平台的设计与开发", "参与微服务改造和容器化迁移", "负责前端组件库与性能优化",
+              "搭建监控告警体系，保障线上服务高可用", "负责数据仓库建设和离线计算任务", "训练和部署推荐模型")
+    rng = random.Random(seed)
+    resumes = []
+    for index in range(count):
+        lines = [f"姓名：候选人{index}", f"技能：{'、'.join(rng.sample(skills, 5))}"]
+        lines += [f"{year}年：{rng.choice(duties)}，使用 {rng.choice(skills)} 和 {rng.choice(skills)}。"
+                  for year in range(2015, 2025)]
+        resumes.append("\n".join(lines * 3))
+    return resumes
+
+
+def bench_prefilter(args):
+    """本地预筛选：一次给整批简历打分的耗时和每秒处理的简历数"""
+    from prefilter import score_resumes, shortlist
+
+    resumes = make_resume_corpus(args.prefilter_resumes)
+    latencies = []
+    wall_start = time.monotonic()
+    for _ in range(max(1, args.repeats // 4)):
+        start = time.monotonic()
+        scores, _ = score_resumes(SAMPLE_JOB, resumes)
+        shortlist(scores, top_k=50)
+        latencies.append(time.monotonic() - start)
+    wall = time.monotonic() - wall_start
+    result = latency_summary(latencies, wall)
+    # 吞吐量按简历数计算
+    result["per_second"] = _round(len(resumes) * len(latencies) / wall, 1) if wall else None
+    result["resumes"] = len(resumes)
+    result["avg_chars"] = sum(len(text) for text in resumes) // len(resumes)
+    return result
+
+
+def bench_semantic(args, work_dir):
+    """语义检索：编码简历的速度和在 --semantic-resumes 条向量上检索前 20 名的延迟"""
+    import numpy as np
+    from semantic_index import HashingEmbedder, VectorStore
+
+    embedder = HashingEmbedder()
+    resumes = make_resume_corpus(500)
+    start = time.monotonic()
+    vectors = [embedder.embed(text) for text in resumes]
+    embed_seconds = time.monotonic() - start
+
+    # 检索延迟只与向量条数有关，用已编码的向量加随机扰动填满矩阵
+    store = VectorStore(os.path.join(work_dir, "vectors"), embedder.dimensions, name=embedder.name)
+    rng = np.random.default_rng(0)
+    base = np.array(vectors)
+    batch_size = 10000
+    for offset in range(0, args.semantic_resumes, batch_size):
+        count = min(batch_size, args.semantic_resumes - offset)
+        batch = base[rng.integers(0, len(base), count)] + rng.normal(0, 0.05, (count, embedder.dimensions))
+        batch /= np.linalg.norm(batch, axis=1, keepdims=True)
+        store.add_many(range(offset, offset + count), batch)
+
+    query = embedder.embed(SAMPLE_JOB)
+    latencies = []
+    wall_start = time.monotonic()
+    for _ in range(args.repeats):
+        start = time.monotonic()
+        store.search(query, k=20)
+        latencies.append(time.monotonic() - start)
+    result = latency_summary(latencies, time.monotonic() - wall_start)
+    result["vectors"] = len(store)
+    result["dimensions"] = embedder.dimensions
+    result["matrix_mb"] = _round(os.path.getsize(os.path.join(work_dir, "vectors", "vectors.bin")) / 1024 / 1024, 1)
+    result["embed_per_second"] = _round(len(resumes) / embed_seconds, 1)
+    return result
+
+
+def bench_startup(args):
+    """多次冷启动桌面应用（offscreen），首个窗口出现的时间作为延迟"""
+    from benchmarks.startup import measure_startup
+
+    result = measure_startup(runs=args.startup_runs)
+    summary = latency_summary(result["first_window_seconds"], sum(result["first_window_seconds"]))
+    summary.update(
+        stages=result["stages"],
+        import_seconds_before_window=result["import_seconds_before_window"],
+        slowest_packages=result["slowest_packages"][:5],
+        warm_up_seconds=result["warm_up_seconds"],
+    )
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _flatten(data, prefix=""):
+    """把嵌套的结果展开成 "suite.metric" 形式，便于对比"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and key in COMPARE_METRICS:
+            flat[name] = value
+    return flat
+
+
+def compare(previous, current):
+    """打印与之前结果的对比"""
+    before = _flatten(previous.get("suites", {}))
+    after = _flatten(current.get("suites", {}))
+    print(f"\n与 {previous.get('meta', {}).get('git_revision') or '之前的结果'} 对比:")
+    for name in sorted(set(before) & set(after)):
+        old, new = before[name], after[name]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"  {name:<45} {old:>12} -> {new:<12} {change}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="简历匹配端到端基准测试")
+    parser.add_argument("--suites", default=",".join(ALL_SUITES), help=f"要运行的测试，可选: {', '.join(ALL_SUITES)}")
+    parser.add_argument("--analyses", type=int, default=100, help="分析次数（worker / batch）")
+    parser.add_argument("--concurrency", type=int, default=8, help="同时进行中的分析数")
+    parser.add_argument("-m", "--model", default="DeepSeek V3", help="模型（界面上的名称）")
+    parser.add_argument("--no-stream", action="store_true", help="worker 使用非流式请求")
+    parser.add_argument("--api-key", default="benchmark-key", help="发给模拟服务的密钥")
+    parser.add_argument("--repeats", type=int, default=20, help="提取 / 加载历史记录的重复次数")
+    parser.add_argument("--fixture-scale", type=int, default=1, help="测试文档的大小倍数")
+    parser.add_argument("--docx-paragraphs", type=int, default=20000, help="docx 测试文件的段落数")
+    parser.add_argument("--docx-rows", type=int, default=2000, help="docx 测试文件的表格行数")
+    parser.add_argument("--history-entries", type=int, default=500, help="历史岗位条数")
+    parser.add_argument("--prefilter-resumes", type=int, default=2000, help="预筛选测试的简历数")
+    parser.add_argument("--semantic-resumes", type=int, default=100000, help="语义检索测试的向量条数")
+    parser.add_argument("--startup-runs", type=int, default=3, help="冷启动测试的启动次数")
+    parser.add_argument("--rpm", type=int, default=None, help="调度器每分钟请求数上限（默认不限）")
+    parser.add_argument("-o", "--output", default=None, help="结果文件路径（默认 benchmarks/results/时间戳.json）")
+    parser.add_argument("--compare", default=None, help="与之前的结果文件对比")
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    suites = [name.strip() for name in args.suites.split(",") if name.strip()]
+    unknown = set(suites) - set(ALL_SUITES)
+    if unknown:
+        parser.error(f"未知的测试: {', '.join(sorted(unknown))}")
+
+    from deepseek_client import configure_client_pool, get_client_pool
+    from request_scheduler import configure_request_scheduler
+
+    server = server_from_args(args).start()
+    configure_client_pool(base_url=server.url)
+    configure_request_scheduler(requests_per_minute=args.rpm)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": vars(args),
+        "suites": {},
+    }
+    work_dir = tempfile.mkdtemp(prefix="cvmatcher-bench-")
+    try:
+        for name in suites:
+            print(f"运行 {name} ...", flush=True)
+            with ResourceSampler() as sampler:
+                if name == "worker":
+                    result = bench_worker(args, server)
+                elif name == "batch":
+                    result = bench_batch(args, server, work_dir)
+                elif name == "extraction":
+                    result = bench_extraction(args, work_dir)
+                elif name == "docx":
+                    result = bench_docx(args, work_dir)
+                elif name == "prefilter":
+                    result = bench_prefilter(args)
+                elif name == "semantic":
+                    result = bench_semantic(args, work_dir)
+                elif name == "startup":
+                    result = bench_startup(args)
+                else:
+                    result = bench_history(args, work_dir)
+            result.update(sampler.report())
+            report["suites"][name] = result
+    finally:
+        get_client_pool().close()
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report["server"] = server.stats
+    report["peak_rss_mb"] = _round(peak_rss_mb(), 1)
+    try:
+        from request_scheduler import get_request_scheduler
+        report["scheduler"] = dict(get_request_scheduler().stats)
+    except Exception:
+        pass
+
+    output = args.output
+    if output is None:
+        os.makedirs(DEFAULT_RESULTS_DIR, exist_ok=True)
+        output = os.path.join(DEFAULT_RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=4)
+
+    print(json.dumps(report["suites"], ensure_ascii=False, indent=4))
+    print(f"结果已保存: {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
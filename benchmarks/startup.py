@@ -0,0 +1,148 @@
+"""
+启动耗时报告：用 -X importtime 启动桌面应用，统计首个窗口出现的时间和导入耗时
+
+应用以 --startup-report 启动：窗口第一次显示、后台预加载完成后输出各阶段的时刻并退出。
+这里汇总多次启动的结果，并把 -X importtime 的输出按顶层包合计，列出最慢的包。
+首个窗口的耗时（中位数）超过 --budget 时返回非 0，可用于持续跟踪冷启动时间。
+
+    python -m benchmarks.startup                  # 默认使用 offscreen 平台，不弹出窗口
+    python -m benchmarks.startup --runs 5 --budget 0.8 -o startup.json
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, "resume_matching_app_pyside6.py")
+
+# 首个窗口出现的默认预算（秒）
+DEFAULT_BUDGET_SECONDS = 1.0
+REPORT_PREFIX = "STARTUP_REPORT "
+# 应用在窗口第一次显示时输出到 stderr 的分隔行
+FIRST_WINDOW_MARKER = "STARTUP_FIRST_WINDOW"
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output):
+    """
+    解析 -X importtime 的输出，返回 (窗口显示前的条目, 窗口显示后的条目)
+
+    每个条目为 (模块, 自身耗时（秒）, 累计耗时（秒）, 嵌套深度)
+    """
+    before, after = [], []
+    entries = before
+    for line in output.splitlines():
+        if line.strip() == FIRST_WINDOW_MARKER:
+            entries = after
+            continue
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((name, int(self_us) / 1e6, int(cumulative_us) / 1e6, (len(indent) - 1) // 2))
+    return before, after
+
+
+def summarize_imports(entries, top=15):
+    """按顶层包合计自身耗时（同一个包的子模块合并），返回耗时最多的 top 个包"""
+    packages = {}
+    for name, self_seconds, _, _ in entries:
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + self_seconds
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"package": package, "seconds": round(seconds, 4)} for package, seconds in ranked]
+
+
+def run_once(platform="offscreen", timeout=120):
+    """启动一次应用，返回 (应用输出的报告, (窗口显示前, 窗口显示后) 的 importtime 条目, 进程总耗时（秒）)"""
+    env = dict(os.environ)
+    if platform:
+        env["QT_QPA_PLATFORM"] = platform
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", APP_PATH, "--startup-report"],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    process_seconds = time.perf_counter() - start
+    report = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(REPORT_PREFIX):
+            report = json.loads(line[len(REPORT_PREFIX):])
+    if report is None:
+        raise RuntimeError(f"应用没有输出启动报告（退出码 {completed.returncode}）:\n{completed.stderr[-2000:]}")
+    return report, parse_importtime(completed.stderr), process_seconds
+
+
+def measure_startup(runs=3, platform="offscreen", top=15):
+    """多次启动应用，返回汇总结果（耗时取中位数）"""
+    reports, process_times = [], []
+    before, after = [], []
+    for _ in range(runs):
+        report, (before, after), process_seconds = run_once(platform)
+        reports.append(report)
+        process_times.append(process_seconds)
+    first_window = [report["startup_seconds"]["first_window"] for report in reports]
+    stages = {
+        stage: round(statistics.median(report["startup_seconds"][stage] for report in reports), 4)
+        for stage in reports[0]["startup_seconds"]
+    }
+    # 最后一次启动的导入明细（前几次已预热磁盘缓存，结果更稳定）
+    return {
+        "runs": runs,
+        "first_window_seconds": first_window,
+        "median_first_window_seconds": round(statistics.median(first_window), 4),
+        "median_process_seconds": round(statistics.median(process_times), 4),
+        "stages": stages,
+        "warm_up_seconds": reports[-1]["warm_up_seconds"],
+        "loaded_before_window": reports[-1]["loaded_before_window"],
+        # 窗口显示前的导入（启动的关键路径）和之后在后台的导入
+        "import_seconds_before_window": round(sum(entry[2] for entry in before if entry[3] == 0), 4),
+        "import_seconds_after_window": round(sum(entry[2] for entry in after if entry[3] == 0), 4),
+        "slowest_packages": summarize_imports(before, top),
+    }
+
+
+def print_summary(result, budget):
+    print(f"首个窗口（中位数，{result['runs']} 次）: {result['median_first_window_seconds']:.3f}s，预算 {budget:.3f}s")
+    print("各阶段（距模块开始导入）: " + "，".join(
+        f"{stage} {seconds:.3f}s" for stage, seconds in result["stages"].items()
+    ))
+    print(f"窗口显示前导入合计 {result['import_seconds_before_window']:.3f}s"
+          f"（显示后在后台导入 {result['import_seconds_after_window']:.3f}s），显示前最慢的包:")
+    for item in result["slowest_packages"]:
+        print(f"  {item['package']:<30} {item['seconds'] * 1000:8.1f} ms")
+    if result["warm_up_seconds"]:
+        print("窗口显示后在后台预加载: " + "，".join(
+            f"{name} {seconds:.3f}s" for name, seconds in result["warm_up_seconds"].items()
+        ))
+    if result["loaded_before_window"]:
+        print("警告：以下延迟导入的模块在窗口显示前已被导入: " + "，".join(result["loaded_before_window"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="桌面应用启动耗时报告")
+    parser.add_argument("--runs", type=int, default=3, help="启动次数（取中位数）")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_SECONDS, help="首个窗口出现的时间上限（秒）")
+    parser.add_argument("--platform", default="offscreen", help="Qt 平台插件（传空字符串则使用系统默认，会弹出窗口）")
+    parser.add_argument("--top", type=int, default=15, help="列出最慢的包的个数")
+    parser.add_argument("-o", "--output", default=None, help="把结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    result = measure_startup(args.runs, args.platform, args.top)
+    result["budget_seconds"] = args.budget
+    print_summary(result, args.budget)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=4)
+    if result["median_first_window_seconds"] > args.budget:
+        print("首个窗口出现的时间超出预算", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -28,7 +28,7 @@ OPTIONS = {
         'PySide6',
         'openai',
         'PyPDF2',
-        'docx',
+        'openpyxl',
         'pandas',
         'numpy',
         'PIL',
@@ -78,7 +78,7 @@ setup(
         'PySide6',
         'openai',
         'PyPDF2',
-        'python-docx',
+        'openpyxl',
         'pandas',
         'pillow',
     ],
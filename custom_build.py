@@ -26,7 +26,7 @@ print("第一阶段：构建基本应用...")
 setup_cmd = [
     sys.executable, 'setup.py', 'py2app', 
     '--semi-standalone',
-    '--packages=PySide6,openai,PyPDF2,docx,pandas,numpy,PIL,certifi,httpx,anyio'
+    '--packages=PySide6,openai,PyPDF2,openpyxl,pandas,numpy,PIL,certifi,httpx,anyio'
 ]
 subprocess.run(setup_cmd, check=True)
 
@@ -0,0 +1,276 @@
+"""
+DeepSeek 异步客户端层：进程内共享的事件循环 + 连接池
+
+所有分析请求（桌面应用的 AnalysisWorker、批量匹配、命令行）都通过同一个
+DeepSeekClientPool 发出。它在一个后台线程中运行 asyncio 事件循环，持有一个
+httpx.AsyncClient（HTTP/2 + keep-alive），按 API 密钥缓存 AsyncOpenAI 实例，
+因此只有第一次请求需要建立 TLS 连接，后续请求复用已有连接。
+
+非事件循环线程通过 submit()/run() 提交协程。
+
+ApiKeyValidator 通过不计费的模型列表接口校验 API 密钥，每个密钥只校验一次，
+结果按 TTL 缓存；之后只有请求返回认证错误时才会重新校验。
+"""
+import time
+import atexit
+import asyncio
+import hashlib
+import threading
+
+from lazy_import import lazy_import, module_available
+
+# openai 导入需要约半秒，只检查是否安装，第一次发送请求时才导入
+OPENAI_SUPPORT = module_available("openai") and module_available("httpx")
+openai = lazy_import("openai")
+httpx = lazy_import("httpx")
+
+# httpx 的 HTTP/2 支持依赖 h2
+HTTP2_SUPPORT = module_available("h2")
+
+DEEPSEEK_BASE_URL = "https://api.deepseek.com/v1"
+
+# 连接池默认配置，可通过 configure_client_pool() 或 settings.json 的 "connection_pool" 覆盖
+DEFAULT_POOL_CONFIG = {
+    "max_connections": 64,
+    "max_keepalive_connections": 32,
+    "keepalive_expiry": 120.0,
+    "http2": True,
+    "connect_timeout": 10.0,
+}
+
+# API密钥校验结果的有效期（秒）
+KEY_VALIDATION_TTL = 6 * 3600
+
+
+def is_auth_error(error):
+    """是否为API密钥无效/无权限导致的错误"""
+    # openai 尚未导入时不可能收到它的异常，不为判断而导入
+    return OPENAI_SUPPORT and openai.loaded and isinstance(
+        error, (openai.AuthenticationError, openai.PermissionDeniedError)
+    )
+
+
+class DeepSeekClientPool:
+    """共享的 DeepSeek 异步客户端（后台事件循环 + httpx 连接池）"""
+    def __init__(self, base_url=DEEPSEEK_BASE_URL, **config):
+        if not OPENAI_SUPPORT:
+            raise ImportError("OpenAI package is not installed")
+
+        unknown = set(config) - set(DEFAULT_POOL_CONFIG)
+        if unknown:
+            raise ValueError(f"未知的连接池配置: {', '.join(sorted(unknown))}")
+
+        self.base_url = base_url
+        self.config = dict(DEFAULT_POOL_CONFIG, **config)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._http_client = None
+        self._clients = {}
+
+    @property
+    def loop(self):
+        """后台事件循环，首次访问时启动"""
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run_loop, args=(ready,),
+                    name="deepseek-client-loop", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _run_loop(self, ready):
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def _get_http_client(self):
+        """创建（或复用）共享的 httpx.AsyncClient，只能在事件循环线程中调用"""
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                http2=self.config["http2"] and HTTP2_SUPPORT,
+                limits=httpx.Limits(
+                    max_connections=self.config["max_connections"],
+                    max_keepalive_connections=self.config["max_keepalive_connections"],
+                    keepalive_expiry=self.config["keepalive_expiry"],
+                ),
+                timeout=httpx.Timeout(600.0, connect=self.config["connect_timeout"]),
+            )
+        return self._http_client
+
+    def get_client(self, api_key):
+        """获取指定API密钥的 AsyncOpenAI 客户端，所有客户端共用同一个连接池"""
+        client = self._clients.get(api_key)
+        if client is None:
+            client = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=self.base_url,
+                http_client=self._get_http_client(),
+                # 重试由 request_scheduler 统一负责（遵守 Retry-After 并协调所有请求）
+                max_retries=0
+            )
+            self._clients[api_key] = client
+        return client
+
+    async def chat(self, api_key, model, messages, **kwargs):
+        """发送一次 chat.completions 请求并返回完整响应"""
+        client = self.get_client(api_key)
+        return await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            **kwargs
+        )
+
+    async def stream_chat(self, api_key, model, messages, on_usage=None, **kwargs):
+        """
+        以流式方式发送请求，逐块产出 (content, reasoning_content) 增量文本
+
+        on_usage: 可选回调，流结束时以响应的 usage 对象调用（含上下文缓存命中的 token 数）
+        """
+        client = self.get_client(api_key)
+        if on_usage is not None:
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            **kwargs
+        )
+        try:
+            async for chunk in stream:
+                if on_usage is not None and getattr(chunk, "usage", None):
+                    on_usage(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                # deepseek-reasoner 的思考过程通过 reasoning_content 字段返回
+                reasoning = getattr(delta, "reasoning_content", None) or ""
+                content = delta.content or ""
+                if content or reasoning:
+                    yield content, reasoning
+        finally:
+            await stream.close()
+
+    def submit(self, coro):
+        """从任意线程提交协程，返回 concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """从非事件循环线程提交协程并阻塞等待结果"""
+        return self.submit(coro).result(timeout)
+
+    async def _aclose(self):
+        self._clients.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def close(self):
+        """关闭连接池并停止后台事件循环"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), loop).result(5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+_pool = None
+_pool_config = {}
+_pool_lock = threading.Lock()
+
+
+def configure_client_pool(**config):
+    """设置共享连接池的配置，需在第一次 get_client_pool() 之前调用"""
+    with _pool_lock:
+        if _pool is not None:
+            raise RuntimeError("连接池已创建，无法再修改配置")
+        _pool_config.update(config)
+
+
+def get_client_pool():
+    """获取进程内共享的 DeepSeekClientPool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DeepSeekClientPool(**_pool_config)
+            atexit.register(_pool.close)
+        return _pool
+
+
+class ApiKeyValidator:
+    """API密钥校验服务：结果按 TTL 缓存，缓存中只保存密钥的哈希（线程安全）"""
+    def __init__(self, client_pool, ttl=KEY_VALIDATION_TTL):
+        self.client_pool = client_pool
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # 密钥哈希 -> (是否有效, 校验时间)
+        self._results = {}
+
+    @staticmethod
+    def _key_id(api_key):
+        return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+    def cached_status(self, api_key):
+        """返回缓存的校验结果：True/False，没有有效缓存时返回 None"""
+        with self._lock:
+            entry = self._results.get(self._key_id(api_key))
+        if entry is None or time.time() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def _set_status(self, api_key, valid):
+        with self._lock:
+            self._results[self._key_id(api_key)] = (valid, time.time())
+
+    def mark_invalid(self, api_key):
+        """请求返回认证错误时调用，下次使用该密钥前不再发起请求"""
+        self._set_status(api_key, False)
+
+    def invalidate(self, api_key):
+        """清除缓存的校验结果，下次使用时重新校验"""
+        with self._lock:
+            self._results.pop(self._key_id(api_key), None)
+
+    async def validate(self, api_key):
+        """
+        校验密钥是否有效（有缓存时直接返回缓存结果）
+
+        只把认证错误视为无效；网络等其他错误原样抛出，且不写入缓存。
+        """
+        status = self.cached_status(api_key)
+        if status is not None:
+            return status
+        try:
+            # 模型列表接口不消耗 token
+            await self.client_pool.get_client(api_key).models.list()
+        except Exception as e:
+            if is_auth_error(e):
+                self._set_status(api_key, False)
+                return False
+            raise
+        self._set_status(api_key, True)
+        return True
+
+
+_validator = None
+
+
+def get_key_validator():
+    """获取进程内共享的 ApiKeyValidator"""
+    global _validator
+    pool = get_client_pool()
+    with _pool_lock:
+        if _validator is None:
+            _validator = ApiKeyValidator(pool)
+        return _validator
@@ -0,0 +1,705 @@
+"""
+文档读取工具：从 txt/pdf/docx/xlsx 文件中提取纯文本
+
+不依赖任何 GUI 组件，桌面应用与批量匹配引擎共用同一套提取逻辑。
+
+各文件类型由注册表中的提取器（Extractor 子类）处理：提取器声明自己支持的扩展名，
+通过 iter_text() 流式产出文本片段，read_document() 按扩展名分派并施加大小限制。
+新增文件类型只需实现一个提取器并调用 register_extractor()。
+
+PDF 提取流程：iter_pdf_pages() 按页惰性产出文本；页数较多的文件拆分成页区间
+交给进程池并行解析；结果用 ''.join 拼接。提取结果按 (路径, 修改时间, 大小)
+缓存在内存中，重复打开同一文件时直接返回；设置了持久化缓存（set_extraction_store()，
+见 extraction_store.py）时再按文件内容哈希查找，应用重启后也不必重新解析。
+prefetch_documents() 提前提取一批文件写入持久化缓存（默认用进程池并行）。
+
+Word 文件不经过 python-docx：iter_docx_blocks() 用 iterparse 流式解析 document.xml，
+按阅读顺序产出段落和表格行（中文简历模板大多用表格排版），处理完的元素立即释放。
+
+表格（xlsx/csv）按行流式读取：iter_spreadsheet_records() 用 openpyxl 的只读模式
+（csv 用标准库）逐行产出“列名：值”形式的紧凑记录，空单元格不输出；一行通常对应
+一位候选人，批量匹配时每行单独分析，几千行的导出文件内存占用也不随行数增长。
+"""
+import os
+import re
+import csv
+import math
+import codecs
+import zipfile
+import datetime
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+from lazy_import import lazy_import, module_available
+
+# 文件处理相关库：只检查是否安装，第一次解析对应类型的文件时才导入（pandas 导入需要数百毫秒）
+PDF_SUPPORT = module_available("PyPDF2")
+# Word 文件用标准库解析（zipfile + iterparse），不需要 python-docx
+DOCX_SUPPORT = True
+# xlsx 用 openpyxl 只读模式逐行读取；旧版 xls 需要 pandas（及 xlrd）
+OPENPYXL_SUPPORT = module_available("openpyxl")
+EXCEL_SUPPORT = OPENPYXL_SUPPORT or module_available("pandas")
+PyPDF2 = lazy_import("PyPDF2")
+openpyxl = lazy_import("openpyxl")
+pd = lazy_import("pandas")
+
+# 页数达到该值的PDF才使用进程池并行解析，页数少时进程间通信反而更慢
+PDF_PARALLEL_MIN_PAGES = 8
+
+# 提取缓存的容量（字符数）
+EXTRACTION_CACHE_MAX_CHARS = 50 * 1000 * 1000
+
+# 后台预热等待提取结果时检查是否需要停止的间隔（秒）
+PREFETCH_POLL_SECONDS = 0.2
+
+# 提取逻辑的版本：提取结果会改变时递增，持久化缓存中旧版本的结果随之失效
+EXTRACTOR_VERSION = 1
+
+# 默认的文件大小上限（字节），超过时拒绝解析
+MAX_DOCUMENT_BYTES = 50 * 1024 * 1024
+
+# 读取文本文件时每次读取的字符数
+TEXT_CHUNK_CHARS = 64 * 1024
+
+# WordprocessingML 中用到的元素
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_DOCX_P = _W + "p"
+_DOCX_TBL = _W + "tbl"
+_DOCX_TR = _W + "tr"
+_DOCX_TC = _W + "tc"
+_DOCX_T = _W + "t"
+# 不含正文的属性元素，解析时跳过
+_DOCX_SKIPPED = frozenset(_W + tag for tag in ("pPr", "rPr", "tblPr", "tblGrid", "trPr", "tcPr", "sectPr"))
+# mc:Fallback 是 mc:Choice（如新版文本框）为旧版 Word 准备的副本，读取会重复
+_DOCX_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_DOCX_CHARS = {_W + "tab": "\t", _W + "br": "\n", _W + "cr": "\n", _W + "noBreakHyphen": "-"}
+_OFFICE_DOCUMENT_REL = "/officeDocument"
+_PACKAGE_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+# 表格一行中各单元格之间的分隔符
+DOCX_CELL_SEPARATOR = " | "
+
+# 表格文件的扩展名（可以按行拆分成多位候选人）
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+# 表格中表示空单元格的占位值（整个单元格），以及 pandas 导出时生成的无名列
+_EMPTY_CELL_RE = re.compile(r"^(?:NaN|NaT|None|nan|#N/A|Unnamed: \d+)$")
+
+# 判断 csv 编码和分隔符时读取的字节数
+CSV_SAMPLE_BYTES = 64 * 1024
+
+
+class UnsupportedDocumentError(ValueError):
+    """不支持的文件类型"""
+
+
+class DocumentTooLargeError(ValueError):
+    """文件超过大小限制"""
+
+
+def file_cache_key(file_path):
+    """文件的缓存键：绝对路径 + 修改时间 + 文件大小，文件一改动键就变化"""
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
+
+class ExtractionCache:
+    """进程内的文本提取缓存，按总字符数做 LRU 淘汰（线程安全）"""
+    def __init__(self, max_chars=EXTRACTION_CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._total_chars = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            text = self._entries.get(key)
+            if text is not None:
+                self._entries.move_to_end(key)
+            return text
+
+    def put(self, key, text):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_chars -= len(old)
+            self._entries[key] = text
+            self._total_chars += len(text)
+            while self._total_chars > self.max_chars and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._total_chars -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_chars = 0
+
+
+extraction_cache = ExtractionCache()
+# 持久化的提取缓存（extraction_store.ExtractionStore），未设置时只使用进程内缓存
+extraction_store = None
+
+
+def set_extraction_store(store):
+    """设置 read_document() 使用的持久化提取缓存（None 表示不使用）"""
+    global extraction_store
+    extraction_store = store
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """获取共享的文档解析进程池（首次使用时创建）"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _process_pool
+
+
+def shutdown_process_pool():
+    """关闭共享的文档解析进程池（之后再使用时重新创建）"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True)
+
+
+def read_text(file_path):
+    """读取文本文件内容"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def iter_pdf_pages(file_path, start=0, stop=None):
+    """逐页提取PDF文本的生成器，只在迭代到某一页时才解析该页"""
+    with open(file_path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        page_count = len(reader.pages)
+        stop = page_count if stop is None else min(stop, page_count)
+        for index in range(start, stop):
+            yield (reader.pages[index].extract_text() or "") + "\n"
+
+
+def count_pdf_pages(file_path):
+    """PDF页数"""
+    with open(file_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _extract_pdf_range(file_path, start, stop):
+    """进程池任务：提取 [start, stop) 页的文本"""
+    return "".join(iter_pdf_pages(file_path, start, stop))
+
+
+def _read_pdf_parallel(file_path, page_count):
+    """把页面按区间分给进程池并行提取，按原顺序拼接"""
+    workers = os.cpu_count() or 1
+    chunk_size = math.ceil(page_count / workers)
+    pool = get_process_pool()
+    futures = [
+        pool.submit(_extract_pdf_range, file_path, start, min(start + chunk_size, page_count))
+        for start in range(0, page_count, chunk_size)
+    ]
+    return "".join(future.result() for future in futures)
+
+
+def read_pdf(file_path, parallel=True):
+    """读取PDF文件内容"""
+    text = None
+    if parallel and (os.cpu_count() or 1) > 1:
+        page_count = count_pdf_pages(file_path)
+        if page_count >= PDF_PARALLEL_MIN_PAGES:
+            try:
+                text = _read_pdf_parallel(file_path, page_count)
+            except Exception as e:
+                # 进程池不可用（如受限环境）时退回单进程解析
+                print(f"并行解析PDF失败，改为逐页解析: {str(e)}")
+    if text is None:
+        text = "".join(iter_pdf_pages(file_path))
+    return text
+
+
+def _collect_docx_text(element, parts):
+    """收集元素内的文本：文本框中的段落各占一行，嵌套的表格逐行输出"""
+    for child in element:
+        tag = child.tag
+        if tag == _DOCX_T:
+            if child.text:
+                parts.append(child.text)
+        elif tag in _DOCX_CHARS:
+            parts.append(_DOCX_CHARS[tag])
+        elif tag == _DOCX_P:
+            _collect_docx_text(child, parts)
+            parts.append("\n")
+        elif tag == _DOCX_TR:
+            parts.append(_docx_row_text(child) + "\n")
+        elif tag not in _DOCX_SKIPPED and tag != _DOCX_FALLBACK:
+            _collect_docx_text(child, parts)
+
+
+def _iter_docx_cells(row):
+    """一行中的单元格（可能包在内容控件等元素中）"""
+    for child in row:
+        if child.tag == _DOCX_TC:
+            yield child
+        elif child.tag not in _DOCX_SKIPPED:
+            yield from _iter_docx_cells(child)
+
+
+def _docx_row_text(row):
+    """表格一行的文本：非空单元格用分隔符连接，合并单元格重复的内容只保留一次"""
+    cells = []
+    for cell in _iter_docx_cells(row):
+        parts = []
+        _collect_docx_text(cell, parts)
+        text = "".join(parts).strip()
+        if text and (not cells or cells[-1] != text):
+            cells.append(text)
+    return DOCX_CELL_SEPARATOR.join(cells)
+
+
+def _docx_main_part(archive):
+    """正文部件的路径（由包关系指定，通常为 word/document.xml）"""
+    try:
+        with archive.open("_rels/.rels") as f:
+            for rel in ET.parse(f).getroot().iter(_PACKAGE_REL):
+                if rel.get("Type", "").endswith(_OFFICE_DOCUMENT_REL):
+                    return rel.get("Target", "").lstrip("/")
+    except KeyError:
+        pass
+    return "word/document.xml"
+
+
+def iter_docx_blocks(file_path):
+    """
+    按阅读顺序逐块产出Word文件的文本：正文段落一段一行，表格一行一行（单元格用 | 分隔）
+
+    用 iterparse 边读边解析 document.xml，每个段落或表格行处理完就从树中移除，
+    内存占用只与最大的单个段落 / 表格行有关，与文件大小无关。
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open(_docx_main_part(archive)) as f:
+            # 祖先元素栈，以及当前所在的段落 / 表格层数
+            stack = []
+            paragraphs = tables = 0
+            for event, element in ET.iterparse(f, events=("start", "end")):
+                tag = element.tag
+                if event == "start":
+                    stack.append(element)
+                    if tag == _DOCX_P:
+                        paragraphs += 1
+                    elif tag == _DOCX_TBL:
+                        tables += 1
+                    continue
+
+                stack.pop()
+                if tag == _DOCX_P:
+                    paragraphs -= 1
+                    if paragraphs or tables:
+                        continue
+                    parts = []
+                    _collect_docx_text(element, parts)
+                    yield "".join(parts) + "\n"
+                elif tag == _DOCX_TR and tables == 1 and not paragraphs:
+                    text = _docx_row_text(element)
+                    if text:
+                        yield text + "\n"
+                elif tag == _DOCX_TBL:
+                    tables -= 1
+                    if tables or paragraphs:
+                        continue
+                else:
+                    continue
+                # 已输出的段落、表格行和表格从父元素中移除，释放内存
+                element.clear()
+                if stack:
+                    stack[-1].remove(element)
+
+
+def read_docx(file_path):
+    """读取Word文件内容"""
+    return "".join(iter_docx_blocks(file_path))
+
+
+def _iter_xlsx_rows(file_path):
+    """逐行产出 (工作表名, 行号, 单元格值元组)，只读模式下不把整个工作簿载入内存"""
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            for row_number, values in enumerate(sheet.iter_rows(values_only=True), 1):
+                yield sheet.title, row_number, values
+    finally:
+        workbook.close()
+
+
+def _iter_xls_rows(file_path):
+    """旧版 xls：openpyxl 不支持，用 pandas 读取后逐行产出"""
+    sheets = pd.read_excel(file_path, sheet_name=None, header=None, dtype=object)
+    for sheet_name, frame in sheets.items():
+        for row_number, values in enumerate(frame.itertuples(index=False, name=None), 1):
+            yield sheet_name, row_number, tuple(None if pd.isna(value) else value for value in values)
+
+
+def _detect_csv_format(file_path):
+    """返回 (编码, csv 方言)：不是合法 UTF-8 时按 GB18030 读取（Excel 中文版导出的 csv）"""
+    with open(file_path, 'rb') as f:
+        sample = f.read(CSV_SAMPLE_BYTES)
+    try:
+        # 增量解码：样本末尾被截断的多字节字符不算错误
+        text = codecs.getincrementaldecoder('utf-8-sig')().decode(sample)
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'gb18030'
+        text = sample.decode(encoding, errors='ignore')
+    try:
+        dialect = csv.Sniffer().sniff(text, delimiters=",\t;|")
+    except csv.Error:
+        dialect = csv.excel
+    return encoding, dialect
+
+
+def _iter_csv_rows(file_path):
+    encoding, dialect = _detect_csv_format(file_path)
+    with open(file_path, 'r', encoding=encoding, newline='') as f:
+        for row_number, values in enumerate(csv.reader(f, dialect), 1):
+            yield "", row_number, values
+
+
+def _format_cell(value):
+    """
+    单元格的文本：整数形式的浮点数去掉小数，日期去掉零点时间；空白和占位值
+    （NaN、None、pandas 导出的“Unnamed: 0”列名等）返回空字符串
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime.datetime) and value.time() == datetime.time():
+        return value.date().isoformat()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    text = " ".join(str(value).split())
+    return "" if _EMPTY_CELL_RE.match(text) else text
+
+
+def iter_spreadsheet_records(file_path):
+    """
+    逐行产出表格中的记录 (工作表名, 行号, 记录文本)
+
+    每个工作表第一个非空行作为表头，之后的每一行输出为“列名：值”，一列一行，空单元格和
+    空行跳过；没有表头的列命名为“第N列”。csv 的工作表名为空字符串。
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext == '.csv':
+        rows = _iter_csv_rows(file_path)
+    elif file_ext == '.xls':
+        rows = _iter_xls_rows(file_path)
+    else:
+        rows = _iter_xlsx_rows(file_path)
+
+    current_sheet, header = None, None
+    for sheet_name, row_number, values in rows:
+        if sheet_name != current_sheet:
+            current_sheet, header = sheet_name, None
+        cells = [_format_cell(value) for value in values]
+        if not any(cells):
+            continue
+        if header is None:
+            header = cells
+            continue
+        lines = []
+        for index, cell in enumerate(cells):
+            if cell:
+                name = header[index] if index < len(header) and header[index] else f"第{index + 1}列"
+                lines.append(f"{name}：{cell}")
+        yield sheet_name, row_number, "\n".join(lines)
+
+
+def record_id(file_path, sheet_name, row_number):
+    """表格中一行的标识，如 candidates.xlsx#Sheet1!12（csv 没有工作表名：candidates.csv#12）"""
+    if sheet_name:
+        return f"{file_path}#{sheet_name}!{row_number}"
+    return f"{file_path}#{row_number}"
+
+
+def is_spreadsheet(file_path):
+    return os.path.splitext(file_path)[1].lower() in SPREADSHEET_EXTENSIONS
+
+
+def iter_spreadsheet_text(file_path):
+    """整个表格作为一份文档：按工作表分段，每行记录之间空一行"""
+    current_sheet = None
+    for sheet_name, _, text in iter_spreadsheet_records(file_path):
+        if sheet_name != current_sheet:
+            current_sheet = sheet_name
+            if sheet_name:
+                yield f"【{sheet_name}】\n"
+        yield text + "\n\n"
+
+
+def read_excel(file_path):
+    """读取Excel文件内容"""
+    return "".join(iter_spreadsheet_text(file_path))
+
+
+class Extractor:
+    """文档提取器基类：声明支持的扩展名，流式产出文本"""
+    name = ""
+    extensions = ()
+
+    def available(self):
+        """依赖库是否已安装"""
+        return True
+
+    def iter_text(self, file_path):
+        """按顺序产出文本片段（生成器）"""
+        raise NotImplementedError
+
+    def extract(self, file_path, parallel=True):
+        """一次性提取全部文本，子类可以提供更快的实现"""
+        return "".join(self.iter_text(file_path))
+
+
+class TextExtractor(Extractor):
+    name = "文本"
+    extensions = ('.txt',)
+
+    def iter_text(self, file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            while True:
+                chunk = f.read(TEXT_CHUNK_CHARS)
+                if not chunk:
+                    break
+                yield chunk
+
+    def extract(self, file_path, parallel=True):
+        return read_text(file_path)
+
+
+class PdfExtractor(Extractor):
+    name = "PDF"
+    extensions = ('.pdf',)
+
+    def available(self):
+        return PDF_SUPPORT
+
+    def iter_text(self, file_path):
+        return iter_pdf_pages(file_path)
+
+    def extract(self, file_path, parallel=True):
+        return read_pdf(file_path, parallel=parallel)
+
+
+class DocxExtractor(Extractor):
+    name = "Word"
+    extensions = ('.docx',)
+
+    def iter_text(self, file_path):
+        return iter_docx_blocks(file_path)
+
+
+class ExcelExtractor(Extractor):
+    name = "Excel"
+    extensions = ('.xlsx',)
+
+    def available(self):
+        return OPENPYXL_SUPPORT
+
+    def iter_text(self, file_path):
+        return iter_spreadsheet_text(file_path)
+
+
+class XlsExtractor(ExcelExtractor):
+    extensions = ('.xls',)
+
+    def available(self):
+        return module_available("pandas")
+
+
+class CsvExtractor(Extractor):
+    name = "CSV"
+    extensions = ('.csv',)
+
+    def iter_text(self, file_path):
+        return iter_spreadsheet_text(file_path)
+
+
+# 扩展名 -> 提取器
+_extractors = {}
+
+
+def register_extractor(extractor):
+    """注册提取器，同一扩展名后注册的覆盖先注册的"""
+    for ext in extractor.extensions:
+        _extractors[ext.lower()] = extractor
+    return extractor
+
+
+for _extractor in (TextExtractor(), PdfExtractor(), DocxExtractor(), ExcelExtractor(), XlsExtractor(), CsvExtractor()):
+    register_extractor(_extractor)
+
+
+def supported_extensions():
+    """当前可用（依赖已安装）的扩展名"""
+    return tuple(ext for ext, extractor in _extractors.items() if extractor.available())
+
+
+# 支持的文件扩展名（含依赖未安装的类型）
+SUPPORTED_EXTENSIONS = tuple(_extractors)
+
+
+def get_extractor(file_path):
+    """按扩展名查找提取器，不支持或依赖未安装时抛出 UnsupportedDocumentError"""
+    file_ext = os.path.splitext(file_path)[1].lower()
+    extractor = _extractors.get(file_ext)
+    if extractor is None or not extractor.available():
+        raise UnsupportedDocumentError(f"不支持的文件类型: {file_ext}")
+    return extractor
+
+
+def _check_size(file_path, max_bytes):
+    if max_bytes and os.path.getsize(file_path) > max_bytes:
+        raise DocumentTooLargeError(
+            f"文件过大: {os.path.getsize(file_path) / 1024 / 1024:.1f}MB，上限 {max_bytes / 1024 / 1024:.0f}MB"
+        )
+
+
+def iter_document(file_path, max_chars=None, max_bytes=MAX_DOCUMENT_BYTES):
+    """流式读取文档，最多产出 max_chars 个字符，达到上限后不再解析剩余内容"""
+    extractor = get_extractor(file_path)
+    _check_size(file_path, max_bytes)
+    remaining = max_chars
+    for chunk in extractor.iter_text(file_path):
+        if remaining is not None:
+            if remaining <= 0:
+                break
+            chunk = chunk[:remaining]
+            remaining -= len(chunk)
+        yield chunk
+
+
+def read_document(file_path, parallel=True, use_cache=True, max_chars=None, max_bytes=MAX_DOCUMENT_BYTES):
+    """
+    根据扩展名读取文档内容，不支持的类型抛出 UnsupportedDocumentError（ValueError 子类）
+
+    parallel: 是否允许用进程池并行解析大PDF（在进程池内部调用时应为 False）
+    use_cache: 是否使用提取缓存（进程内缓存，以及设置了的持久化缓存）
+    max_chars: 最多返回的字符数，超出部分不解析
+    max_bytes: 文件大小上限，超过时抛出 DocumentTooLargeError
+    """
+    extractor = get_extractor(file_path)
+    cache_key = file_cache_key(file_path) if use_cache else None
+    store = extraction_store if use_cache else None
+    store_key = None
+    if cache_key is not None:
+        text = extraction_cache.get(cache_key)
+        if text is None and store is not None:
+            store_key, text = _store_lookup(store, file_path)
+            if text is not None:
+                extraction_cache.put(cache_key, text)
+        if text is not None:
+            return text if max_chars is None else text[:max_chars]
+
+    if max_chars is not None:
+        # 只需要开头部分时流式读取，截断的结果不写入缓存
+        return "".join(iter_document(file_path, max_chars=max_chars, max_bytes=max_bytes))
+
+    _check_size(file_path, max_bytes)
+    text = extractor.extract(file_path, parallel=parallel)
+    if cache_key is not None:
+        extraction_cache.put(cache_key, text)
+    if store_key is not None:
+        _store_put(store, store_key, text)
+    return text
+
+
+def _store_lookup(store, file_path):
+    """在持久化缓存中查找，返回 (缓存键, 文本)；缓存出错时当作未命中"""
+    try:
+        key = store.key(file_path)
+        return key, store.get(key)
+    except Exception as e:
+        print(f"读取提取缓存失败 {file_path}: {str(e)}")
+        return None, None
+
+
+def _store_put(store, key, text):
+    try:
+        store.put(key, text)
+    except Exception as e:
+        print(f"写入提取缓存失败: {str(e)}")
+
+
+def prefetch_documents(file_paths, store=None, max_bytes=MAX_DOCUMENT_BYTES, stop=None, max_pending=None,
+                       parallel=True):
+    """
+    用进程池并行提取一批文件写入持久化缓存（已缓存、不支持或过大的文件跳过），返回新提取的文件数
+
+    用于后台预热：之后打开这些文件时直接从缓存读取。提取失败的文件忽略。
+    文件逐个计算缓存键并提交，进程池中同时最多有 max_pending 个预热任务（默认为 CPU 核心数），
+    用户打开的文件最多排在这几个任务之后。
+    parallel=False 时在调用线程中逐个提取，不使用（也不创建）共享进程池：
+    进程池的工作进程由第一次提交任务的线程 fork，会继承该线程的调度优先级，
+    低优先级线程中的预热不能成为创建进程池的一方。
+    stop: threading.Event，设置后不再提交新任务，取消尚未开始的任务并尽快返回
+    """
+    store = store if store is not None else extraction_store
+    if store is None:
+        return 0
+    max_pending = max_pending or os.cpu_count() or 1
+    futures = {}
+    extracted = 0
+
+    def collect(timeout=None):
+        nonlocal extracted
+        done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = futures.pop(future)
+            try:
+                text = future.result()
+            except Exception:
+                continue
+            _store_put(store, key, text)
+            extracted += 1
+
+    def stopped():
+        return stop is not None and stop.is_set()
+
+    for file_path in file_paths:
+        if stopped():
+            break
+        try:
+            get_extractor(file_path)
+            _check_size(file_path, max_bytes)
+            key = store.key(file_path)
+        except (OSError, ValueError):
+            continue
+        if store.contains(key):
+            continue
+        if not parallel:
+            try:
+                text = read_document(file_path, parallel=False, use_cache=False, max_bytes=max_bytes)
+            except Exception:
+                continue
+            _store_put(store, key, text)
+            extracted += 1
+            continue
+        while len(futures) >= max_pending and not stopped():
+            collect(timeout=PREFETCH_POLL_SECONDS)
+        if stopped():
+            break
+        futures[get_process_pool().submit(
+            read_document, file_path, parallel=False, use_cache=False, max_bytes=max_bytes
+        )] = key
+    while futures:
+        if stopped():
+            for future in futures:
+                future.cancel()
+            break
+        collect(timeout=PREFETCH_POLL_SECONDS)
+    return extracted
@@ -0,0 +1,164 @@
+"""
+持久化的文本提取缓存：以文件内容哈希为键，把提取出的文本压缩后保存到 SQLite
+
+document_reader 的进程内缓存在应用重启后就失效，同一文件夹里的几百份 PDF 每天都要重新解析。
+这里的缓存跨进程、跨重启有效：
+
+- 键为 (提取逻辑版本, 扩展名, 文件内容) 的哈希：文件被复制、改名或移动后仍能命中，
+  提取逻辑变化（document_reader.EXTRACTOR_VERSION）时自动失效
+- 文本用 zlib 压缩存储（简历文本通常压缩到 1/3 左右），按压缩后的总大小做 LRU 淘汰；
+  总大小在内存中累计，超过上限时才扫描整张表，一次淘汰到上限的 EVICT_TARGET_RATIO
+- 另记 (路径, 修改时间, 大小) -> 哈希，未改动的文件直接查到键，不必重新读取整个文件计算哈希
+"""
+import os
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+from document_reader import EXTRACTOR_VERSION
+
+# 默认缓存上限（压缩后的字节数）
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_BYTES = 1024 * 1024
+# zlib 压缩级别：提取文本很短，压缩耗时远小于解析
+COMPRESS_LEVEL = 6
+# 超出上限时淘汰到上限的这一比例，避免缓存满后每次写入都触发淘汰
+EVICT_TARGET_RATIO = 0.9
+
+
+def content_key(file_path):
+    """按文件内容计算缓存键（同样的字节按不同扩展名提取结果不同，扩展名也计入）"""
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{EXTRACTOR_VERSION}:{os.path.splitext(file_path)[1].lower()}:".encode("utf-8"))
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionStore:
+    """基于 SQLite 的持久化提取缓存（线程安全）"""
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # 压缩后的总大小（字节），打开时统计一次，之后随写入和淘汰更新
+        self._total = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS texts (
+                key TEXT PRIMARY KEY,
+                text BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                chars INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_texts_accessed ON texts (accessed_at);
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                key TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+        self.evict()
+
+    def key(self, file_path):
+        """文件的缓存键：修改时间和大小没变时直接使用记录的哈希，否则重新计算"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT mtime_ns, size, key FROM files WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            return row[2]
+        key = content_key(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, mtime_ns, size, key) VALUES (?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, key)
+            )
+            self._conn.commit()
+        return key
+
+    def get(self, key):
+        """查找缓存，未命中返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM texts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE texts SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def contains(self, key):
+        """是否已缓存（不计入命中统计，也不更新访问时间）"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM texts WHERE key = ?", (key,)).fetchone() is not None
+
+    def put(self, key, text):
+        """写入缓存，并在超出容量时淘汰最久未访问的条目"""
+        data = zlib.compress(text.encode("utf-8"), COMPRESS_LEVEL)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM texts WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO texts (key, text, size, chars, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, data, len(data), len(text), now, now)
+            )
+            self._total += len(data) - (row[0] if row else 0)
+            if self.max_bytes and self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def evict(self):
+        """总大小超过上限时按最近访问时间淘汰，并清理指向已淘汰条目的文件记录"""
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """（持有锁时调用）重新统计总大小（其他进程也可能写入同一个缓存），超过上限时淘汰到上限以下留出余量"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+        if self.max_bytes and total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            rows = self._conn.execute("SELECT key, size FROM texts ORDER BY accessed_at").fetchall()
+            stale = []
+            for key, size in rows:
+                if total <= target:
+                    break
+                stale.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM texts WHERE key = ?", stale)
+            self._conn.execute("DELETE FROM files WHERE key NOT IN (SELECT key FROM texts)")
+        self._total = total
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            entries, total, chars = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(chars), 0) FROM texts"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+            "chars": chars,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
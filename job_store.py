@@ -0,0 +1,197 @@
+"""
+历史职位库：保存的岗位存放在 SQLite（WAL 模式）中，每个岗位有固定的编号
+
+新增、删除都只写一行，不再整体重写 job_history.json；列表查询不读取岗位原文，
+选中某个岗位时再按编号读取。第一次打开时自动导入旧的 job_history.json。
+
+名称、公司和岗位原文按 text_tokenizer 分词（保留停用词）后写入 FTS5 全文索引，搜索框输入
+即可检索；SQLite 不支持 FTS5，或搜索词无法分词（单个汉字、含数字）时该词退回 LIKE 查询。
+"""
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from text_tokenizer import tokenize
+
+# 列表查询返回的列（不含岗位原文）
+SUMMARY_COLUMNS = ("id", "name", "company", "timestamp")
+
+
+class JobStore:
+    """历史职位库（线程安全）"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                company TEXT NOT NULL,
+                content TEXT NOT NULL,
+                timestamp TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+        # 全文索引：rowid 与 jobs.id 一致，内容为分词后的词项。
+        # 在支持 FTS5 的环境中建过索引的数据库，换到不支持的 SQLite 时建表不报错、读取才报错
+        try:
+            self._conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(terms)")
+            indexed = self._conn.execute("SELECT COUNT(*) FROM jobs_fts").fetchone()[0]
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False
+        if self.full_text:
+            if indexed != self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]:
+                self._rebuild_full_text()
+        self._conn.commit()
+
+    @staticmethod
+    def _terms(name, company, content):
+        return " ".join(tokenize(f"{name} {company} {content}", stopwords=()))
+
+    def _rebuild_full_text(self):
+        """重建全文索引（旧版本的数据库没有全文索引）"""
+        self._conn.execute("DELETE FROM jobs_fts")
+        self._conn.executemany(
+            "INSERT INTO jobs_fts (rowid, terms) VALUES (?, ?)",
+            (
+                (row["id"], self._terms(row["name"], row["company"], row["content"]))
+                for row in self._conn.execute("SELECT id, name, company, content FROM jobs").fetchall()
+            )
+        )
+
+    def _index(self, job_id, name, company, content):
+        if self.full_text:
+            self._conn.execute(
+                "INSERT INTO jobs_fts (rowid, terms) VALUES (?, ?)", (job_id, self._terms(name, company, content))
+            )
+
+    def add(self, name, company, content, timestamp=None):
+        """保存一个岗位，返回其编号"""
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (name, company, content, timestamp) VALUES (?, ?, ?, ?)",
+                (name, company, content, timestamp)
+            )
+            self._index(cursor.lastrowid, name, company, content)
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def get(self, job_id):
+        """按编号读取完整的岗位（含原文），不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def delete(self, job_id):
+        """按编号删除岗位，返回是否删除了记录"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            if self.full_text:
+                self._conn.execute("DELETE FROM jobs_fts WHERE rowid = ?", (job_id,))
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def _conditions(self, query):
+        """
+        搜索条件（SQL 片段和参数）：每个空格分隔的词都要出现
+
+        能分词的词合并为一个 FTS5 查询，最后一个词按前缀匹配（边输入边搜索）；
+        其余的词按子串匹配名称、公司和岗位内容。
+        """
+        query = (query or "").strip()
+        if not query:
+            return [], []
+        conditions, params = [], []
+        match_terms = []
+        words = query.split()
+        for index, word in enumerate(words):
+            terms = tokenize(word, stopwords=())
+            if self.full_text and terms and not any(char.isdigit() for char in word):
+                quoted = ['"' + term.replace('"', '""') + '"' for term in terms]
+                if index == len(words) - 1:
+                    quoted[-1] += "*"
+                match_terms.extend(quoted)
+                continue
+            pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            conditions.append(
+                "(name LIKE ? ESCAPE '\\' OR company LIKE ? ESCAPE '\\' OR content LIKE ? ESCAPE '\\')"
+            )
+            params.extend([pattern, pattern, pattern])
+        if match_terms:
+            conditions.insert(0, "id IN (SELECT rowid FROM jobs_fts WHERE jobs_fts MATCH ?)")
+            params.insert(0, " ".join(match_terms))
+        return conditions, params
+
+    def list(self, limit=-1, after_id=None, query=None):
+        """
+        按保存顺序列出岗位（不含原文）
+
+        after_id: 只返回编号大于它的岗位，用于分页加载（不需要 OFFSET 扫描）
+        query: 按名称、公司和岗位内容搜索
+        """
+        conditions, params = self._conditions(query)
+        if after_id is not None:
+            conditions.append("id > ?")
+            params.append(after_id)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM jobs {where}ORDER BY id LIMIT ?",
+                params + [limit]
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, query=None):
+        conditions, params = self._conditions(query)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+    def import_json(self, json_path):
+        """
+        导入旧版 job_history.json（只导入一次），返回导入的条数
+
+        导入记录保存在 meta 表中，之后即使删除了全部岗位也不会重复导入。
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'imported_json'").fetchone():
+                return 0
+        history = []
+        if os.path.exists(json_path):
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    history = json.load(f)
+            except Exception as e:
+                print(f"读取旧历史记录失败: {str(e)}")
+                return 0
+        with self._lock:
+            for job in history:
+                if not isinstance(job, dict):
+                    continue
+                name = job.get("name") or "未命名职位"
+                company = job.get("company") or "未知公司"
+                content = job.get("content", "")
+                cursor = self._conn.execute(
+                    "INSERT INTO jobs (name, company, content, timestamp) VALUES (?, ?, ?, ?)",
+                    (name, company, content, job.get("timestamp") or datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+                self._index(cursor.lastrowid, name, company, content)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_json', ?)", (json_path,))
+            self._conn.commit()
+        return len(history)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,94 @@
+"""
+延迟导入：重量级依赖在第一次使用时才导入，缩短桌面应用的冷启动时间
+
+openai、httpx、PyPDF2、openpyxl、pandas 等库导入一次需要数百毫秒，而启动时一个都用不到
+（PyPDF2 只在读取 PDF 时使用，openpyxl 只在读取 .xlsx 时使用，pandas 只用于旧版 .xls；
+Word 文件用标准库解析，不需要额外的库）。jieba、tokenizers、sentence-transformers
+等可选依赖同样在第一次使用时才导入。
+
+- module_available(name)：只查找模块、不执行导入，用作 *_SUPPORT 能力探测
+- lazy_import(name)：返回代理对象，第一次访问属性时才导入真正的模块
+- warm_up(names)：在后台线程中提前导入（窗口显示之后），真正用到时不再等待
+
+每个模块的导入耗时记录在 import_times 中，供启动报告使用（见 benchmarks/startup.py）。
+"""
+import sys
+import time
+import importlib
+import importlib.util
+import threading
+
+# 模块名称 -> (导入耗时（秒）, 导入所在的线程名称)
+import_times = {}
+
+
+def module_available(name):
+    """模块是否已安装（不执行导入）"""
+    if name in sys.modules:
+        return sys.modules[name] is not None
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """模块代理：第一次访问属性时导入，之后直接转发到真正的模块（线程安全）"""
+    def __init__(self, name, on_load=None):
+        self._lazy_name = name
+        self._lazy_on_load = on_load
+        self._lazy_module = None
+        self._lazy_lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        """模块是否已经导入（不会触发导入）"""
+        return self._lazy_module is not None or sys.modules.get(self._lazy_name) is not None
+
+    def load(self):
+        """导入并返回真正的模块"""
+        module = self._lazy_module
+        if module is not None:
+            return module
+        with self._lazy_lock:
+            if self._lazy_module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self._lazy_name)
+                if self._lazy_on_load is not None:
+                    self._lazy_on_load(module)
+                import_times.setdefault(
+                    self._lazy_name, (time.perf_counter() - start, threading.current_thread().name)
+                )
+                self._lazy_module = module
+            return self._lazy_module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "已导入" if self._lazy_module is not None else "未导入"
+        return f"<LazyModule {self._lazy_name}（{state}）>"
+
+
+def lazy_import(name, on_load=None):
+    """返回延迟导入的模块代理；on_load 在模块导入后调用一次（如设置日志级别）"""
+    return LazyModule(name, on_load)
+
+
+def warm_up(modules):
+    """依次导入模块（LazyModule 或模块名），失败的跳过；返回 {名称: 耗时（秒）}"""
+    timings = {}
+    for module in modules:
+        start = time.perf_counter()
+        try:
+            if isinstance(module, LazyModule):
+                name = module._lazy_name
+                module.load()
+            else:
+                name = module
+                importlib.import_module(module)
+        except Exception as e:
+            print(f"预加载 {name} 失败: {str(e)}")
+            continue
+        timings[name] = time.perf_counter() - start
+    return timings
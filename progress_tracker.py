@@ -0,0 +1,189 @@
+"""
+事件驱动的分析进度与耗时估计
+
+进度不再按固定秒数猜测，而是由真实事件推动：请求已发送、收到首个 token、
+已收到的 token 数与预估 token 数之比、完成。每次分析结束后把首 token 时间、
+总耗时和输出 token 数记入 LatencyModel（按模型做指数滑动平均并持久化），
+下一次分析和批量任务据此给出剩余时间估计。
+"""
+import os
+import json
+import math
+import time
+import threading
+
+from analysis_prompt import MODEL_MAP
+
+# 指数滑动平均的平滑系数
+EWMA_ALPHA = 0.3
+
+# 没有历史数据时的默认估计：各模型（API 名称）的总耗时经验值（秒）
+DEFAULT_TOTAL_SECONDS = {
+    "deepseek-reasoner": 90,
+    "deepseek-chat": 60,
+}
+DEFAULT_OUTPUT_TOKENS = 2000
+DEFAULT_FIRST_TOKEN_RATIO = 0.2
+
+# 各阶段对应的进度百分比
+PROGRESS_REQUEST_SENT = 2
+PROGRESS_FIRST_TOKEN = 10
+PROGRESS_MAX_STREAMING = 95
+
+
+class LatencyModel:
+    """按模型学习历史耗时，用于估计进度和剩余时间（线程安全）"""
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._stats = json.load(f)
+            except Exception as e:
+                print(f"加载耗时统计失败: {str(e)}")
+
+    def _defaults(self, model):
+        """没有历史数据时按模型的经验值估计"""
+        total = DEFAULT_TOTAL_SECONDS.get(MODEL_MAP.get(model, model), 60)
+        return {
+            "first_token_seconds": total * DEFAULT_FIRST_TOKEN_RATIO,
+            "total_seconds": total,
+            "output_tokens": DEFAULT_OUTPUT_TOKENS,
+            "samples": 0,
+        }
+
+    def estimate(self, model):
+        """返回模型的耗时估计：首 token 秒数、总秒数、输出 token 数"""
+        with self._lock:
+            return dict(self._stats.get(model) or self._defaults(model))
+
+    def record(self, model, total_seconds, first_token_seconds=None, output_tokens=None):
+        """记录一次完成的分析"""
+        with self._lock:
+            stats = self._stats.get(model) or self._defaults(model)
+            # 第一个样本直接替换经验值，之后做滑动平均
+            alpha = 1.0 if stats["samples"] == 0 else EWMA_ALPHA
+            if first_token_seconds is None and stats["samples"] == 0:
+                # 非流式请求测不到首 token 时间，按比例从总耗时推算
+                first_token_seconds = total_seconds * DEFAULT_FIRST_TOKEN_RATIO
+            updates = {
+                "total_seconds": total_seconds,
+                "first_token_seconds": first_token_seconds,
+                "output_tokens": output_tokens,
+            }
+            for key, value in updates.items():
+                if value is not None:
+                    stats[key] = round(stats[key] + alpha * (value - stats[key]), 3)
+            stats["samples"] += 1
+            self._stats[model] = stats
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._stats, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"保存耗时统计失败: {str(e)}")
+
+
+class ProgressTracker:
+    """单次分析的进度：由请求事件驱动，通过回调报告 (百分比, 说明文字)"""
+    def __init__(self, model, latency_model, on_progress):
+        self.model = model
+        self.latency_model = latency_model
+        self.on_progress = on_progress
+        self.estimate = latency_model.estimate(model)
+        self.start_time = None
+        self.first_token_time = None
+        self.tokens = 0
+        self._last_percent = -1
+        self._last_detail = None
+
+    def _report(self, percent, detail):
+        # 百分比和文字都没有变化时不重复通知，避免刷屏
+        percent = int(percent)
+        if percent == self._last_percent and detail == self._last_detail:
+            return
+        self._last_percent = percent
+        self._last_detail = detail
+        self.on_progress(percent, detail)
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time if self.start_time else 0.0
+
+    def remaining_seconds(self):
+        """估计剩余秒数"""
+        if self.first_token_time is None:
+            return max(0.0, self.estimate["total_seconds"] - self.elapsed())
+        # 已开始输出：按当前的输出速度推算剩余 token 所需时间
+        streaming_time = time.monotonic() - self.first_token_time
+        remaining_tokens = max(0, self.estimate["output_tokens"] - self.tokens)
+        if self.tokens and streaming_time > 0:
+            return remaining_tokens / (self.tokens / streaming_time)
+        return max(0.0, self.estimate["total_seconds"] - self.elapsed())
+
+    def request_sent(self):
+        """请求已发出"""
+        self.start_time = time.monotonic()
+        first_token = self.estimate["first_token_seconds"]
+        self._report(PROGRESS_REQUEST_SENT, f"等待模型响应，预计 {first_token:.0f} 秒后开始输出")
+
+    def tokens_received(self, count=1):
+        """收到 count 个 token（流式输出时每个增量约为一个 token）"""
+        if self.first_token_time is None:
+            self.first_token_time = time.monotonic()
+        self.tokens += count
+        ratio = min(1.0, self.tokens / max(1, self.estimate["output_tokens"]))
+        percent = PROGRESS_FIRST_TOKEN + (PROGRESS_MAX_STREAMING - PROGRESS_FIRST_TOKEN) * ratio
+        self._report(percent, f"正在生成，预计剩余 {self.remaining_seconds():.0f} 秒")
+
+    def completed(self, output_tokens=None):
+        """分析完成，记录本次耗时供以后估计"""
+        first_token_seconds = None
+        if self.first_token_time is not None:
+            first_token_seconds = self.first_token_time - self.start_time
+        self.latency_model.record(
+            self.model,
+            self.elapsed(),
+            first_token_seconds=first_token_seconds,
+            output_tokens=output_tokens or self.tokens or None
+        )
+        self._report(100, f"完成，用时 {self.elapsed():.0f} 秒")
+
+
+class BatchProgress:
+    """批量任务的整体进度与剩余时间估计"""
+    def __init__(self, total, max_in_flight, model, latency_model):
+        self.total = total
+        self.max_in_flight = max_in_flight
+        self.model = model
+        self.latency_model = latency_model
+        self.completed = 0
+        # 被本地预筛选淘汰、没有调用大模型的条目
+        self.skipped = 0
+        self.start_time = time.monotonic()
+
+    def item_done(self):
+        self.completed += 1
+
+    def item_skipped(self):
+        self.completed += 1
+        self.skipped += 1
+
+    def remaining_seconds(self):
+        """估计剩余秒数：完成足够多的条目后按实际完成速率估计，否则按历史平均耗时估计"""
+        remaining = self.total - self.completed
+        if remaining <= 0:
+            return 0.0
+        elapsed = time.monotonic() - self.start_time
+        analyzed = self.completed - self.skipped
+        if analyzed >= min(self.max_in_flight, 3) and elapsed > 0:
+            return remaining / (analyzed / elapsed)
+        waves = math.ceil(remaining / self.max_in_flight)
+        return waves * self.latency_model.estimate(self.model)["total_seconds"]
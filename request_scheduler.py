@@ -0,0 +1,253 @@
+"""
+请求调度器：位于 DeepSeek 客户端之前，控制发往 API 的请求节奏
+
+- 令牌桶限流：每分钟请求数（RPM）和每分钟 token 数（TPM）
+- 优先级通道：界面上的交互式分析优先于批量任务
+- 按模型的并发上限
+- 429 / 5xx / 网络错误时按指数退避 + 随机抖动重试，优先遵守 Retry-After；
+  收到 429 时整个调度器暂停相应时间，避免错误风暴
+
+调度器的所有方法都在共享客户端的事件循环中运行（见 deepseek_client.py）。
+"""
+import time
+import heapq
+import random
+import asyncio
+import itertools
+
+from token_budget import count_message_tokens
+from deepseek_client import OPENAI_SUPPORT, openai
+
+# 优先级：数值越小越先执行
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# 默认限流配置，可通过 settings.json 的 "rate_limits" 或命令行参数覆盖
+DEFAULT_SCHEDULER_CONFIG = {
+    "requests_per_minute": 600,
+    "tokens_per_minute": None,
+    "model_concurrency": {
+        "deepseek-reasoner": 32,
+        "deepseek-chat": 64,
+    },
+    "default_concurrency": 32,
+    "max_retries": 5,
+    "backoff_base": 1.0,
+    "backoff_max": 60.0,
+}
+
+DEFAULT_OUTPUT_TOKENS = 2000
+
+
+def estimate_request_tokens(messages, max_output_tokens=DEFAULT_OUTPUT_TOKENS, prompt_tokens=None):
+    """
+    估算一次请求消耗的 token 数（输入 + 预计输出）
+
+    prompt_tokens 为构建消息时已统计的输入 token 数（见 token_budget.py），未提供时现场计数
+    """
+    if prompt_tokens is None:
+        prompt_tokens = count_message_tokens(messages)
+    return int(prompt_tokens + max_output_tokens)
+
+
+def is_retryable(error):
+    """是否值得重试：限流、服务端 5xx、超时和连接错误"""
+    if not OPENAI_SUPPORT or not openai.loaded:
+        return False
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def retry_after_seconds(error):
+    """从错误响应的 Retry-After 头读取建议等待秒数，没有时返回 None"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """令牌桶：容量为每分钟额度，按秒匀速补充；rate_per_minute 为 None 时不限流"""
+    def __init__(self, rate_per_minute):
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60.0)
+        self.updated_at = now
+
+    def wait_time(self, amount):
+        """还需等待多少秒才能取出 amount 个令牌（0 表示现在就可以）"""
+        if self.capacity is None:
+            return 0.0
+        self._refill()
+        # 单次请求超过桶容量时按装满计算，避免永远等待
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60.0 / self.capacity
+
+    def consume(self, amount):
+        """
+        取出令牌（可以为负数，用于按实际用量退还或补扣），返回实际取出的数量
+
+        单次最多取出桶容量；退还后令牌数不超过桶容量。
+        """
+        if self.capacity is None:
+            return 0
+        self._refill()
+        amount = min(amount, self.capacity)
+        self.tokens = min(self.capacity, self.tokens - amount)
+        return amount
+
+
+class RequestScheduler:
+    """带限流、优先级和重试的请求调度器"""
+    def __init__(self, **config):
+        unknown = set(config) - set(DEFAULT_SCHEDULER_CONFIG)
+        if unknown:
+            raise ValueError(f"未知的调度器配置: {', '.join(sorted(unknown))}")
+        self.config = dict(DEFAULT_SCHEDULER_CONFIG, **config)
+        self.request_bucket = TokenBucket(self.config["requests_per_minute"])
+        self.token_bucket = TokenBucket(self.config["tokens_per_minute"])
+        self._in_flight = {}
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._paused_until = 0.0
+        self._wakeup = None
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0, "failed": 0}
+
+    def concurrency_limit(self, model):
+        """模型的并发上限"""
+        return self.config["model_concurrency"].get(model, self.config["default_concurrency"])
+
+    def _dispatch(self):
+        """按优先级放行等待中的请求"""
+        loop = asyncio.get_running_loop()
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            self._wakeup = loop.call_later(pause, self._dispatch)
+            return
+
+        blocked_models = set()
+        skipped = []
+        while self._waiters:
+            priority, sequence, model, tokens, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            if model in blocked_models or self._in_flight.get(model, 0) >= self.concurrency_limit(model):
+                # 该模型并发已满，先放行其他模型的请求
+                blocked_models.add(model)
+                skipped.append((priority, sequence, model, tokens, future))
+                continue
+            wait = max(self.request_bucket.wait_time(1), self.token_bucket.wait_time(tokens))
+            if wait > 0:
+                # 限流额度不足：保留队首，不让低优先级请求插队
+                skipped.append((priority, sequence, model, tokens, future))
+                self._wakeup = loop.call_later(wait, self._dispatch)
+                break
+            self.request_bucket.consume(1)
+            # 放行时把实际预留的 token 数交给调用方，之后按它修正
+            reserved = self.token_bucket.consume(tokens)
+            self._in_flight[model] = self._in_flight.get(model, 0) + 1
+            future.set_result(reserved)
+        for item in skipped:
+            heapq.heappush(self._waiters, item)
+
+    async def _acquire(self, model, tokens, priority):
+        """等待放行，返回在 TPM 令牌桶中实际预留的 token 数"""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), model, tokens, future))
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            # 已被放行但调用方已取消，需要归还并发名额
+            if future.done() and not future.cancelled():
+                self._release(model)
+            raise
+
+    def _release(self, model):
+        self._in_flight[model] -= 1
+        self._dispatch()
+
+    def _backoff(self, attempt, error):
+        """计算重试前的等待时间：优先 Retry-After，否则指数退避 + 全抖动"""
+        delay = retry_after_seconds(error)
+        if delay is None:
+            ceiling = min(self.config["backoff_max"], self.config["backoff_base"] * (2 ** attempt))
+            delay = random.uniform(0, ceiling)
+        return delay
+
+    async def call(self, request_factory, model, estimated_tokens=DEFAULT_OUTPUT_TOKENS,
+                   priority=PRIORITY_INTERACTIVE, on_retry=None, usage_of=None):
+        """
+        在限流和并发限制下执行请求，失败时按需重试
+
+        request_factory: 无参函数，每次调用返回一个新的协程（重试时需要重新创建请求）
+        on_retry: 可选回调 (第几次重试, 等待秒数, 异常)
+        返回值可带 usage 属性，用于按实际 token 用量修正 TPM 额度；流式请求返回的是文本，
+        usage 在最后一个数据块中，由 usage_of(返回值) 取得。
+        """
+        attempt = 0
+        while True:
+            reserved = await self._acquire(model, estimated_tokens, priority)
+            try:
+                self.stats["requests"] += 1
+                result = await request_factory()
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.config["max_retries"]:
+                    self.stats["failed"] += 1
+                    raise
+                delay = self._backoff(attempt, e)
+                if OPENAI_SUPPORT and openai.loaded and isinstance(e, openai.RateLimitError):
+                    # 限流时整体暂停，所有请求一起等待
+                    self.stats["rate_limited"] += 1
+                    self._paused_until = max(self._paused_until, time.monotonic() + delay)
+                error = e
+            else:
+                usage = usage_of(result) if usage_of is not None else getattr(result, "usage", None)
+                if usage is not None and getattr(usage, "total_tokens", None):
+                    # 按放行时实际预留的数量修正（预估值超过桶容量时预留的只是容量）
+                    self.token_bucket.consume(usage.total_tokens - reserved)
+                return result
+            finally:
+                self._release(model)
+
+            attempt += 1
+            self.stats["retries"] += 1
+            if on_retry:
+                on_retry(attempt, delay, error)
+            await asyncio.sleep(delay)
+
+
+_scheduler = None
+_scheduler_config = {}
+
+
+def configure_request_scheduler(**config):
+    """设置共享调度器的配置，需在第一次 get_request_scheduler() 之前调用"""
+    if _scheduler is not None:
+        raise RuntimeError("请求调度器已创建，无法再修改配置")
+    _scheduler_config.update(config)
+
+
+def get_request_scheduler():
+    """获取进程内共享的请求调度器（只应在客户端事件循环中使用）"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RequestScheduler(**_scheduler_config)
+    return _scheduler
@@ -0,0 +1,152 @@
+"""
+分析结果缓存：以 (岗位, 简历, 模型, 提示词版本, 提示词预算配置) 的内容哈希为键，持久化到 SQLite
+
+同一份简历对同一个岗位重复分析时直接返回上次的结果，不再调用 API。预算配置（token 上限、
+压缩规则版本）改变后，按截断或压缩方式不同的提示词得到的旧结果不再命中。
+缓存按总大小（最近最少使用优先淘汰）和存活时间淘汰。总大小在内存中累计，
+只有超过上限时才扫描整张表淘汰（一次淘汰到上限的 EVICT_TARGET_RATIO），写入不随条目数变慢。
+"""
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from analysis_prompt import PROMPT_VERSION
+from token_budget import get_prompt_budgeter
+
+# 默认缓存上限
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_DAYS = 30
+# 超出上限时淘汰到上限的这一比例，留出余量，避免缓存满后每次写入都触发淘汰
+EVICT_TARGET_RATIO = 0.9
+
+
+def normalize_text(text):
+    """规范化文本：统一换行、去掉行尾空白和多余空行，避免无意义的差异导致缓存未命中"""
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = [re.sub(r'[ \t　]+', ' ', line).strip() for line in text.split('\n')]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def make_cache_key(job_info, resume_info, model, prompt_version=PROMPT_VERSION, budget=None):
+    """计算缓存键；budget 为提示词预算配置的签名，默认取共享预算器的配置"""
+    if budget is None:
+        budget = get_prompt_budgeter().signature
+    payload = json.dumps(
+        [normalize_text(job_info), normalize_text(resume_info), model, prompt_version, budget],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """基于 SQLite 的分析结果缓存（线程安全）"""
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 3600 if max_age_days else None
+        self.hits = 0
+        self.misses = 0
+        # 缓存条目的总大小（字节），打开时统计一次，之后随写入和删除更新
+        self._total = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, job_info, resume_info, model):
+        """查找缓存，未命中或已过期返回 None"""
+        key = make_cache_key(job_info, resume_info, model)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.max_age and now - row[1] > self.max_age):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, job_info, resume_info, model, result):
+        """写入缓存，并在超出容量时淘汰旧条目"""
+        key = make_cache_key(job_info, resume_info, model)
+        size = len(result.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, model, result, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, result, size, now, now)
+            )
+            self._total += size - (row[0] if row else 0)
+            if self.max_bytes and self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def invalidate(self, job_info, resume_info, model):
+        """删除指定条目（强制刷新时使用）"""
+        key = make_cache_key(job_info, resume_info, model)
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total -= row[0]
+
+    def evict(self):
+        """删除过期条目，并在总大小超过上限时按最近访问时间淘汰"""
+        with self._lock:
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """（持有锁时调用）重新统计总大小（其他进程也可能写入同一个缓存），超过上限时淘汰到上限以下留出余量"""
+        if self.max_age:
+            self._conn.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if self.max_bytes and total > self.max_bytes:
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed_at").fetchall()
+            stale = []
+            for key, size in rows:
+                if total <= target:
+                    break
+                stale.append((key,))
+                total -= size
+            self._conn.executemany("DELETE FROM results WHERE key = ?", stale)
+        self._total = total
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
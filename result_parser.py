@@ -0,0 +1,141 @@
+"""
+分析结果解析：从模型输出中提取结构化评分
+
+提示词要求模型在回答末尾输出一个 JSON 代码块汇总评分；优先解析该代码块，
+模型没有按要求输出（或旧版本的结果）时，退回按文字匹配各项分数和推荐级别。
+"""
+import re
+import json
+
+# 评分字段：字段名 -> (JSON 中的键, 正文中的关键词)
+SCORE_FIELDS = {
+    "relevant_ratio": ("相关经验占比", r"相关经验(?:占比|百分比)"),
+    "tech_stack": ("核心技术栈匹配度", r"核心技术栈匹配度?"),
+    "direction": ("职位方向匹配性", r"职位方向匹配性?"),
+    "timeline": ("相关经验时间线", r"相关经验时间线"),
+    "project_ability": ("项目复杂度和专业能力", r"项目复杂度和专业能力|项目复杂度"),
+    "overall": ("总体匹配分数", r"总体匹配(?:分数|度|评分)|综合(?:匹配)?(?:分数|评分)"),
+}
+
+# 推荐级别，从高到低，对应的最低分数
+RECOMMENDATION_LEVELS = (
+    ("强烈推荐", 95),
+    ("推荐", 80),
+    ("中性/待定", 60),
+    ("不推荐", 40),
+    ("完全不推荐", 0),
+)
+
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.S)
+# 关键词和分数之间的括号说明，如模型照抄评分规则时的"（0-100）""（满分100）"，其中的数字不是分数
+_SCORE_NOTE = r"[（(][^（()）\n]{0,20}?(?:\d\s*[-~～至到—]\s*\d|满分)[^（()）\n]{0,20}?[）)]"
+_RECOMMENDATION_RE = re.compile(r"【\s*(强烈推荐|完全不推荐|不推荐|推荐|中性\s*/\s*待定|中性|待定)\s*】")
+
+
+def _to_score(value):
+    """把 "88"、"88分"、88.0 等转换为 0-100 的数字，无法识别时返回 None"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        match = re.search(r"\d+(?:\.\d+)?", str(value))
+        if not match:
+            return None
+        number = float(match.group())
+    return number if 0 <= number <= 100 else None
+
+
+def _normalize_level(level):
+    """统一推荐级别的写法"""
+    if not level:
+        return None
+    level = re.sub(r"[\s【】\[\]]", "", str(level))
+    if level in ("中性", "待定", "中性待定"):
+        return "中性/待定"
+    return level if level in dict(RECOMMENDATION_LEVELS) else None
+
+
+def level_for_score(score):
+    """根据总分推出推荐级别"""
+    if score is None:
+        return None
+    for level, minimum in RECOMMENDATION_LEVELS:
+        if score >= minimum:
+            return level
+    return RECOMMENDATION_LEVELS[-1][0]
+
+
+def _parse_json_block(text):
+    """解析最后一个含总体匹配分数的 JSON 代码块"""
+    for block in reversed(_JSON_BLOCK_RE.findall(text)):
+        try:
+            data = json.loads(block)
+        except ValueError:
+            continue
+        if isinstance(data, dict) and SCORE_FIELDS["overall"][0] in data:
+            return data
+    return None
+
+
+def _search_score(text, pattern):
+    """在正文中查找 "关键词……数字" 形式的分数（跳过分数范围等括号说明），取最后一次出现（通常是最终结论）"""
+    matches = re.findall(
+        rf"(?:{pattern})(?:{_SCORE_NOTE}|[^0-9\n]){{0,30}}?(\d{{1,3}}(?:\.\d+)?)\s*(?:分|%|/\s*100)?", text
+    )
+    for value in reversed(matches):
+        score = _to_score(value)
+        if score is not None:
+            return score
+    return None
+
+
+def parse_scores(text):
+    """
+    从分析结果中提取评分，返回字典：
+    relevant_ratio / tech_stack / direction / timeline / project_ability / overall 为 0-100 的数字，
+    recommendation 为推荐级别；无法识别的项为 None
+    """
+    text = text or ""
+    scores = dict.fromkeys(SCORE_FIELDS)
+    scores["recommendation"] = None
+
+    data = _parse_json_block(text)
+    if data is not None:
+        for field, (key, _) in SCORE_FIELDS.items():
+            scores[field] = _to_score(data.get(key))
+        scores["recommendation"] = _normalize_level(data.get("推荐级别"))
+
+    for field, (_, pattern) in SCORE_FIELDS.items():
+        if scores[field] is None:
+            scores[field] = _search_score(text, pattern)
+
+    if scores["recommendation"] is None:
+        # 模板中列出了全部级别，优先取"最终推荐"之后第一次出现的标记
+        start = text.find("最终推荐")
+        match = _RECOMMENDATION_RE.search(text, start if start >= 0 else 0) or _RECOMMENDATION_RE.search(text)
+        if match:
+            scores["recommendation"] = _normalize_level(match.group(1))
+    if scores["recommendation"] is None:
+        scores["recommendation"] = level_for_score(scores["overall"])
+    return scores
+
+
+def guess_job_title(job_info, default="未知职位"):
+    """从岗位信息中猜测职位名称（含"职位"或"岗位"的第一行）"""
+    for line in (job_info or "").split('\n'):
+        if "职位" in line or "岗位" in line:
+            title = line.split('：')[-1].strip()
+            if title:
+                return title
+    return default
+
+
+def guess_candidate_name(resume_info, default="未知候选人"):
+    """从简历信息中猜测候选人姓名（含"姓名"的第一行）"""
+    for line in (resume_info or "").split('\n'):
+        if "姓名" in line:
+            name = line.split('：')[-1].strip()
+            if name:
+                return name
+    return default
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+分析结果库：每次分析的结构化评分和原文保存在 SQLite（WAL 模式）中
+
+按 (岗位, 简历, 模型) 去重，同一组合重新分析时覆盖旧结果。岗位按规范化后的内容
+哈希归类，(岗位, 总分) 上有索引，按分数给一个岗位的候选人排序只需一次索引扫描。
+
+命令行查询某个岗位的候选人排名：
+    python result_store.py job.txt -n 20 --min-score 80
+"""
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+
+from result_cache import normalize_text
+from result_parser import SCORE_FIELDS, guess_candidate_name, guess_job_title, parse_scores
+
+# 评分列（与 result_parser.SCORE_FIELDS 一致）
+SCORE_COLUMNS = tuple(SCORE_FIELDS)
+
+# 列表查询返回的列（不含分析原文）
+SUMMARY_COLUMNS = (
+    "id", "job_title", "candidate", "resume_path", "model",
+) + SCORE_COLUMNS + ("recommendation", "created_at")
+
+
+def content_key(text):
+    """规范化后的内容哈希，用于识别同一岗位 / 同一简历"""
+    return hashlib.sha256(normalize_text(text or "").encode('utf-8')).hexdigest()
+
+
+class ResultStore:
+    """分析结果库（线程安全）"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL 模式下读写互不阻塞，批量写入时界面仍可查询
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        score_columns = "".join(f"{column} REAL,\n                " for column in SCORE_COLUMNS)
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS analyses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_key TEXT NOT NULL,
+                resume_key TEXT NOT NULL,
+                model TEXT NOT NULL,
+                job_title TEXT,
+                candidate TEXT,
+                resume_path TEXT,
+                {score_columns}recommendation TEXT,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                UNIQUE (job_key, resume_key, model)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analyses_job_overall ON analyses (job_key, overall DESC)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_created ON analyses (created_at)")
+        self._conn.commit()
+
+    def add(self, job_info, resume_info, model, result, resume_path=None, job_title=None, candidate=None):
+        """解析并保存一次分析结果，返回解析出的评分"""
+        scores = parse_scores(result)
+        row = {
+            "job_key": content_key(job_info),
+            "resume_key": content_key(resume_info),
+            "model": model,
+            "job_title": job_title or guess_job_title(job_info),
+            "candidate": candidate or guess_candidate_name(resume_info),
+            "resume_path": resume_path,
+            "recommendation": scores["recommendation"],
+            "result": result,
+            "created_at": time.time(),
+        }
+        row.update((column, scores[column]) for column in SCORE_COLUMNS)
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        updates = ", ".join(
+            f"{column} = excluded.{column}" for column in row if column not in ("job_key", "resume_key", "model")
+        )
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO analyses ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT (job_key, resume_key, model) DO UPDATE SET {updates}",
+                tuple(row.values())
+            )
+            self._conn.commit()
+        return scores
+
+    def top(self, job_info=None, job_key=None, limit=20, min_score=None, recommendation=None, model=None):
+        """按总分从高到低返回某个岗位的候选人（不含分析原文）"""
+        if job_key is None:
+            job_key = content_key(job_info)
+        conditions = ["job_key = ?"]
+        params = [job_key]
+        if min_score is not None:
+            conditions.append("overall >= ?")
+            params.append(min_score)
+        if recommendation:
+            conditions.append("recommendation = ?")
+            params.append(recommendation)
+        if model:
+            conditions.append("model = ?")
+            params.append(model)
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM analyses WHERE {' AND '.join(conditions)} "
+                "ORDER BY overall DESC LIMIT ?",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get(self, analysis_id):
+        """返回一条完整记录（含分析原文），不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM analyses WHERE id = ?", (analysis_id,)).fetchone()
+        return dict(row) if row else None
+
+    def jobs(self):
+        """所有岗位及其分析数量，按最近分析时间排序"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_key, MAX(job_title) AS job_title, COUNT(*) AS analyses, MAX(created_at) AS last_at "
+                "FROM analyses GROUP BY job_key ORDER BY last_at DESC"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def format_score(value):
+    return "-" if value is None else f"{value:g}"
+
+
+def main(argv=None):
+    from document_reader import read_document
+
+    parser = argparse.ArgumentParser(description="按分数查询某个岗位的候选人排名")
+    parser.add_argument("job", help="岗位描述文件")
+    parser.add_argument("-n", "--limit", type=int, default=20, help="返回条数")
+    parser.add_argument("--min-score", type=float, default=None, help="最低总分")
+    parser.add_argument("--recommendation", default=None, help="只看指定推荐级别，如 推荐")
+    parser.add_argument(
+        "--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "analysis_results.db"),
+        help="结果库路径"
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"结果库不存在: {args.db}", file=sys.stderr)
+        return 1
+
+    store = ResultStore(args.db)
+    try:
+        start_time = time.perf_counter()
+        rows = store.top(read_document(args.job), limit=args.limit, min_score=args.min_score,
+                         recommendation=args.recommendation)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+    finally:
+        store.close()
+
+    for rank, row in enumerate(rows, 1):
+        print(f"{rank:>3}. {format_score(row['overall']):>5}  {row['recommendation'] or '-':<6} "
+              f"{row['candidate']}  {row['resume_path'] or ''}")
+    print(f"共 {len(rows)} 条，查询用时 {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+简历去重：提取后的文本规范化，以及基于 MinHash 的近似重复检测
+
+同一位候选人经常通过不同渠道重复投递，或者同一份简历同时有 PDF 和 Word 两个版本，
+每一份都完整调用一次大模型。分析之前：
+
+1. normalize_resume()：全角字母数字、全角空格转为半角，再按 token_budget.compact_text
+   合并空白、去掉页码、分隔线和反复出现的页眉页脚
+2. 为简历计算 MinHash 签名（128 个 32 位最小哈希，约 0.5KB）：文本统一大小写、只保留
+   字母数字和汉字（排版、标点、换行方式不同的两个版本得到相同的字符序列），按 5 字 shingle 哈希
+3. DuplicateIndex 把签名按 LSH 分成 16 段，每段的哈希作为桶写入 SQLite；查找时只查询
+   16 个桶，与库中的简历数量无关，再用签名估计 Jaccard 相似度确认
+
+库中只保存每组重复简历中第一次出现的那份（代表）及其规范化文本（压缩存储）。找到代表时，
+批量引擎直接复用同一次运行中代表的结果；代表是以前分析过的，就改用代表的文本分析，命中结果缓存。
+
+命令行：
+    python resume_dedup.py ./resumes                 # 列出目录中的重复简历（不调用 API）
+    python resume_dedup.py ./resumes --threshold 0.8
+"""
+import os
+import sys
+import re
+import time
+import zlib
+import sqlite3
+import hashlib
+import argparse
+import threading
+import unicodedata
+
+import numpy as np
+
+from token_budget import compact_text
+
+# MinHash 签名长度，以及 LSH 的分段数 × 每段行数（= 签名长度）
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+# shingle 长度（字符）
+SHINGLE_CHARS = 5
+# 估计的 Jaccard 相似度不低于该值时视为重复
+DEFAULT_THRESHOLD = 0.95
+# 计算签名时每次处理的 shingle 数，限制中间矩阵的大小
+SIGNATURE_CHUNK = 4096
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# 固定种子：签名要写入数据库，不同进程、不同版本必须一致
+_rng = np.random.RandomState(20240601)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)[:, None]
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)[:, None]
+# shingle 多项式哈希的基数
+_SHINGLE_BASE = np.uint64(1000003)
+
+# 全角字母、数字、空格 -> 半角（中文标点保持不变）
+_HALF_WIDTH = {code: code - 0xFEE0 for code in range(0xFF10, 0xFF1A)}
+_HALF_WIDTH.update({code: code - 0xFEE0 for code in range(0xFF21, 0xFF3B)})
+_HALF_WIDTH.update({code: code - 0xFEE0 for code in range(0xFF41, 0xFF5B)})
+_HALF_WIDTH[0x3000] = ord(" ")
+# 计算指纹时只保留的字符
+_FINGERPRINT_DROP_RE = re.compile(r"[^0-9a-z一-鿿]+")
+
+
+def normalize_resume(text):
+    """规范化提取出的简历文本：全角字母数字转半角，合并空白，去掉页码和页眉页脚"""
+    return compact_text((text or "").translate(_HALF_WIDTH))
+
+
+def fingerprint_text(text):
+    """计算指纹用的字符序列：兼容字符分解、统一小写，只保留字母数字和汉字"""
+    return _FINGERPRINT_DROP_RE.sub("", unicodedata.normalize("NFKC", text or "").casefold())
+
+
+def _shingle_hashes(chars):
+    """所有 SHINGLE_CHARS 字 shingle 的 32 位哈希（去重），用 NumPy 滚动计算"""
+    codes = np.frombuffer(chars.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    width = min(SHINGLE_CHARS, len(codes))
+    count = len(codes) - width + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    # 无符号整数溢出即取模 2^64
+    with np.errstate(over="ignore"):
+        for offset in range(width):
+            hashes = hashes * _SHINGLE_BASE + codes[offset:offset + count]
+    return np.unique((hashes ^ (hashes >> np.uint64(32))) & _MAX_HASH)
+
+
+def minhash_signature(text):
+    """
+    简历的 MinHash 签名（NUM_PERMUTATIONS 个 uint32），没有可用字符时返回 None
+
+    两份简历签名中相等位置的比例即为 shingle 集合 Jaccard 相似度的估计。
+    """
+    chars = fingerprint_text(text)
+    if not chars:
+        return None
+    hashes = _shingle_hashes(chars)
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for start in range(0, len(hashes), SIGNATURE_CHUNK):
+            chunk = hashes[start:start + SIGNATURE_CHUNK][None, :]
+            permuted = ((_PERM_A * chunk + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+    return signature.astype(np.uint32)
+
+
+def similarity(signature, other):
+    """两个签名估计的 Jaccard 相似度"""
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+def _band_buckets(signature):
+    """LSH：每段签名的哈希（有符号 64 位整数，可直接存入 SQLite）"""
+    data = signature.astype("<u4").tobytes()
+    size = LSH_ROWS * 4
+    return [
+        int.from_bytes(hashlib.blake2b(data[band * size:(band + 1) * size], digest_size=8).digest(), "little",
+                       signed=True)
+        for band in range(LSH_BANDS)
+    ]
+
+
+class DuplicateIndex:
+    """持久化的简历指纹库，按 LSH 分桶查找近似重复（线程安全）"""
+    def __init__(self, path, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT NOT NULL UNIQUE,
+                digest TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                text BLOB NOT NULL,
+                added_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_fingerprints_digest ON fingerprints (digest);
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_bands_id ON bands (id);
+        """)
+        self._conn.commit()
+
+    def _duplicate(self, row, score):
+        return {"key": row[0], "similarity": round(score, 4), "text": zlib.decompress(row[1]).decode("utf-8")}
+
+    def _find(self, key, digest, signature, buckets, threshold):
+        """查找与签名相似的代表（调用方持有锁）"""
+        row = self._conn.execute(
+            "SELECT key, text FROM fingerprints WHERE digest = ? AND key != ? LIMIT 1", (digest, key)
+        ).fetchone()
+        if row is not None:
+            return self._duplicate(row, 1.0)
+        candidates = set()
+        for band, bucket in enumerate(buckets):
+            candidates.update(
+                hit[0] for hit in self._conn.execute(
+                    "SELECT id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+                )
+            )
+        best, best_score = None, threshold
+        for candidate in candidates:
+            row = self._conn.execute(
+                "SELECT key, text, signature FROM fingerprints WHERE id = ? AND key != ?", (candidate, key)
+            ).fetchone()
+            if row is None:
+                continue
+            score = similarity(signature, np.frombuffer(row[2], dtype="<u4"))
+            if score >= best_score:
+                best, best_score = row, score
+        return None if best is None else self._duplicate(best, best_score)
+
+    def match(self, key, text, threshold=None):
+        """
+        查找 text 的近似重复，返回 {"key": 代表的标识, "similarity": 相似度, "text": 代表的规范化文本}
+
+        没有重复时把这份简历登记为代表（同一 key 内容变化时更新），返回 None。
+        key 一般为文件的绝对路径或表格行的标识。
+        """
+        signature = minhash_signature(text)
+        if signature is None:
+            return None
+        digest = hashlib.sha1(fingerprint_text(text).encode("utf-8")).hexdigest()
+        buckets = _band_buckets(signature)
+        with self._lock:
+            duplicate = self._find(key, digest, signature, buckets, self.threshold if threshold is None else threshold)
+            if duplicate is not None:
+                return duplicate
+            existing = self._conn.execute("SELECT id, digest FROM fingerprints WHERE key = ?", (key,)).fetchone()
+            if existing is not None:
+                if existing[1] == digest:
+                    return None
+                self._conn.execute("DELETE FROM bands WHERE id = ?", (existing[0],))
+                self._conn.execute("DELETE FROM fingerprints WHERE id = ?", (existing[0],))
+            cursor = self._conn.execute(
+                "INSERT INTO fingerprints (key, digest, signature, text, added_at) VALUES (?, ?, ?, ?, ?)",
+                (key, digest, signature.astype("<u4").tobytes(), zlib.compress(text.encode("utf-8")), time.time())
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, id) VALUES (?, ?, ?)",
+                ((band, bucket, cursor.lastrowid) for band, bucket in enumerate(buckets))
+            )
+            self._conn.commit()
+        return None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    from batch_matcher import collect_resume_files
+    from document_reader import read_document
+
+    parser = argparse.ArgumentParser(description="列出重复的简历（本地计算，不调用 API）")
+    parser.add_argument("resumes", help="简历目录、单个文件或通配符")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="视为重复的最低相似度（0-1）")
+    args = parser.parse_args(argv)
+
+    paths = collect_resume_files(args.resumes)
+    if not paths:
+        parser.error(f"未找到简历文件: {args.resumes}")
+    index = DuplicateIndex(":memory:", threshold=args.threshold)
+    duplicates = 0
+    for path in paths:
+        try:
+            text = normalize_resume(read_document(path))
+        except Exception as e:
+            print(f"读取失败 {path}: {str(e)}", file=sys.stderr)
+            continue
+        duplicate = index.match(os.path.abspath(path), text)
+        if duplicate is not None:
+            duplicates += 1
+            print(f"{path}\t与 {duplicate['key']} 重复（相似度 {duplicate['similarity']:.2f}）")
+    print(f"共 {len(paths)} 份简历，{duplicates} 份重复", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+简历库：所有读取过的简历原文和倒排索引（词项 → 简历）保存在 SQLite 中
+
+界面和批量引擎每提取一份简历就增量写入简历库。加载岗位时直接在库中按 BM25 检索，
+几毫秒内给出候选人名单，不需要重新读取任何文件。倒排表在第一次检索时载入内存，
+之后的写入和删除同步更新内存中的索引（新增的倒排项先记在列表中，检索时每个词项合并一次）。
+
+指定了语义向量索引（semantic_index.SemanticIndex）时，简历同时编码为向量，检索可以按
+BM25（关键词）、semantic（向量余弦相似度）或 hybrid（两者归一化后加权）排序。
+
+命令行：
+    python resume_index.py job.txt -n 20                # 在简历库中检索候选人（hybrid）
+    python resume_index.py job.txt --method bm25        # 只按关键词检索
+    python resume_index.py job.txt --add ./resumes      # 先把目录中的简历加入简历库
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+
+import numpy as np
+
+from result_parser import guess_candidate_name
+from result_store import content_key
+from text_tokenizer import extract_skills, tokenize
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 检索时最多使用的岗位词项数（按 idf 取区分度最高的部分）
+MAX_QUERY_TERMS = 128
+# 检索方式
+SEARCH_METHODS = ("bm25", "semantic", "hybrid")
+# hybrid 检索中向量相似度的权重
+DEFAULT_SEMANTIC_WEIGHT = 0.5
+
+
+def default_vectors_dir(path):
+    """简历库对应的向量索引目录（与数据库文件放在一起）"""
+    return os.path.splitext(path)[0] + "_vectors"
+
+
+def open_resume_index(path, semantic=True, embedding_model=None):
+    """打开简历库，semantic 为 True 时同时打开对应的语义向量索引"""
+    semantic_index = None
+    if semantic:
+        from semantic_index import SemanticIndex, get_embedder
+        semantic_index = SemanticIndex(default_vectors_dir(path), get_embedder(embedding_model))
+    return ResumeIndex(path, semantic_index=semantic_index)
+
+
+class ResumeIndex:
+    """持久化的简历库和倒排索引（线程安全）"""
+    def __init__(self, path, semantic_index=None):
+        self.path = path
+        self.semantic_index = semantic_index
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS resumes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL UNIQUE,
+                content_key TEXT NOT NULL,
+                candidate TEXT,
+                skills TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_resumes_content ON resumes (content_key);
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                resume_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, resume_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_resume ON postings (resume_id);
+        """)
+        self._conn.commit()
+        # 内存中的倒排表：词项 -> (简历编号数组, 词频数组)，第一次检索时载入
+        self._postings = None
+        self._lengths = None
+        # 载入后新增、尚未合并进数组的倒排项：词项 -> ([简历编号], [词频])
+        self._pending = {}
+
+    def add(self, path, text):
+        """
+        把一份简历加入简历库，返回其编号
+
+        同一路径内容未变时直接返回；路径相同内容变化时重建该简历的索引；
+        内容相同的简历换了路径时只更新路径。
+        """
+        if not text or not text.strip():
+            return None
+        path = os.path.abspath(path)
+        key = content_key(text)
+        with self._lock:
+            known = self._known(path, key)
+        if known is not None:
+            return known
+
+        # 分词和编码向量是 CPU 计算，在持有锁之前完成，不阻塞其他线程的检索
+        terms = tokenize(text)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        candidate = guess_candidate_name(text)
+        skills = " ".join(sorted(extract_skills(text, terms)))
+        vector = self.semantic_index.embed(text) if self.semantic_index is not None else None
+
+        with self._lock:
+            # 编码期间其他线程可能已加入同一份简历
+            known = self._known(path, key)
+            if known is not None:
+                return known
+            row = self._conn.execute("SELECT id FROM resumes WHERE path = ?", (path,)).fetchone()
+            if row is not None:
+                self._delete(row["id"])
+            cursor = self._conn.execute(
+                "INSERT INTO resumes (path, content_key, candidate, skills, length, text, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, key, candidate, skills, len(terms), text, time.time())
+            )
+            resume_id = cursor.lastrowid
+            self._conn.executemany(
+                "INSERT INTO postings (term, resume_id, tf) VALUES (?, ?, ?)",
+                ((term, resume_id, tf) for term, tf in counts.items())
+            )
+            self._conn.commit()
+            if self._postings is not None:
+                self._add_to_memory(resume_id, len(terms), counts)
+            if vector is not None:
+                self.semantic_index.add_vector(resume_id, vector)
+            return resume_id
+
+    def _known(self, path, key):
+        """
+        已收录时返回编号（调用方持有锁）：同一路径内容未变，或内容相同的简历换了路径（只更新路径）；
+        否则返回 None
+        """
+        row = self._conn.execute("SELECT id, content_key FROM resumes WHERE path = ?", (path,)).fetchone()
+        if row is not None and row["content_key"] == key:
+            return row["id"]
+        moved = self._conn.execute("SELECT id, path FROM resumes WHERE content_key = ?", (key,)).fetchone()
+        if moved is None:
+            return None
+        if row is not None:
+            self._delete(row["id"])
+        self._conn.execute("UPDATE resumes SET path = ? WHERE id = ?", (path, moved["id"]))
+        self._conn.commit()
+        return moved["id"]
+
+    def _delete(self, resume_id):
+        """删除一份简历（调用方持有锁），同时从内存中的倒排表移除"""
+        if self._postings is not None:
+            terms = [row[0] for row in self._conn.execute(
+                "SELECT term FROM postings WHERE resume_id = ?", (resume_id,)
+            )]
+            self._remove_from_memory(resume_id, terms)
+        self._conn.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+        self._conn.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
+        if self.semantic_index is not None:
+            self.semantic_index.remove(resume_id)
+
+    def remove(self, path):
+        """从简历库中删除指定路径的简历"""
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM resumes WHERE path = ?", (os.path.abspath(path),)).fetchone()
+            if row is None:
+                return False
+            self._delete(row["id"])
+            self._conn.commit()
+            return True
+
+    def _grow_lengths(self, size):
+        if size > len(self._lengths):
+            lengths = np.zeros(max(size, len(self._lengths) * 2), dtype=np.float64)
+            lengths[:len(self._lengths)] = self._lengths
+            self._lengths = lengths
+
+    def _add_to_memory(self, resume_id, length, counts):
+        self._grow_lengths(resume_id + 1)
+        self._lengths[resume_id] = length
+        for term, tf in counts.items():
+            pending = self._pending.get(term)
+            if pending is None:
+                self._pending[term] = ([resume_id], [tf])
+            else:
+                pending[0].append(resume_id)
+                pending[1].append(tf)
+
+    def _merge_pending(self):
+        """把新增的倒排项合并进数组（调用方持有锁），连续写入多份简历时每个词项只拼接一次"""
+        for term, (ids, tfs) in self._pending.items():
+            ids = np.array(ids, dtype=np.int64)
+            tfs = np.array(tfs, dtype=np.float64)
+            entry = self._postings.get(term)
+            if entry is not None:
+                ids = np.concatenate((entry[0], ids))
+                tfs = np.concatenate((entry[1], tfs))
+            self._postings[term] = (ids, tfs)
+        self._pending = {}
+
+    def _remove_from_memory(self, resume_id, terms):
+        self._merge_pending()
+        for term in terms:
+            entry = self._postings.get(term)
+            if entry is None:
+                continue
+            keep = entry[0] != resume_id
+            if keep.any():
+                self._postings[term] = (entry[0][keep], entry[1][keep])
+            else:
+                del self._postings[term]
+        if resume_id < len(self._lengths):
+            self._lengths[resume_id] = 0
+
+    def _load(self):
+        """把倒排表载入内存（调用方持有锁）"""
+        max_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM resumes").fetchone()[0]
+        self._lengths = np.zeros(max_id + 1, dtype=np.float64)
+        for resume_id, length in self._conn.execute("SELECT id, length FROM resumes"):
+            self._lengths[resume_id] = length
+
+        postings = {}
+        term, ids, tfs = None, [], []
+        for row_term, resume_id, tf in self._conn.execute("SELECT term, resume_id, tf FROM postings ORDER BY term"):
+            if row_term != term:
+                if term is not None:
+                    postings[term] = (np.array(ids, dtype=np.int64), np.array(tfs, dtype=np.float64))
+                term, ids, tfs = row_term, [], []
+            ids.append(resume_id)
+            tfs.append(tf)
+        if term is not None:
+            postings[term] = (np.array(ids, dtype=np.int64), np.array(tfs, dtype=np.float64))
+        self._postings = postings
+        self._pending = {}
+
+    def warm_up(self):
+        """
+        提前把倒排表载入内存（可在后台线程调用），之后的检索只需几毫秒；
+        同时为还没有向量的简历补充编码（例如刚启用语义索引或更换了向量模型）
+        """
+        with self._lock:
+            if self._postings is None:
+                self._load()
+            if self.semantic_index is None:
+                return
+            missing = set(int(resume_id) for resume_id in np.flatnonzero(self._lengths > 0))
+        missing = sorted(missing - self.semantic_index.keys())
+        # 分批编码，编码期间不持有锁，界面上的检索不会被阻塞
+        for start in range(0, len(missing), 256):
+            batch = missing[start:start + 256]
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, text FROM resumes WHERE id IN ({', '.join('?' for _ in batch)})", batch
+                ).fetchall()
+            self.semantic_index.add_many((row["id"], row["text"]) for row in rows)
+        self.semantic_index.flush()
+
+    def flush(self):
+        """把语义向量索引中未同步的写入写回磁盘"""
+        if self.semantic_index is not None:
+            self.semantic_index.flush()
+
+    def _semantic_scores(self, job_info, size):
+        """按简历编号排列的向量余弦相似度"""
+        keys, similarities = self.semantic_index.similarities(job_info)
+        scores = np.zeros(size)
+        inside = keys < size
+        scores[keys[inside]] = similarities[inside]
+        return scores
+
+    def search(self, job_info, limit=20, min_score=None, method="hybrid", semantic_weight=DEFAULT_SEMANTIC_WEIGHT):
+        """
+        检索与岗位最相关的简历（不含原文）
+
+        method 为 bm25 / semantic / hybrid，未启用语义索引时都按 bm25 检索；hybrid 的分数为
+        (1 - semantic_weight) * BM25 / 最高 BM25 + semantic_weight * 余弦相似度，范围 0-1。
+        返回字典列表：id、path、candidate、score、matched_skills（语义检索时另有 similarity），
+        按 score 从高到低排列
+        """
+        if method not in SEARCH_METHODS:
+            raise ValueError(f"不支持的检索方式: {method}")
+        if self.semantic_index is None:
+            method = "bm25"
+        job_terms = tokenize(job_info)
+        job_skills = extract_skills(job_info, job_terms)
+        with self._lock:
+            if self._postings is None:
+                self._load()
+            self._merge_pending()
+            lengths = self._lengths
+            indexed = lengths > 0
+            count = int(np.count_nonzero(indexed))
+            if count == 0:
+                return []
+            average_length = lengths[indexed].mean()
+
+            query = []
+            for term in set(job_terms):
+                entry = self._postings.get(term)
+                if entry is not None:
+                    df = len(entry[0])
+                    query.append((np.log(1.0 + (count - df + 0.5) / (df + 0.5)), entry))
+            # 只保留区分度最高的词项，常见词对排序几乎没有贡献
+            query.sort(key=lambda item: -item[0])
+
+            scores = np.zeros(len(lengths))
+            norms = BM25_K1 * (1.0 - BM25_B + BM25_B * lengths / average_length)
+            for idf, (ids, tfs) in query[:MAX_QUERY_TERMS]:
+                scores[ids] += idf * tfs * (BM25_K1 + 1.0) / (tfs + norms[ids])
+
+            similarity = None
+            if method != "bm25":
+                similarity = self._semantic_scores(job_info, len(lengths))
+                if method == "semantic":
+                    scores = np.where(indexed, similarity, 0.0)
+                else:
+                    best = scores.max()
+                    keyword = scores / best if best > 0 else scores
+                    scores = np.where(
+                        indexed, (1.0 - semantic_weight) * keyword + semantic_weight * similarity, 0.0
+                    )
+
+            candidates = np.flatnonzero(scores > (min_score if min_score is not None else 0.0))
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+            if len(candidates) == 0:
+                return []
+
+            placeholders = ", ".join("?" for _ in candidates)
+            rows = {
+                row["id"]: row for row in self._conn.execute(
+                    f"SELECT id, path, candidate, skills FROM resumes WHERE id IN ({placeholders})",
+                    [int(resume_id) for resume_id in candidates]
+                )
+            }
+
+        results = []
+        for resume_id in candidates:
+            row = rows.get(int(resume_id))
+            if row is None:
+                continue
+            result = {
+                "id": row["id"],
+                "path": row["path"],
+                "candidate": row["candidate"],
+                "score": round(float(scores[resume_id]), 3),
+                "matched_skills": sorted(job_skills & set(row["skills"].split())),
+            }
+            if similarity is not None:
+                result["similarity"] = round(float(similarity[resume_id]), 3)
+            results.append(result)
+        return results
+
+    def get_text(self, resume_id):
+        """返回简历原文，不存在时返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM resumes WHERE id = ?", (resume_id,)).fetchone()
+        return row["text"] if row else None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def close(self):
+        """同步（并压缩）向量索引，关闭数据库连接"""
+        if self.semantic_index is not None:
+            self.semantic_index.close()
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    from document_reader import read_document
+
+    parser = argparse.ArgumentParser(description="在简历库中检索与岗位最相关的候选人")
+    parser.add_argument("job", help="岗位描述文件")
+    parser.add_argument("-n", "--limit", type=int, default=20, help="返回条数")
+    parser.add_argument("--method", default="hybrid", choices=SEARCH_METHODS, help="检索方式")
+    parser.add_argument("--embedding-model", default=None, help="本地 sentence-transformers 模型目录（默认使用哈希向量）")
+    parser.add_argument("--add", default=None, help="检索前先加入简历库的简历目录、文件或通配符")
+    parser.add_argument(
+        "--db", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "resume_index.db"),
+        help="简历库路径"
+    )
+    args = parser.parse_args(argv)
+
+    index = open_resume_index(args.db, semantic=args.method != "bm25", embedding_model=args.embedding_model)
+    try:
+        if args.add:
+            from batch_matcher import collect_resume_files
+            for path in collect_resume_files(args.add):
+                try:
+                    index.add(path, read_document(path))
+                except Exception as e:
+                    print(f"读取失败 {path}: {str(e)}", file=sys.stderr)
+
+        job_info = read_document(args.job)
+        index.warm_up()
+        start_time = time.perf_counter()
+        rows = index.search(job_info, limit=args.limit, method=args.method)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        total = index.count()
+    finally:
+        index.close()
+
+    for rank, row in enumerate(rows, 1):
+        print(f"{rank:>3}. {row['score']:>7.3f}  {row['candidate']}  {row['path']}  "
+              f"{' '.join(row['matched_skills'])}")
+    print(f"简历库共 {total} 份，返回 {len(rows)} 条，检索用时 {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,63 @@
 import sys
 import os
 import json
+import asyncio
 import threading
 import time
+
+# 启动计时的起点：本模块开始导入的时刻
+STARTUP_STARTED = time.perf_counter()
+
+import itertools
+import functools
 import traceback
+import multiprocessing
+import concurrent.futures
 from datetime import datetime
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QPushButton, QTextEdit, QLineEdit, QComboBox, 
     QProgressBar, QFileDialog, QMessageBox, QFrame, QListWidget,
     QSplitter, QGroupBox, QGridLayout, QCheckBox, QScrollArea,
-    QDialog, QFormLayout, QListWidgetItem, QListView
+    QDialog, QFormLayout, QListWidgetItem, QListView, QTabWidget, QTableView, QHeaderView,
+    QAbstractItemView
+)
+from PySide6.QtCore import (
+    Qt, QTimer, Signal, Slot, QSize, QObject, QAbstractListModel, QAbstractTableModel, QModelIndex
 )
-from PySide6.QtCore import Qt, QTimer, Signal, Slot, QSize, QThread
 from PySide6.QtGui import QFont, QColor, QPalette, QIcon, QTextCursor, QFontDatabase
 
-# 导入 OpenAI
-try:
-    from openai import OpenAI
-    OPENAI_SUPPORT = True
-except ImportError:
-    OPENAI_SUPPORT = False
+from document_reader import (
+    UnsupportedDocumentError, get_extractor, prefetch_documents, read_document, set_extraction_store,
+    supported_extensions
+)
+from document_reader import OPENPYXL_SUPPORT, PDF_SUPPORT, PyPDF2, openpyxl
+from analysis_prompt import resolve_model
+from deepseek_client import (
+    OPENAI_SUPPORT, configure_client_pool, get_client_pool, get_key_validator, is_auth_error, openai
+)
+from result_cache import ResultCache
+from result_store import ResultStore, format_score
+from resume_index import open_resume_index
+from resume_dedup import DEFAULT_THRESHOLD as DEFAULT_DEDUP_THRESHOLD, DuplicateIndex, normalize_resume
+from job_store import JobStore
+from extraction_store import ExtractionStore
+from result_parser import guess_candidate_name, guess_job_title, parse_scores
+from progress_tracker import LatencyModel, ProgressTracker
+from usage_stats import UsageStats, format_cache_usage, format_token_estimate
+from token_budget import configure_prompt_budget, format_budget, get_prompt_budgeter
+from lazy_import import import_times, warm_up
+from request_scheduler import (
+    PRIORITY_INTERACTIVE, configure_request_scheduler, estimate_request_tokens, get_request_scheduler
+)
 
-# 尝试导入文件处理相关库
-try:
-    import PyPDF2
-    PDF_SUPPORT = True
-except ImportError:
-    PDF_SUPPORT = False
+# 启动各阶段距 STARTUP_STARTED 的秒数
+startup_times = {"imports": time.perf_counter() - STARTUP_STARTED}
 
-try:
-    import docx
-    DOCX_SUPPORT = True
-except ImportError:
-    DOCX_SUPPORT = False
 
-try:
-    import pandas as pd
-    EXCEL_SUPPORT = True
-except ImportError:
-    EXCEL_SUPPORT = False
+def mark_startup(name):
+    """记录一个启动阶段的完成时刻"""
+    startup_times.setdefault(name, time.perf_counter() - STARTUP_STARTED)
 
 def get_resource_path(relative_path):
     """获取资源文件的绝对路径"""
@@ -56,6 +74,29 @@ def get_resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+# 流式输出时向界面推送文本的最小间隔（秒），避免每个 token 都刷新一次界面
+STREAM_FLUSH_INTERVAL = 0.1
+# 默认同时进行的分析数（超出的排队等待）
+DEFAULT_MAX_CONCURRENT_ANALYSES = 4
+# 分析队列中条目的状态
+STATUS_PENDING = "等待中"
+STATUS_RUNNING = "分析中"
+STATUS_DONE = "已完成"
+STATUS_CACHED = "缓存结果"
+STATUS_FAILED = "失败"
+STATUS_STOPPED = "已停止"
+# 与队列中未完成的一项内容相同，等它完成后直接使用它的结果
+STATUS_WAITING = "等待重复项"
+STATUS_DUPLICATE = "重复简历"
+FINISHED_STATUSES = (STATUS_DONE, STATUS_CACHED, STATUS_FAILED, STATUS_STOPPED, STATUS_DUPLICATE)
+API_KEY_INVALID_ERROR = "API密钥无效"
+# 历史职位列表每次加载的行数
+HISTORY_PAGE_SIZE = 200
+# 启动时预先读取上次使用的简历文件夹，最多读取的文件数
+PREFETCH_MAX_FILES = 500
+# 历史职位搜索框停止输入多久后开始搜索（毫秒）
+HISTORY_SEARCH_DELAY_MS = 250
+
 class SaveJobDialog(QDialog):
     """保存职位对话框"""
     def __init__(self, parent=None):
@@ -88,219 +129,846 @@ class SaveJobDialog(QDialog):
             "company": self.company_name_input.text()
         }
 
+class JobListModel(QAbstractListModel):
+    """历史职位列表模型：按需分页从职位库读取名称，不读取岗位原文"""
+    def __init__(self, job_store, parent=None):
+        super().__init__(parent)
+        self.job_store = job_store
+        self.query = ""
+        self._jobs = []
+        self._exhausted = False
+    
+    def set_query(self, query):
+        """按搜索词重新加载（只加载第一页）"""
+        self.beginResetModel()
+        self.query = query
+        self._jobs = []
+        self._exhausted = False
+        self.endResetModel()
+        if self.canFetchMore(QModelIndex()):
+            self.fetchMore(QModelIndex())
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._jobs)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        job = self._jobs[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{job['name']} - {job['company']}"
+        if role == Qt.ToolTipRole:
+            return f"保存于 {job['timestamp']}"
+        if role == Qt.UserRole:
+            return job["id"]
+        return None
+    
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+    
+    def fetchMore(self, parent=QModelIndex()):
+        """滚动到底部时由视图调用，加载下一页"""
+        if parent.isValid():
+            return
+        after_id = self._jobs[-1]["id"] if self._jobs else None
+        try:
+            jobs = self.job_store.list(limit=HISTORY_PAGE_SIZE, after_id=after_id, query=self.query)
+        except Exception as e:
+            print(f"读取历史记录失败: {str(e)}")
+            jobs = []
+        if len(jobs) < HISTORY_PAGE_SIZE:
+            self._exhausted = True
+        if jobs:
+            self.beginInsertRows(QModelIndex(), len(self._jobs), len(self._jobs) + len(jobs) - 1)
+            self._jobs.extend(jobs)
+            self.endInsertRows()
+    
+    def remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._jobs[row]
+        self.endRemoveRows()
+
 class LoadJobDialog(QDialog):
-    """加载职位对话框"""
-    def __init__(self, job_history, parent=None):
+    """加载历史职位对话框：分页列表 + 输入即搜索，选中后才读取并预览岗位原文"""
+    def __init__(self, job_store, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("加载历史职位")
-        self.setMinimumWidth(400)
-        self.setMinimumHeight(300)
+        self.job_store = job_store
+        self.setWindowTitle("历史职位列表")
+        self.setMinimumWidth(600)
+        self.setMinimumHeight(400)
         
         layout = QVBoxLayout(self)
         
-        self.job_list = QListWidget()
-        self.job_list.itemDoubleClicked.connect(self.accept)
-        layout.addWidget(self.job_list)
-        
-        # 添加历史职位到列表
-        for job in job_history:
-            item = QListWidgetItem(f"{job['name']} - {job['company']}")
-            item.setData(Qt.UserRole, job)
-            self.job_list.addItem(item)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("搜索岗位名称、公司或内容…")
+        self.search_input.setClearButtonEnabled(True)
+        layout.addWidget(self.search_input)
+        
+        # 停止输入一段时间后再搜索，避免每个字符都查询一次
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(HISTORY_SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        
+        content_layout = QHBoxLayout()
+        self.model = JobListModel(job_store, self)
+        self.job_list = QListView()
+        self.job_list.setModel(self.model)
+        self.job_list.setUniformItemSizes(True)
+        self.job_list.setSelectionMode(QListView.SingleSelection)
+        self.job_list.doubleClicked.connect(self.accept)
+        self.job_list.selectionModel().currentChanged.connect(self.show_preview)
+        content_layout.addWidget(self.job_list, 1)
+        
+        self.preview = QTextEdit()
+        self.preview.setReadOnly(True)
+        self.preview.setPlaceholderText("选中职位后显示岗位内容")
+        content_layout.addWidget(self.preview, 1)
+        layout.addLayout(content_layout)
+        
+        self.count_label = QLabel()
+        self.count_label.setStyleSheet("color: #666;")
+        layout.addWidget(self.count_label)
         
         button_layout = QHBoxLayout()
-        self.load_button = QPushButton("加载")
+        self.load_button = QPushButton("加载选中职位")
         self.load_button.clicked.connect(self.accept)
+        self.delete_button = QPushButton("删除选中职位")
+        self.delete_button.clicked.connect(self.delete_selected_job)
         self.cancel_button = QPushButton("取消")
         self.cancel_button.clicked.connect(self.reject)
         
         button_layout.addWidget(self.load_button)
+        button_layout.addWidget(self.delete_button)
         button_layout.addWidget(self.cancel_button)
         layout.addLayout(button_layout)
+        
+        self.apply_search()
+    
+    def apply_search(self):
+        """按当前搜索词重新加载列表"""
+        self.preview.clear()
+        self.model.set_query(self.search_input.text())
+        self.update_count()
+    
+    def update_count(self):
+        """显示职位总数（搜索时为匹配的数量）"""
+        query = self.model.query
+        try:
+            total = self.job_store.count(query)
+        except Exception as e:
+            self.count_label.setText(f"搜索失败：{str(e)}")
+            return
+        self.count_label.setText(f"找到 {total} 个职位" if query.strip() else f"共 {total} 个职位")
+    
+    def show_preview(self, current, previous=None):
+        """选中职位时按编号读取岗位原文"""
+        if not current.isValid():
+            self.preview.clear()
+            return
+        job = self.job_store.get(current.data(Qt.UserRole))
+        self.preview.setPlainText(job["content"] if job else "")
+    
+    def delete_selected_job(self):
+        """按编号删除选中的职位"""
+        index = self.job_list.currentIndex()
+        if not index.isValid():
+            QMessageBox.warning(self, "提示", "请先选择要删除的职位")
+            return
+        try:
+            self.job_store.delete(index.data(Qt.UserRole))
+        except Exception as e:
+            QMessageBox.warning(self, "错误", f"删除历史记录失败：{str(e)}")
+            return
+        self.model.remove_row(index.row())
+        # 已加载的行删完时继续加载下一页
+        if self.model.rowCount() == 0 and self.model.canFetchMore():
+            self.model.fetchMore()
+        self.update_count()
+    
+    def accept(self):
+        if not self.job_list.currentIndex().isValid():
+            QMessageBox.warning(self, "提示", "请先选择要加载的职位")
+            return
+        super().accept()
     
     def get_selected_job(self):
-        """获取选中的职位"""
-        if self.job_list.currentItem():
-            return self.job_list.currentItem().data(Qt.UserRole)
-        return None
+        """获取选中职位的编号"""
+        index = self.job_list.currentIndex()
+        return index.data(Qt.UserRole) if index.isValid() else None
+
+def lower_thread_priority():
+    """降低当前线程的调度优先级（Linux 上线程可以单独设置 nice 值，其他平台忽略）"""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class DocumentLoader(QObject):
+    """文档加载器：在线程池中提取文本，完成后通过信号通知界面"""
+    # 用途（"job"/"resume"）, 文件路径, 文本
+    loaded = Signal(str, str, str)
+    # 批量添加的简历：文件路径, 规范化后的文本, 近似重复的代表（resume_dedup.DuplicateIndex.match 的结果或 None）
+    queue_loaded = Signal(str, str, object)
+    # 用途, 文件路径, 错误信息
+    failed = Signal(str, str, str)
+    # 后台预热完成：文件夹, 新提取的文件数
+    prefetched = Signal(str, int)
+    
+    def __init__(self, max_workers=2, parent=None):
+        super().__init__(parent)
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="document-loader"
+        )
+        # 简历库：读取的简历同时加入倒排索引
+        self.resume_index = None
+        # 简历指纹库：批量添加的简历在这里检测近似重复
+        self.dedup_index = None
+        # 后台预热使用单独的低优先级线程，不占用读取用户所选文件的线程
+        self._prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="document-prefetch", initializer=lower_thread_priority
+        )
+        # 用户读取文件或关闭窗口时停止进行中的预热
+        self._prefetch_stop = threading.Event()
+    
+    def load(self, purpose, file_path):
+        """提交提取任务；进行中的后台预热随即停止，把进程池让给用户选择的文件"""
+        self._prefetch_stop.set()
+        self.executor.submit(self._load, purpose, file_path)
+    
+    def prefetch(self, folder, max_files=None):
+        """在后台提前提取文件夹（不含子文件夹）中的文档，写入持久化提取缓存"""
+        self._prefetch_stop = threading.Event()
+        self._prefetch_executor.submit(self._prefetch, folder, max_files, self._prefetch_stop)
+    
+    def _prefetch(self, folder, max_files, stop):
+        try:
+            extensions = supported_extensions()
+            paths = sorted(
+                entry.path for entry in os.scandir(folder)
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in extensions
+            )
+            # 在本线程（低优先级）中逐个提取：交给进程池的话，进程池若由这里创建，
+            # 工作进程会继承低优先级，之后用户打开的文件也在这些进程中解析
+            count = prefetch_documents(paths[:max_files], stop=stop, parallel=False)
+        except Exception as e:
+            print(f"预先读取 {folder} 失败: {str(e)}")
+            return
+        self.prefetched.emit(folder, count)
+    
+    def _load(self, purpose, file_path):
+        duplicate = None
+        try:
+            text = read_document(file_path)
+            if purpose in ("resume", "queue"):
+                text = normalize_resume(text)
+            if purpose == "queue" and self.dedup_index is not None:
+                duplicate = self.dedup_index.match(os.path.abspath(file_path), text)
+        except Exception as e:
+            self.failed.emit(purpose, file_path, str(e))
+            return
+        if purpose == "queue":
+            self.queue_loaded.emit(file_path, text, duplicate)
+        else:
+            self.loaded.emit(purpose, file_path, text)
+        if purpose in ("resume", "queue") and self.resume_index is not None:
+            try:
+                self.resume_index.add(file_path, text)
+            except Exception as e:
+                print(f"加入简历库失败: {str(e)}")
+    
+    def shutdown(self):
+        """关闭线程池，不等待正在进行的任务"""
+        self._prefetch_stop.set()
+        self._prefetch_executor.shutdown(wait=False)
+        self.executor.shutdown(wait=False)
 
-class AnalysisWorker(QThread):
-    """分析工作线程"""
+class AnalysisWorker(QObject):
+    """分析任务：在共享的客户端事件循环中执行，不单独占用线程"""
     progress_updated = Signal(int)
+    # 进度说明（当前阶段和预计剩余时间）
+    progress_detail = Signal(str)
     analysis_completed = Signal(str)
     analysis_error = Signal(str)
+    # API密钥无效（认证失败）
+    api_key_invalid = Signal()
+    # 流式输出：分析结果增量 / R1 思考过程增量
+    content_received = Signal(str)
+    reasoning_received = Signal(str)
     
-    def __init__(self, job_info, resume_info, api_key, model_name):
+    def __init__(self, job_info, resume_info, api_key, model_name, result_cache=None, stream=True,
+                 latency_model=None, usage_stats=None):
         super().__init__()
         self.job_info = job_info
         self.resume_info = resume_info
         self.api_key = api_key
         self.model_name = model_name
+        self.result_cache = result_cache
+        self.stream = stream
+        self.latency_model = latency_model or LatencyModel()
+        self.usage_stats = usage_stats or UsageStats()
+        # 最近一次请求的 usage（流式请求在流结束时返回）
+        self.usage = None
+        # 提示词预算（本地估算的 token 数、是否截断）和记录的用量（含估算值）
+        self.budget = None
+        self.usage_record = None
         self.is_running = True
+        # 事件循环中正在执行的分析任务（concurrent.futures.Future），停止时取消
+        self._request_future = None
         
-        # 初始化 OpenAI 客户端
+        # 使用进程内共享的 DeepSeek 客户端连接池
         if not OPENAI_SUPPORT:
             raise ImportError("OpenAI package is not installed")
-        self.client = OpenAI(
-            api_key=self.api_key,
-            base_url="https://api.deepseek.com/v1"
-        )
+        self.client_pool = get_client_pool()
+        self.key_validator = get_key_validator()
+    
+    def start(self):
+        """把分析任务提交到共享事件循环"""
+        self._request_future = self.client_pool.submit(self.run_async())
     
-    def run(self):
+    def isRunning(self):
+        """分析任务是否仍在进行"""
+        return self._request_future is not None and not self._request_future.done()
+    
+    def wait(self, msecs=None):
+        """等待分析任务结束"""
+        if self._request_future is None:
+            return True
         try:
-            # 构建提示词
-            prompt = f"""
-            请详细分析以下岗位信息和简历信息的匹配程度，特别注重以下内容：
-
-            1. 核心技术栈匹配度：
-               - 重点关注岗位所需的关键技术和工具
-               - 只要简历中提及了相关技术即可，不要求详细展开
-               - 考虑替代性技术和可迁移技能
-
-            2. 职位方向匹配性：
-               - 评估候选人过往工作方向与目标职位的匹配度
-               - 区分相似技术栈但不同职位方向（如DevOps vs SRE，自动化运维 vs 云计算平台工程师）
-               - 考虑岗位实际工作内容、项目职责与候选人经验的一致性
-               - 评分修正规则：如果最近2-3年在知名公司（大厂、行业有影响力的公司、知名的初创企业、公认技术能力强的企业等）具有高匹配工作经验，则对扣分进行60%的衰减。例如：如果原始评分为100-20=80分，修正后为100-(20*0.6)=88分
-
-            3. 相关经验时间线分析：
-               - 请分别分析候选人职业生涯中的每一段工作经历，判断每段经历与目标岗位的相关性
-               - 对每段经历单独标注为"高度相关"、"部分相关"或"不相关"
-               - 计算相关经验（高度相关+部分相关）占总工作经验的百分比
-               - 考虑相关经验在时间线上的位置：
-                 * 如果最近的经历相关性高，这是有利因素
-                 * 如果最近的经历不相关，但早期有相关经历，这是不利因素
-                 * 如果早期经历不相关，需要额外减分（支付"不相关经验成本"）
-               - 评分修正规则：如果最近2-3年在知名公司具有高匹配工作经验，则对扣分进行60%的衰减。例如：如果原始评分为100-20=80分，修正后为100-(20*0.6)=88分
-
-            4. 项目复杂度和难度：
-               - 评估简历中项目的复杂程度
-               - 如果使用相同技术，更复杂、难度更高的项目应当获得更高评分
-               - 考虑项目规模、挑战性和完成的职责
-
-            5. 专业能力评估：
-               - 关注核心专业技能而非次要或辅助技能
-               - 对于简历书写不够详细但方向匹配的情况给予适当容忍
-
-            分析输出格式：
-            1. 首先列出候选人的工作经历时间线，并对每段经历的相关性进行明确判断
-            2. 计算相关经验占比及其在时间线上的分布
-            3. 给出核心技术栈匹配度评分(0-100)
-            4. 给出职位方向匹配性评分(0-100)
-            5. 给出相关经验时间线评分(0-100)
-            6. 给出项目复杂度和专业能力匹配评分(0-100)
-            7. 根据以上各项计算总体匹配分数(0-100)
-
-            最终推荐：
-            1. 明确表明这位候选人是否适合进一步推进（面试/下一轮），使用明确的推荐级别标记：
-               - 【强烈推荐】- 95分及以上，非常适合，应立即安排面试
-               - 【推荐】- 80-94分，适合，值得进一步考虑
-               - 【中性/待定】- 60-79分，存在疑问点，需要更多信息
-               - 【不推荐】- 40-59分，不太适合，但可能有部分相关背景
-               - 【完全不推荐】- 低于40分，明显不合适，方向错误
-            2. 如果不推荐推进或匹配度较低，请用非技术人员(HR/猎头)能理解的语言说明方向偏差
-            3. 提供1-2句建议，帮助招聘人员进一步搜寻更合适的候选人
-
-            ==============================================
-            推荐给客户的评语（独立部分，且仅在评分80分以上触发）：
-            请单独提供一段不超过6点的正面评价，每点评价大于20字避免过于精简，用于向客户推荐候选人。这部分评价应该：
-            1. 完全独立于上述分析结果
-            2. 以正面信息为主
-            3. 包括以下方面（如果适用）：
-               a. 学历优势
-               b. 知名公司工作经验（如果工作方向高度匹配）
-               c. 技术栈匹配性（针对岗位要求的技术栈）
-               d. 其他优势
-            4. 即使候选人在其他方面存在不足，这部分评价也应聚焦于其优势，除非不足的地方可以自圆其说且很容易被企业方接受，否则不要冒险提出不足之处。
-
-            ==============================================
-            岗位信息：
-            {self.job_info}
-            
-            简历信息：
-            {self.resume_info}
-            """
-            
-            # 根据选择的模型确定API端点和进度更新速度
-            if self.model_name == "DeepSeek R1":
-                model = "deepseek-reasoner"
-                total_steps = 90  # R1模型大约需要90秒
-            else:  # DeepSeek V3
-                model = "deepseek-chat"
-                total_steps = 60  # V3模型大约需要60秒
+            self._request_future.result(None if msecs is None else msecs / 1000)
+        except concurrent.futures.TimeoutError:
+            return False
+        except Exception:
+            pass
+        return True
+    
+    def report_progress(self, percent, detail):
+        """ProgressTracker 回调：转发为 Qt 信号"""
+        if self.is_running:
+            self.progress_updated.emit(percent)
+            self.progress_detail.emit(detail)
+    
+    async def stream_analysis(self, model, messages, tracker):
+        """流式调用API，按批次发送增量文本，返回完整的分析结果"""
+        content_parts = []
+        pending_content = []
+        pending_reasoning = []
+        pending_tokens = 0
+        last_flush = time.monotonic()
+        
+        def flush():
+            nonlocal pending_tokens
+            if pending_content:
+                self.content_received.emit("".join(pending_content))
+                pending_content.clear()
+            if pending_reasoning:
+                self.reasoning_received.emit("".join(pending_reasoning))
+                pending_reasoning.clear()
+            if pending_tokens:
+                tracker.tokens_received(pending_tokens)
+                pending_tokens = 0
+        
+        # 重试时不沿用上一次请求的 usage
+        self.usage = None
+        try:
+            tracker.request_sent()
+            async for content, reasoning in self.client_pool.stream_chat(
+                self.api_key, model, messages, on_usage=self.set_usage
+            ):
+                if not self.is_running:
+                    break
+                if content:
+                    content_parts.append(content)
+                    pending_content.append(content)
+                if reasoning:
+                    pending_reasoning.append(reasoning)
+                
+                # 收到首个 token 时立即通知，之后按批次通知
+                pending_tokens += 1
+                now = time.monotonic()
+                if tracker.first_token_time is None or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                    flush()
+                    last_flush = now
+        except Exception as e:
+            if content_parts or tracker.first_token_time is not None:
+                # 已经输出了部分内容，重试会导致重复输出，因此不再交给调度器重试
+                raise RuntimeError(f"输出中断: {str(e)}") from e
+            raise
+        finally:
+            # 停止或取消时也把已收到的内容推送出去，保留部分结果
+            flush()
+        return "".join(content_parts)
+    
+    def set_usage(self, usage):
+        self.usage = usage
+    
+    def record_completion(self, model, result, tracker, output_tokens):
+        """写入结果缓存，记录耗时和用量，返回记录的用量（在线程池中执行）"""
+        # 只缓存完整的结果
+        if self.result_cache is not None:
+            try:
+                self.result_cache.put(self.job_info, self.resume_info, model, result)
+            except Exception as e:
+                print(f"写入结果缓存失败: {str(e)}")
+        tracker.completed(output_tokens)
+        # 记录上下文缓存命中的 token 数和本地估算的偏差
+        return self.usage_stats.record(model, self.usage, self.budget["prompt_tokens"])
+    
+    async def run_async(self):
+        """执行一次分析：进度由请求事件驱动，不做轮询"""
+        try:
+            # 构建提示词：本地统计 token 数，超出预算的岗位 / 简历先压缩、截断
+            messages, self.budget = get_prompt_budgeter().fit(self.job_info, self.resume_info)
+            model = resolve_model(self.model_name)
+            tracker = ProgressTracker(model, self.latency_model, self.report_progress)
             
             # 发送初始进度
             self.progress_updated.emit(0)
             
-            # 启动进度更新定时器
-            start_time = time.time()
-            last_progress = 0
-            api_response_received = False
-            api_result = None
-            
-            # 在单独的线程中调用API
-            def call_api():
-                nonlocal api_response_received, api_result
-                try:
-                    response = self.client.chat.completions.create(
-                        model=model,
-                        messages=[
-                            {"role": "system", "content": "你是一个专业的技术招聘专家，精通各类编程语言和技术栈，擅长评估工程师简历与技术岗位的匹配度。"},
-                            {"role": "user", "content": prompt}
-                        ],
-                        stream=False
-                    )
-                    
-                    # 获取分析结果
-                    result = response.choices[0].message.content
-                    
-                    # 标记已收到API响应
-                    api_response_received = True
-                    api_result = result
-                    
-                    # 更新进度到100%并发送结果
-                    if self.is_running:
-                        self.progress_updated.emit(100)
-                        self.analysis_completed.emit(result)
-                except Exception as e:
-                    # 只有在分析未被停止时才发送错误
-                    if self.is_running:
-                        self.analysis_error.emit(str(e))
+            # 每个密钥只校验一次（结果有缓存），不再每次分析都额外请求一次
+            if not await self.key_validator.validate(self.api_key):
+                if self.is_running:
+                    self.api_key_invalid.emit()
+                return
             
-            # 启动API调用线程
-            api_thread = threading.Thread(target=call_api)
-            api_thread.daemon = True
-            api_thread.start()
+            # 所有请求经过调度器：限流、并发上限、失败重试；交互式分析优先于批量任务
+            scheduler = get_request_scheduler()
+            estimated_tokens = estimate_request_tokens(
+                messages, tracker.estimate["output_tokens"], self.budget["prompt_tokens"]
+            )
             
-            # 更新进度
-            while self.is_running and not api_response_received:
-                elapsed_time = time.time() - start_time
-                if elapsed_time >= total_steps:
-                    if not api_response_received:
-                        self.progress_updated.emit(95)
-                    break
-                
-                current_progress = min(95, int((elapsed_time / total_steps) * 95))
-                if current_progress > last_progress:
-                    last_progress = current_progress
-                    self.progress_updated.emit(current_progress)
-                
-                time.sleep(0.05)  # 每50毫秒更新一次
+            def on_retry(attempt, delay, error):
+                self.progress_detail.emit(f"请求失败（{type(error).__name__}），{delay:.0f} 秒后第 {attempt} 次重试")
             
-            # 等待API线程完成
-            api_thread.join(timeout=1)
+            output_tokens = None
+            if self.stream:
+                # 流式响应的 usage 在最后一个数据块中（stream_options.include_usage），交给调度器修正 TPM 额度
+                result = await scheduler.call(
+                    lambda: self.stream_analysis(model, messages, tracker),
+                    model, estimated_tokens, PRIORITY_INTERACTIVE, on_retry, usage_of=lambda _: self.usage
+                )
+            else:
+                tracker.request_sent()
+                response = await scheduler.call(
+                    lambda: self.client_pool.chat(
+                        self.api_key,
+                        model,
+                        messages,
+                        stream=False
+                    ),
+                    model, estimated_tokens, PRIORITY_INTERACTIVE, on_retry
+                )
+                # 获取分析结果
+                result = response.choices[0].message.content
+                self.usage = response.usage
+            if self.usage is not None:
+                output_tokens = self.usage.completion_tokens
             
+            # 更新进度到100%并发送结果
+            if self.is_running:
+                # 结果缓存的 SQLite 写入和统计文件的重写放到线程池中，
+                # 不阻塞共享事件循环上其他分析的流式输出
+                usage = await asyncio.get_running_loop().run_in_executor(
+                    None, self.record_completion, model, result, tracker, output_tokens
+                )
+                self.usage_record = usage
+                if usage is not None:
+                    self.progress_detail.emit(
+                        f"完成，用时 {tracker.elapsed():.0f} 秒，{format_token_estimate(usage)}，{format_cache_usage(usage)}"
+                    )
+                self.progress_updated.emit(100)
+                self.analysis_completed.emit(result)
         except Exception as e:
-            self.analysis_error.emit(str(e))
+            if is_auth_error(e):
+                # 密钥已失效，下次使用前需要重新校验
+                self.key_validator.mark_invalid(self.api_key)
+                if self.is_running:
+                    self.api_key_invalid.emit()
+                return
+            # 只有在分析未被停止时才发送错误
+            if self.is_running:
+                self.analysis_error.emit(str(e))
     
     def stop(self):
         """停止分析"""
         self.is_running = False
-        # 这里可以添加向DeepSeek发送取消请求的代码
-        # 但由于API调用是在单独的线程中，我们只能标记停止，无法直接取消请求
+        # 取消事件循环中的分析任务：httpx 会中断正在进行的请求/流并释放连接
+        if self._request_future is not None:
+            self._request_future.cancel()
+
+_analysis_item_ids = itertools.count(1)
+
+class AnalysisItem:
+    """分析队列中的一项：一组 (岗位, 简历, 模型) 及其状态、流式输出和结果"""
+    def __init__(self, job_info, resume_info, model_name, resume_path=None):
+        self.id = next(_analysis_item_ids)
+        self.job_info = job_info
+        self.resume_info = resume_info
+        self.model_name = model_name
+        self.model = resolve_model(model_name)
+        self.resume_path = resume_path
+        self.job_title = guess_job_title(job_info)
+        self.candidate = guess_candidate_name(resume_info)
+        self.status = STATUS_PENDING
+        self.progress = 0
+        self.detail = ""
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.content_parts = []
+        self.reasoning_parts = []
+        self.result = None
+        self.scores = None
+        # 提示词预算（本地估算）和实际用量
+        self.budget = None
+        self.usage = None
+        self.worker = None
+        # 近似重复的代表（批量添加时检测），以及等待中的同内容条目编号
+        self.duplicate_of = None
+        self.waiting_for = None
+    
+    @property
+    def content(self):
+        """分析结果（完成前为已收到的部分）"""
+        return self.result if self.result is not None else "".join(self.content_parts)
+    
+    @property
+    def reasoning(self):
+        return "".join(self.reasoning_parts)
+    
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATUSES
+    
+    def elapsed(self):
+        """已用时间（秒），未开始时为 None"""
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+class AnalysisQueueModel(QAbstractTableModel):
+    """分析队列表格：每行一项分析的状态、进度、用时和评分"""
+    COLUMNS = ("候选人", "岗位", "模型", "状态", "进度", "用时", "输入tokens", "总分", "推荐")
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.items = []
+        self._rows = {}
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self.items[index.row()]
+        column = index.column()
+        if role == Qt.DisplayRole:
+            if column == 0:
+                return item.candidate
+            if column == 1:
+                return item.job_title
+            if column == 2:
+                return item.model_name
+            if column == 3:
+                return item.status
+            if column == 4:
+                return f"{item.progress}%"
+            if column == 5:
+                elapsed = item.elapsed()
+                return "" if elapsed is None else f"{elapsed:.0f}s"
+            if column == 6:
+                # 实际用量（完成后）或本地估算
+                if item.usage:
+                    return str(item.usage["prompt_tokens"])
+                return f"≈{item.budget['prompt_tokens']}" if item.budget else ""
+            if column == 7:
+                return format_score(item.scores["overall"]) if item.scores else ""
+            if column == 8:
+                return (item.scores or {}).get("recommendation") or ""
+        if role == Qt.ToolTipRole:
+            if column == 0 and item.resume_path:
+                return item.resume_path
+            if column == 3:
+                return item.error or item.detail or None
+            if column == 6:
+                if item.usage:
+                    return format_token_estimate(item.usage)
+                return format_budget(item.budget) if item.budget else None
+        if role == Qt.TextAlignmentRole and 4 <= column <= 7:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.UserRole:
+            return item.id
+        return None
+    
+    def add(self, item):
+        row = len(self.items)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.items.append(item)
+        self._rows[item.id] = row
+        self.endInsertRows()
+        return row
+    
+    def item(self, item_id):
+        row = self._rows.get(item_id)
+        return None if row is None else self.items[row]
+    
+    def row_of(self, item_id):
+        return self._rows.get(item_id)
+    
+    def item_changed(self, item):
+        """通知视图刷新一行"""
+        row = self._rows.get(item.id)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+    
+    def remove_finished(self):
+        """移除已结束的条目"""
+        self.beginResetModel()
+        self.items = [item for item in self.items if not item.finished]
+        self._rows = {item.id: row for row, item in enumerate(self.items)}
+        self.endResetModel()
+
+class AnalysisQueue(QObject):
+    """
+    分析队列：多组 (岗位, 简历) 同时分析，最多 max_concurrent 项同时进行，其余排队
+
+    每项分析由一个 AnalysisWorker 在共享事件循环上执行，请求统一经过调度器限流。
+    """
+    # 条目的状态、进度或评分变化
+    item_updated = Signal(int)
+    # 流式输出增量：条目编号, 文本
+    content_appended = Signal(int, str)
+    reasoning_appended = Signal(int, str)
+    # 条目结束（完成、失败或停止）
+    item_finished = Signal(int)
+    # API密钥无效，所有等待中的条目已取消
+    api_key_invalid = Signal()
+    
+    def __init__(self, result_cache=None, result_store=None, latency_model=None, usage_stats=None,
+                 max_concurrent=DEFAULT_MAX_CONCURRENT_ANALYSES, stream=True, parent=None):
+        super().__init__(parent)
+        self.result_cache = result_cache
+        self.result_store = result_store
+        self.latency_model = latency_model or LatencyModel()
+        self.usage_stats = usage_stats or UsageStats()
+        self.max_concurrent = max(1, max_concurrent)
+        self.stream = stream
+        self.api_key = ""
+        self.model = AnalysisQueueModel(self)
+    
+    def cached_result(self, job_info, resume_info, model_name):
+        """查询结果缓存，未命中时返回 None"""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.get(job_info, resume_info, resolve_model(model_name))
+    
+    def enqueue(self, job_info, resume_info, model_name, resume_path=None, cached_result=None, duplicate=None):
+        """
+        加入一项分析；提供 cached_result 时直接作为缓存结果完成，不调用API
+
+        duplicate: 简历是某份已添加简历的近似重复时为 DuplicateIndex.match() 的结果（仅用于显示）。
+        队列中已有内容相同、尚未完成的一项时不再单独请求，等它完成后直接使用它的结果。
+        """
+        item = AnalysisItem(job_info, resume_info, model_name, resume_path)
+        if duplicate is not None:
+            item.duplicate_of = duplicate["key"]
+            item.detail = f"与 {os.path.basename(duplicate['key'])} 重复（相似度 {duplicate['similarity']:.0%}）"
+        self.model.add(item)
+        if cached_result is not None:
+            item.started_at = time.monotonic()
+            item.progress = 100
+            item.result = cached_result
+            self._store_result(item)
+            self._finish(item, STATUS_CACHED)
+            return item
+        original = self._unfinished_same(item)
+        if original is not None:
+            item.waiting_for = original.id
+            item.status = STATUS_WAITING
+            self._changed(item)
+        else:
+            self._start_pending()
+        return item
+    
+    def _unfinished_same(self, item):
+        """队列中与 item 的岗位、简历和模型都相同且尚未完成的一项"""
+        for other in self.model.items:
+            if (other is not item and not other.finished and other.waiting_for is None
+                    and other.model == item.model and other.resume_info == item.resume_info
+                    and other.job_info == item.job_info):
+                return other
+        return None
+    
+    def item(self, item_id):
+        return self.model.item(item_id)
+    
+    def counts(self):
+        """各状态的条目数"""
+        counts = {}
+        for item in self.model.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return counts
+    
+    def _start_pending(self):
+        running = sum(1 for item in self.model.items if item.status == STATUS_RUNNING)
+        for item in self.model.items:
+            if running >= self.max_concurrent:
+                break
+            if item.status == STATUS_PENDING:
+                self._start(item)
+                running += 1
+    
+    def _start(self, item):
+        worker = AnalysisWorker(
+            item.job_info, item.resume_info, self.api_key, item.model_name, self.result_cache,
+            stream=self.stream,
+            latency_model=self.latency_model,
+            usage_stats=self.usage_stats
+        )
+        worker.progress_updated.connect(functools.partial(self._on_progress, item))
+        worker.progress_detail.connect(functools.partial(self._on_detail, item))
+        worker.content_received.connect(functools.partial(self._on_content, item))
+        worker.reasoning_received.connect(functools.partial(self._on_reasoning, item))
+        worker.analysis_completed.connect(functools.partial(self._on_completed, item))
+        worker.analysis_error.connect(functools.partial(self._on_error, item))
+        worker.api_key_invalid.connect(functools.partial(self._on_api_key_invalid, item))
+        item.worker = worker
+        item.status = STATUS_RUNNING
+        item.started_at = time.monotonic()
+        self._changed(item)
+        worker.start()
+    
+    def _changed(self, item):
+        self.model.item_changed(item)
+        self.item_updated.emit(item.id)
+    
+    def _on_progress(self, item, value):
+        if item.status == STATUS_RUNNING:
+            if item.budget is None and item.worker is not None:
+                # 提示词在发出第一个进度之前已构建
+                item.budget = item.worker.budget
+            item.progress = value
+            self._changed(item)
+    
+    def _on_detail(self, item, detail):
+        if item.status == STATUS_RUNNING:
+            item.detail = detail
+            self._changed(item)
+    
+    def _on_content(self, item, text):
+        item.content_parts.append(text)
+        self.content_appended.emit(item.id, text)
+    
+    def _on_reasoning(self, item, text):
+        item.reasoning_parts.append(text)
+        self.reasoning_appended.emit(item.id, text)
+    
+    def _on_completed(self, item, result):
+        if item.status != STATUS_RUNNING:
+            return
+        if item.worker is not None:
+            item.usage = item.worker.usage_record
+        item.result = result
+        item.progress = 100
+        self._store_result(item)
+        self._finish(item, STATUS_DONE)
+    
+    def _on_error(self, item, error_msg):
+        if item.status != STATUS_RUNNING:
+            return
+        item.error = error_msg
+        self._finish(item, STATUS_FAILED)
+    
+    def _on_api_key_invalid(self, item):
+        if item.status != STATUS_RUNNING:
+            return
+        item.error = API_KEY_INVALID_ERROR
+        # 同一个密钥的其余分析也会失败，不再启动
+        for other in self.model.items:
+            if other.status in (STATUS_PENDING, STATUS_WAITING):
+                other.error = item.error
+                self._finish(other, STATUS_FAILED, start_next=False)
+        self._finish(item, STATUS_FAILED, start_next=False)
+        self.api_key_invalid.emit()
+    
+    def _store_result(self, item):
+        """解析评分并写入结果库"""
+        try:
+            if self.result_store is not None:
+                item.scores = self.result_store.add(
+                    item.job_info, item.resume_info, item.model, item.result, resume_path=item.resume_path
+                )
+            else:
+                item.scores = parse_scores(item.result)
+        except Exception as e:
+            print(f"保存分析结果失败: {str(e)}")
+    
+    def _finish(self, item, status, start_next=True):
+        item.status = status
+        item.finished_at = time.monotonic()
+        item.worker = None
+        self._changed(item)
+        self.item_finished.emit(item.id)
+        self._resolve_waiting(item)
+        if start_next:
+            self._start_pending()
+    
+    def _resolve_waiting(self, original):
+        """内容相同的一项结束后：成功时直接使用它的结果，失败或停止时改为自己分析"""
+        for item in self.model.items:
+            if item.waiting_for != original.id or item.status != STATUS_WAITING:
+                continue
+            item.waiting_for = None
+            if original.status in (STATUS_DONE, STATUS_CACHED, STATUS_DUPLICATE) and original.result is not None:
+                item.started_at = time.monotonic()
+                item.progress = 100
+                item.result = original.result
+                item.scores = original.scores
+                self._finish(item, STATUS_DUPLICATE, start_next=False)
+            else:
+                item.status = STATUS_PENDING
+                self._changed(item)
+    
+    def stop(self, item_id):
+        """停止一项分析（等待中的直接取消），已收到的部分结果保留"""
+        item = self.model.item(item_id)
+        if item is None or item.finished:
+            return
+        if item.worker is not None:
+            item.worker.stop()
+        self._finish(item, STATUS_STOPPED)
+    
+    def stop_all(self):
+        """停止所有未结束的分析"""
+        for item in self.model.items:
+            if not item.finished:
+                if item.worker is not None:
+                    item.worker.stop()
+                self._finish(item, STATUS_STOPPED, start_next=False)
+    
+    def shutdown(self, msecs=2000):
+        """关闭窗口时停止所有分析并等待请求取消"""
+        workers = [item.worker for item in self.model.items if item.worker is not None]
+        self.stop_all()
+        for worker in workers:
+            worker.wait(msecs)
 
 class ResumeMatchingApp(QMainWindow):
     """简历匹配应用主窗口"""
+    # 后台预加载完成：{模块名称: 导入耗时（秒）}
+    warm_up_finished = Signal(object)
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("简历匹配分析工具")
@@ -314,9 +982,51 @@ class ResumeMatchingApp(QMainWindow):
         self.resume_file_path = ""
         self.job_info = ""
         self.resume_info = ""
-        self.analysis_worker = None
+        self.document_loader = DocumentLoader(parent=self)
+        self.document_loader.loaded.connect(self.on_document_loaded)
+        self.document_loader.queue_loaded.connect(self.on_queue_document_loaded)
+        self.document_loader.failed.connect(self.on_document_failed)
+        self.document_loader.prefetched.connect(self.on_folder_prefetched)
         self.settings = self.load_settings()
-        self.job_history = self.load_job_history()
+        # 持久化的提取缓存：重新选择同一份简历或重启应用后不必重新解析
+        self.extraction_store = self.load_extraction_store()
+        set_extraction_store(self.extraction_store)
+        self.job_store = self.load_job_store()
+        
+        # 连接池配置（可选），需在第一次请求之前设置
+        configure_client_pool(**self.settings.get("connection_pool", {}))
+        configure_request_scheduler(**self.settings.get("rate_limits", {}))
+        configure_prompt_budget(**self.settings.get("prompt_budget", {}))
+        self.result_cache = self.load_result_cache()
+        # 结构化评分结果库
+        self.result_store = self.load_result_store()
+        # 简历库（倒排索引），在后台提前载入内存
+        self.resume_index = self.load_resume_index()
+        if self.resume_index is not None:
+            self.document_loader.resume_index = self.resume_index
+            self.document_loader.executor.submit(self.resume_index.warm_up)
+        # 简历指纹库：批量添加的重复简历复用代表的结果
+        self.document_loader.dedup_index = self.load_dedup_index()
+        # 各模型的历史耗时，用于估计进度
+        self.latency_model = LatencyModel(get_resource_path('latency_stats.json'))
+        # token 用量与上下文缓存命中统计
+        self.usage_stats = UsageStats(get_resource_path('usage_stats.json'))
+        # 分析队列：多组岗位/简历同时分析，下方表格显示每一项的状态
+        self.analysis_queue = AnalysisQueue(
+            self.result_cache, self.result_store, self.latency_model, self.usage_stats,
+            max_concurrent=self.settings.get("max_concurrent_analyses", DEFAULT_MAX_CONCURRENT_ANALYSES),
+            stream=self.settings.get("stream", True),
+            parent=self
+        )
+        self.analysis_queue.item_updated.connect(self.on_queue_item_updated)
+        self.analysis_queue.item_finished.connect(self.on_queue_item_finished)
+        self.analysis_queue.content_appended.connect(self.on_queue_content)
+        self.analysis_queue.reasoning_appended.connect(self.on_queue_reasoning)
+        self.analysis_queue.api_key_invalid.connect(self.api_key_invalid)
+        # 表格中选中的分析项，下方的报告显示它的内容
+        self.selected_item_id = None
+        # 批量添加的简历文件 -> 选择时的 (岗位, 模型)，读取完成后加入队列
+        self.pending_queue_files = {}
         
         # 创建主布局
         main_widget = QWidget()
@@ -367,6 +1077,12 @@ class ResumeMatchingApp(QMainWindow):
         job_buttons_layout.addWidget(job_file_btn)
         job_buttons_layout.addWidget(self.save_job_btn)
         job_buttons_layout.addWidget(self.load_job_btn)
+        
+        # 在简历库中检索候选人
+        self.match_pool_btn = QPushButton("简历库匹配")
+        self.match_pool_btn.setFixedWidth(100)
+        self.match_pool_btn.clicked.connect(lambda: self.show_candidate_shortlist(self.job_text.toPlainText()))
+        job_buttons_layout.addWidget(self.match_pool_btn)
         job_buttons_layout.addStretch(1)  # 添加弹性空间
         
         job_layout.addLayout(job_buttons_layout)
@@ -392,6 +1108,11 @@ class ResumeMatchingApp(QMainWindow):
         resume_file_btn.clicked.connect(self.select_resume_file)
         resume_file_layout.addWidget(self.resume_file_label)
         resume_file_layout.addWidget(resume_file_btn)
+        queue_files_btn = QPushButton("批量添加简历")
+        queue_files_btn.setFixedWidth(120)
+        queue_files_btn.setToolTip("选择多份简历，与当前岗位逐一加入分析队列")
+        queue_files_btn.clicked.connect(self.select_queue_files)
+        resume_file_layout.addWidget(queue_files_btn)
         resume_layout.addLayout(resume_file_layout)
         
         self.resume_text = QTextEdit()
@@ -519,14 +1240,20 @@ class ResumeMatchingApp(QMainWindow):
         button_layout.setSpacing(10)
         
         self.analyze_btn = QPushButton("开始分析")
+        self.analyze_btn.setToolTip("把当前岗位和简历加入分析队列")
         self.analyze_btn.clicked.connect(self.start_analysis)
         button_layout.addWidget(self.analyze_btn)
         
         self.stop_btn = QPushButton("停止分析")
+        self.stop_btn.setToolTip("停止表格中选中的分析")
         self.stop_btn.setEnabled(False)
         self.stop_btn.clicked.connect(self.stop_analysis)
         button_layout.addWidget(self.stop_btn)
         
+        self.force_refresh_check = QCheckBox("强制刷新")
+        self.force_refresh_check.setToolTip("忽略缓存的分析结果，重新调用模型分析")
+        button_layout.addWidget(self.force_refresh_check)
+        
         self.save_btn = QPushButton("保存结果")
         self.save_btn.setEnabled(False)
         self.save_btn.clicked.connect(self.save_results)
@@ -551,9 +1278,60 @@ class ResumeMatchingApp(QMainWindow):
         result_layout = QVBoxLayout(result_group)
         result_layout.setContentsMargins(15, 15, 15, 15)
         
+        # 分析队列：每行一项分析
+        result_splitter = QSplitter(Qt.Vertical)
+        queue_widget = QWidget()
+        queue_layout = QVBoxLayout(queue_widget)
+        queue_layout.setContentsMargins(0, 0, 0, 0)
+        queue_layout.setSpacing(6)
+        
+        queue_button_layout = QHBoxLayout()
+        self.queue_summary_label = QLabel("队列为空")
+        self.queue_summary_label.setStyleSheet("color: #666;")
+        queue_button_layout.addWidget(self.queue_summary_label)
+        queue_button_layout.addStretch()
+        self.stop_all_btn = QPushButton("全部停止")
+        self.stop_all_btn.setEnabled(False)
+        self.stop_all_btn.clicked.connect(self.stop_all_analyses)
+        queue_button_layout.addWidget(self.stop_all_btn)
+        self.clear_finished_btn = QPushButton("清除已完成")
+        self.clear_finished_btn.setEnabled(False)
+        self.clear_finished_btn.clicked.connect(self.clear_finished_analyses)
+        queue_button_layout.addWidget(self.clear_finished_btn)
+        queue_layout.addLayout(queue_button_layout)
+        
+        self.queue_view = QTableView()
+        self.queue_view.setModel(self.analysis_queue.model)
+        self.queue_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.queue_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_view.verticalHeader().setVisible(False)
+        self.queue_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.queue_view.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.queue_view.selectionModel().currentRowChanged.connect(self.on_queue_selection_changed)
+        queue_layout.addWidget(self.queue_view)
+        result_splitter.addWidget(queue_widget)
+        
+        # 选中项的详情
+        self.result_tabs = QTabWidget()
+        
         self.result_text = QTextEdit()
         self.result_text.setReadOnly(True)
-        result_layout.addWidget(self.result_text)
+        self.result_tabs.addTab(self.result_text, "分析报告")
+        
+        # R1 模型的思考过程单独显示
+        self.reasoning_text = QTextEdit()
+        self.reasoning_text.setReadOnly(True)
+        self.result_tabs.addTab(self.reasoning_text, "思考过程")
+        
+        result_splitter.addWidget(self.result_tabs)
+        result_splitter.setSizes([150, 250])
+        result_layout.addWidget(result_splitter)
+        
+        # 表格中的用时每秒刷新一次
+        self.queue_timer = QTimer(self)
+        self.queue_timer.setInterval(1000)
+        self.queue_timer.timeout.connect(self.refresh_running_items)
         
         # 添加所有组件到分割器
         splitter.addWidget(top_widget)
@@ -562,6 +1340,42 @@ class ResumeMatchingApp(QMainWindow):
         
         # 设置分割器的初始大小
         splitter.setSizes([300, 150, 350])
+        mark_startup("window_created")
+    
+    def on_first_shown(self):
+        """窗口第一次显示之后：记录启动耗时，在后台预加载分析和读取文档要用的库"""
+        mark_startup("first_window")
+        modules = []
+        if OPENAI_SUPPORT:
+            modules.append(openai)
+        # 各类文档的解析库按使用频率排列
+        for supported, module in ((PDF_SUPPORT, PyPDF2), (OPENPYXL_SUPPORT, openpyxl)):
+            if supported:
+                modules.append(module)
+        if not self.settings.get("warm_up_imports", True):
+            modules = []
+        self.document_loader.executor.submit(lambda: self.warm_up_finished.emit(warm_up(modules)))
+        # 预先读取上次使用的简历文件夹
+        folder = self.settings.get("last_resume_dir")
+        if (self.extraction_store is not None and folder and os.path.isdir(folder)
+                and self.settings.get("prefetch_resume_dir", True)):
+            self.document_loader.prefetch(folder, self.settings.get("prefetch_max_files", PREFETCH_MAX_FILES))
+    
+    def on_folder_prefetched(self, folder, count):
+        """后台预先读取文件夹完成"""
+        if count:
+            self.statusBar().showMessage(f"已预先读取 {os.path.basename(folder) or folder} 中的 {count} 份文件", 5000)
+    
+    def startup_report(self, warm_up_times):
+        """启动耗时报告（--startup-report）：各阶段的时刻和后台预加载的耗时"""
+        return {
+            "startup_seconds": {name: round(value, 4) for name, value in startup_times.items()},
+            "warm_up_seconds": {name: round(value, 4) for name, value in warm_up_times.items()},
+            # 启动阶段已被导入的延迟模块（应为空）
+            "loaded_before_window": sorted(
+                name for name, (seconds, thread) in import_times.items() if thread == "MainThread"
+            ),
+        }
     
     def setup_apple_style(self):
         """设置苹果风格的界面"""
@@ -659,93 +1473,20 @@ class ResumeMatchingApp(QMainWindow):
                 QMessageBox.warning(self, "警告", "请输入岗位名称和公司名称")
                 return
             
-            # 添加到历史记录
-            self.job_history.append({
-                "name": job_name,
-                "company": company_name,
-                "content": job_content,
-                "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-            
-            # 保存到文件
-            self.save_job_history()
+            # 添加到历史职位库
+            try:
+                self.job_store.add(job_name, company_name, job_content)
+            except Exception as e:
+                QMessageBox.warning(self, "警告", f"保存历史记录失败: {str(e)}")
+                return
             
             QMessageBox.information(self, "成功", f"职位 '{job_name} - {company_name}' 已保存")
     
     def show_history_dialog(self):
         """显示历史职位列表对话框"""
-        dialog = QDialog(self)
-        dialog.setWindowTitle("历史职位列表")
-        dialog.setMinimumWidth(400)
-        
-        layout = QVBoxLayout()
-        
-        # 创建列表控件
-        list_widget = QListWidget()
-        list_widget.setSelectionMode(QListWidget.SingleSelection)
-        
-        # 加载历史职位
-        try:
-            with open("job_history.json", "r", encoding="utf-8") as f:
-                history = json.load(f)
-                for job in history:
-                    # 使用职位名称-公司名称作为显示文本
-                    display_text = f"{job.get('name', '未命名职位')} - {job.get('company', '未知公司')}"
-                    item = QListWidgetItem(display_text)
-                    item.setData(Qt.UserRole, job)  # 存储完整的职位信息
-                    list_widget.addItem(item)
-        except (FileNotFoundError, json.JSONDecodeError):
-            pass
-        
-        layout.addWidget(list_widget)
-        
-        # 创建按钮布局
-        button_layout = QHBoxLayout()
-        
-        # 加载按钮
-        load_btn = QPushButton("加载选中职位")
-        load_btn.clicked.connect(lambda: self.load_history_job(list_widget.currentItem(), dialog))
-        button_layout.addWidget(load_btn)
-        
-        # 删除按钮
-        delete_btn = QPushButton("删除选中职位")
-        delete_btn.clicked.connect(lambda: self.delete_history_job(list_widget))
-        button_layout.addWidget(delete_btn)
-        
-        # 取消按钮
-        cancel_btn = QPushButton("取消")
-        cancel_btn.clicked.connect(dialog.reject)
-        button_layout.addWidget(cancel_btn)
-        
-        layout.addLayout(button_layout)
-        dialog.setLayout(layout)
-        dialog.exec()
-    
-    def delete_history_job(self, list_widget):
-        """删除选中的历史职位"""
-        current_item = list_widget.currentItem()
-        if not current_item:
-            QMessageBox.warning(self, "提示", "请先选择要删除的职位")
-            return
-        
-        # 从列表控件中移除
-        row = list_widget.row(current_item)
-        list_widget.takeItem(row)
-        
-        # 更新历史记录文件
-        try:
-            with open("job_history.json", "r", encoding="utf-8") as f:
-                history = json.load(f)
-            
-            # 删除对应的职位信息
-            if 0 <= row < len(history):
-                del history[row]
-            
-            # 保存更新后的历史记录
-            with open("job_history.json", "w", encoding="utf-8") as f:
-                json.dump(history, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            QMessageBox.warning(self, "错误", f"删除历史记录失败：{str(e)}")
+        dialog = LoadJobDialog(self.job_store, self)
+        if dialog.exec() == QDialog.Accepted:
+            self.load_history_job(dialog.get_selected_job())
     
     def select_job_file(self):
         """选择岗位文件"""
@@ -753,7 +1494,7 @@ class ResumeMatchingApp(QMainWindow):
             self, 
             "选择岗位文件", 
             "", 
-            "所有文件 (*.*);;文本文件 (*.txt);;PDF文件 (*.pdf);;Word文件 (*.docx);;Excel文件 (*.xlsx *.xls)"
+            "所有文件 (*.*);;文本文件 (*.txt);;PDF文件 (*.pdf);;Word文件 (*.docx);;Excel文件 (*.xlsx *.xls);;CSV文件 (*.csv)"
         )
         if file_path:
             self.job_file_path = file_path
@@ -763,99 +1504,155 @@ class ResumeMatchingApp(QMainWindow):
     def select_resume_file(self):
         """选择简历文件"""
         # 获取上次选择的文件夹路径
-        last_dir = os.path.dirname(self.resume_file_path) if self.resume_file_path else ""
+        last_dir = self.last_resume_dir()
         
         file_path, _ = QFileDialog.getOpenFileName(
             self, 
             "选择简历文件", 
             last_dir,  # 使用上次的文件夹路径
-            "所有文件 (*.*);;文本文件 (*.txt);;PDF文件 (*.pdf);;Word文件 (*.docx);;Excel文件 (*.xlsx *.xls)"
+            "所有文件 (*.*);;文本文件 (*.txt);;PDF文件 (*.pdf);;Word文件 (*.docx);;Excel文件 (*.xlsx *.xls);;CSV文件 (*.csv)"
         )
         if file_path:
             self.resume_file_path = file_path
             self.resume_file_label.setText(os.path.basename(file_path))
+            self.remember_resume_dir(file_path)
             self.load_resume_file()
     
+    def last_resume_dir(self):
+        """上次选择简历的文件夹（重启后从设置中读取）"""
+        if self.resume_file_path:
+            return os.path.dirname(self.resume_file_path)
+        return self.settings.get("last_resume_dir", "")
+    
+    def remember_resume_dir(self, file_path):
+        """记录简历所在的文件夹，下次启动时在后台预先读取"""
+        folder = os.path.dirname(os.path.abspath(file_path))
+        if self.settings.get("last_resume_dir") != folder:
+            self.settings["last_resume_dir"] = folder
+            self.save_settings()
+    
     def load_job_file(self):
         """加载岗位文件内容"""
         if not self.job_file_path:
             return
-        
-        try:
-            file_ext = os.path.splitext(self.job_file_path)[1].lower()
-            
-            if file_ext == '.txt':
-                with open(self.job_file_path, 'r', encoding='utf-8') as f:
-                    self.job_info = f.read()
-            elif file_ext == '.pdf' and PDF_SUPPORT:
-                self.job_info = self.read_pdf(self.job_file_path)
-            elif file_ext == '.docx' and DOCX_SUPPORT:
-                self.job_info = self.read_docx(self.job_file_path)
-            elif file_ext in ['.xlsx', '.xls'] and EXCEL_SUPPORT:
-                self.job_info = self.read_excel(self.job_file_path)
-            else:
-                QMessageBox.warning(self, "警告", f"不支持的文件类型: {file_ext}")
-                return
-            
-            self.job_text.setText(self.job_info)
-            
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"加载岗位文件失败: {str(e)}")
+        self.load_document("job", self.job_file_path)
     
     def load_resume_file(self):
         """加载简历文件内容"""
         if not self.resume_file_path:
             return
-        
+        self.load_document("resume", self.resume_file_path)
+    
+    def load_document(self, purpose, file_path):
+        """检查文件类型后交给后台线程提取文本，避免大文件卡住界面"""
         try:
-            file_ext = os.path.splitext(self.resume_file_path)[1].lower()
-            
-            if file_ext == '.txt':
-                with open(self.resume_file_path, 'r', encoding='utf-8') as f:
-                    self.resume_info = f.read()
-            elif file_ext == '.pdf' and PDF_SUPPORT:
-                self.resume_info = self.read_pdf(self.resume_file_path)
-            elif file_ext == '.docx' and DOCX_SUPPORT:
-                self.resume_info = self.read_docx(self.resume_file_path)
-            elif file_ext in ['.xlsx', '.xls'] and EXCEL_SUPPORT:
-                self.resume_info = self.read_excel(self.resume_file_path)
-            else:
-                QMessageBox.warning(self, "警告", f"不支持的文件类型: {file_ext}")
+            get_extractor(file_path)
+        except UnsupportedDocumentError as e:
+            QMessageBox.warning(self, "警告", str(e))
+            return
+        
+        label = self.job_file_label if purpose == "job" else self.resume_file_label
+        label.setText(f"{os.path.basename(file_path)}（读取中…）")
+        self.document_loader.load(purpose, file_path)
+    
+    def on_document_loaded(self, purpose, file_path, text):
+        """文档提取完成"""
+        if purpose == "job":
+            # 读取期间用户可能已经选择了其他文件
+            if file_path != self.job_file_path:
                 return
-            
+            self.job_file_label.setText(os.path.basename(file_path))
+            self.job_info = text
+            self.job_text.setText(self.job_info)
+        else:
+            if file_path != self.resume_file_path:
+                return
+            self.resume_file_label.setText(os.path.basename(file_path))
+            self.resume_info = text
             self.resume_text.setText(self.resume_info)
+    
+    def on_queue_document_loaded(self, file_path, text, duplicate):
+        """批量添加的简历读取完成"""
+        if file_path in self.pending_queue_files:
+            self.enqueue_file(file_path, text, duplicate)
+    
+    def on_document_failed(self, purpose, file_path, error_msg):
+        """文档提取失败"""
+        if purpose == "queue":
+            # 批量添加时不逐个弹窗，在状态栏提示
+            self.pending_queue_files.pop(file_path, None)
+            self.statusBar().showMessage(f"读取简历失败 {os.path.basename(file_path)}: {error_msg}")
+            return
+        if purpose == "job":
+            self.job_file_label.setText(os.path.basename(file_path))
+            QMessageBox.critical(self, "错误", f"加载岗位文件失败: {error_msg}")
+        else:
+            self.resume_file_label.setText(os.path.basename(file_path))
+            QMessageBox.critical(self, "错误", f"加载简历文件失败: {error_msg}")
+    
+    def select_queue_files(self):
+        """选择多份简历，与当前岗位逐一加入分析队列"""
+        job_info = self.job_text.toPlainText()
+        if not job_info:
+            QMessageBox.warning(self, "警告", "请输入岗位信息")
+            return
+        api_key = self.check_api_key()
+        if api_key is None:
+            return
+        last_dir = self.last_resume_dir()
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "选择简历文件（可多选）",
+            last_dir,
+            "所有文件 (*.*);;文本文件 (*.txt);;PDF文件 (*.pdf);;Word文件 (*.docx);;Excel文件 (*.xlsx *.xls);;CSV文件 (*.csv)"
+        )
+        if not file_paths:
+            return
+        self.remember_resume_dir(file_paths[0])
+        model_name = self.model_combo.currentText()
+        skipped = 0
+        for file_path in file_paths:
+            try:
+                get_extractor(file_path)
+            except UnsupportedDocumentError:
+                skipped += 1
+                continue
+            # 读取完成后再加入队列；记录选择时的岗位和模型，读取期间修改岗位不影响这批简历
+            self.pending_queue_files[file_path] = (job_info, model_name)
+            self.document_loader.load("queue", file_path)
+        self.statusBar().showMessage(
+            f"正在读取 {len(file_paths)} 份简历" + (f"，{skipped} 份格式不支持已跳过" if skipped > 0 else "")
+        )
+    
+    def check_api_key(self):
+        """检查API密钥和运行环境，可用时保存设置并返回密钥，否则提示并返回 None"""
+        api_key = self.api_key_input.text()
+        if not api_key:
+            QMessageBox.warning(self, "警告", "请输入API密钥")
+            return None
+        
+        # 验证 OpenAI 支持
+        if not OPENAI_SUPPORT:
+            QMessageBox.critical(self, "错误", "OpenAI 包未正确安装，请检查环境")
+            return None
             
-        except Exception as e:
-            QMessageBox.critical(self, "错误", f"加载简历文件失败: {str(e)}")
-    
-    def read_pdf(self, file_path):
-        """读取PDF文件内容"""
-        text = ""
-        with open(file_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-        return text
-    
-    def read_docx(self, file_path):
-        """读取Word文件内容"""
-        doc = docx.Document(file_path)
-        text = ""
-        for para in doc.paragraphs:
-            text += para.text + "\n"
-        return text
-    
-    def read_excel(self, file_path):
-        """读取Excel文件内容"""
-        df = pd.read_excel(file_path)
-        return df.to_string()
+        # 验证API密钥：只使用缓存的校验结果，未校验过的密钥由工作任务在后台校验一次
+        if get_key_validator().cached_status(api_key) is False:
+            self.show_invalid_api_key_warning()
+            return None
+        
+        # 保存设置
+        self.settings["api_key"] = api_key
+        self.settings["model"] = self.model_combo.currentText()
+        self.save_settings()
+        self.analysis_queue.api_key = api_key
+        return api_key
     
     def start_analysis(self):
-        """开始分析"""
+        """把当前的岗位和简历加入分析队列"""
         # 获取输入内容
         job_info = self.job_text.toPlainText()
         resume_info = self.resume_text.toPlainText()
-        api_key = self.api_key_input.text()
         model_name = self.model_combo.currentText()
         
         # 验证输入
@@ -867,121 +1664,211 @@ class ResumeMatchingApp(QMainWindow):
             QMessageBox.warning(self, "警告", "请输入简历信息")
             return
         
-        if not api_key:
-            QMessageBox.warning(self, "警告", "请输入API密钥")
+        # 命中缓存时直接显示结果，无需调用API
+        cached_result = None
+        if not self.force_refresh_check.isChecked():
+            cached_result = self.analysis_queue.cached_result(job_info, resume_info, model_name)
+            if self.result_cache is not None:
+                stats = self.result_cache.stats()
+                self.progress_bar.setToolTip(f"缓存命中 {stats['hits']} 次，未命中 {stats['misses']} 次")
+        
+        if cached_result is None and self.check_api_key() is None:
             return
         
-        # 验证 OpenAI 支持
-        if not OPENAI_SUPPORT:
-            QMessageBox.critical(self, "错误", "OpenAI 包未正确安装，请检查环境")
+        # 简历内容与选择的文件一致时记录文件路径
+        resume_path = self.resume_file_path if resume_info == self.resume_info else None
+        item = self.analysis_queue.enqueue(
+            job_info, resume_info, model_name, resume_path or None, cached_result=cached_result
+        )
+        self.select_queue_item(item.id)
+        self.result_tabs.setCurrentWidget(self.result_text)
+        self.update_queue_summary()
+    
+    def enqueue_file(self, file_path, resume_info, duplicate=None):
+        """批量添加的简历读取完成后加入队列；近似重复的简历按代表的文本分析，可直接复用其结果"""
+        job_info, model_name = self.pending_queue_files.pop(file_path)
+        if duplicate is not None:
+            resume_info = duplicate["text"]
+        cached_result = None
+        if not self.force_refresh_check.isChecked():
+            cached_result = self.analysis_queue.cached_result(job_info, resume_info, model_name)
+        item = self.analysis_queue.enqueue(
+            job_info, resume_info, model_name, file_path, cached_result=cached_result, duplicate=duplicate
+        )
+        if self.selected_item_id is None:
+            self.select_queue_item(item.id)
+        self.update_queue_summary()
+    
+    def selected_item(self):
+        """表格中选中的分析项"""
+        if self.selected_item_id is None:
+            return None
+        return self.analysis_queue.item(self.selected_item_id)
+    
+    def select_queue_item(self, item_id):
+        """在表格中选中一项"""
+        row = self.analysis_queue.model.row_of(item_id)
+        if row is not None:
+            self.queue_view.selectRow(row)
+            self.queue_view.scrollTo(self.analysis_queue.model.index(row, 0))
+    
+    def on_queue_selection_changed(self, current, previous):
+        """切换选中项时显示它的报告"""
+        item = self.analysis_queue.model.items[current.row()] if current.isValid() else None
+        self.selected_item_id = item.id if item else None
+        self.result_text.setPlainText(item.content if item else "")
+        self.reasoning_text.setPlainText(item.reasoning if item else "")
+        self.update_selected_controls()
+    
+    def update_selected_controls(self):
+        """进度条、按钮和状态栏跟随选中项"""
+        item = self.selected_item()
+        if item is None:
+            self.progress_bar.setValue(0)
+            self.progress_bar.setFormat("%p%")
+            self.stop_btn.setEnabled(False)
+            self.save_btn.setEnabled(False)
+            self.statusBar().clearMessage()
             return
-            
-        # 验证API密钥
-        try:
-            client = OpenAI(
-                api_key=api_key,
-                base_url="https://api.deepseek.com/v1"
-            )
-            # 发送一个简单的请求来验证API密钥
-            model = "deepseek-reasoner" if model_name == "DeepSeek R1" else "deepseek-chat"
-            client.chat.completions.create(
-                model=model,
-                messages=[{"role": "user", "content": "test"}],
-                max_tokens=1
+        self.progress_bar.setValue(item.progress)
+        if item.status == STATUS_CACHED:
+            self.progress_bar.setFormat("已使用缓存结果 %p%")
+        elif item.status in (STATUS_DUPLICATE, STATUS_WAITING) and item.detail:
+            self.progress_bar.setFormat(f"{item.status}  %p%  {item.detail}")
+        elif item.status in (STATUS_RUNNING, STATUS_DONE):
+            # 显示当前阶段和预计剩余时间
+            self.progress_bar.setFormat(f"%p%  {item.detail}" if item.detail else "%p%")
+        else:
+            self.progress_bar.setFormat(f"{item.status}  %p%")
+        self.stop_btn.setEnabled(not item.finished)
+        # 已经收到的部分结果也可保存
+        self.save_btn.setEnabled(bool(item.content))
+        if item.scores and item.scores["overall"] is not None:
+            self.statusBar().showMessage(
+                f"{item.candidate}：总体匹配分数 {format_score(item.scores['overall'])}　"
+                f"【{item.scores['recommendation'] or '未知'}】"
             )
-        except Exception as e:
-            error_msg = str(e).lower()
-            if "unauthorized" in error_msg or "invalid" in error_msg:
-                QMessageBox.warning(
-                    self,
-                    "API密钥错误",
-                    "您输入的API密钥无效。如果您还没有API密钥，可以前往 DeepSeek 开放平台官网申请。\n\n申请地址：https://platform.deepseek.com/"
-                )
-            else:
-                QMessageBox.warning(
-                    self,
-                    "连接错误",
-                    f"连接DeepSeek服务时出现错误，请检查网络连接或稍后重试。\n\n错误信息：{str(e)}"
-                )
+        else:
+            self.statusBar().clearMessage()
+    
+    def update_queue_summary(self):
+        """更新队列概况和队列按钮"""
+        counts = self.analysis_queue.counts()
+        total = sum(counts.values())
+        if total:
+            parts = [f"{status} {counts[status]}" for status in (
+                STATUS_RUNNING, STATUS_PENDING, STATUS_WAITING, STATUS_DONE, STATUS_CACHED, STATUS_DUPLICATE,
+                STATUS_FAILED, STATUS_STOPPED
+            ) if counts.get(status)]
+            self.queue_summary_label.setText(f"共 {total} 项：" + "，".join(parts))
+        else:
+            self.queue_summary_label.setText("队列为空")
+        unfinished = counts.get(STATUS_RUNNING, 0) + counts.get(STATUS_PENDING, 0) + counts.get(STATUS_WAITING, 0)
+        self.stop_all_btn.setEnabled(unfinished > 0)
+        self.clear_finished_btn.setEnabled(total > unfinished)
+        if counts.get(STATUS_RUNNING):
+            if not self.queue_timer.isActive():
+                self.queue_timer.start()
+        else:
+            self.queue_timer.stop()
+    
+    def refresh_running_items(self):
+        """刷新分析中条目的用时"""
+        for item in self.analysis_queue.model.items:
+            if item.status == STATUS_RUNNING:
+                self.analysis_queue.model.item_changed(item)
+    
+    def on_queue_item_updated(self, item_id):
+        if item_id == self.selected_item_id:
+            self.update_selected_controls()
+        self.update_queue_summary()
+    
+    def on_queue_content(self, item_id, text):
+        """追加选中项流式返回的分析结果"""
+        if item_id == self.selected_item_id:
+            self.append_text(self.result_text, text)
+    
+    def on_queue_reasoning(self, item_id, text):
+        """追加选中项流式返回的思考过程"""
+        if item_id == self.selected_item_id:
+            self.append_text(self.reasoning_text, text)
+    
+    def on_queue_item_finished(self, item_id):
+        """一项分析结束"""
+        self.update_queue_summary()
+        if item_id != self.selected_item_id:
             return
-        
-        # 保存设置
-        self.settings["api_key"] = api_key
-        self.settings["model"] = model_name
-        self.save_settings()
-        
-        # 禁用开始按钮，启用停止按钮
-        self.analyze_btn.setEnabled(False)
-        self.stop_btn.setEnabled(True)
-        self.save_btn.setEnabled(False)
-        
-        # 清空结果
-        self.result_text.clear()
-        
-        # 创建并启动工作线程
-        self.analysis_worker = AnalysisWorker(job_info, resume_info, api_key, model_name)
-        self.analysis_worker.progress_updated.connect(self.update_progress)
-        self.analysis_worker.analysis_completed.connect(self.analysis_complete)
-        self.analysis_worker.analysis_error.connect(self.analysis_error)
-        self.analysis_worker.start()
+        item = self.analysis_queue.item(item_id)
+        # 直接显示API返回的原始结果（流式模式下内容已逐步追加，此处以完整结果为准）
+        if item.result is not None and self.result_text.toPlainText() != item.result:
+            self.result_text.setPlainText(item.result)
+        self.update_selected_controls()
+        # 只对选中项弹出错误，其余项的错误显示在表格的提示中；密钥无效单独提示
+        if item.status == STATUS_FAILED and item.error and item.error != API_KEY_INVALID_ERROR:
+            QMessageBox.critical(self, "错误", f"分析过程中出错: {item.error}")
     
     def stop_analysis(self):
-        """停止分析"""
-        if self.analysis_worker and self.analysis_worker.isRunning():
-            self.analysis_worker.stop()
-            # 重置进度条
-            self.progress_bar.setValue(0)
-            # 恢复按钮状态
-            self.analyze_btn.setEnabled(True)
-            self.stop_btn.setEnabled(False)
+        """停止选中的分析"""
+        if self.selected_item_id is not None:
+            self.analysis_queue.stop(self.selected_item_id)
     
-    def update_progress(self, value):
-        """更新进度条"""
-        self.progress_bar.setValue(value)
+    def stop_all_analyses(self):
+        """停止队列中所有未结束的分析"""
+        self.analysis_queue.stop_all()
+        self.update_queue_summary()
     
-    def analysis_complete(self, result):
-        """分析完成"""
-        # 直接显示API返回的原始结果
-        self.result_text.setPlainText(result)
-        
-        # 恢复按钮状态
-        self.analyze_btn.setEnabled(True)
-        self.stop_btn.setEnabled(False)
-        self.save_btn.setEnabled(True)
+    def clear_finished_analyses(self):
+        """从表格中移除已结束的分析"""
+        self.analysis_queue.model.remove_finished()
+        # 重置模型后表格没有选中项
+        self.selected_item_id = None
+        self.result_text.clear()
+        self.reasoning_text.clear()
+        self.update_selected_controls()
+        self.update_queue_summary()
     
-    def analysis_error(self, error_msg):
-        """分析错误"""
-        QMessageBox.critical(self, "错误", f"分析过程中出错: {error_msg}")
-        self.analyze_btn.setEnabled(True)
-        self.stop_btn.setEnabled(False)
+    def append_text(self, text_edit, text):
+        """在文本框末尾追加文本，不打断用户的滚动位置"""
+        scroll_bar = text_edit.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum() - 4
+        cursor = QTextCursor(text_edit.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+    
+    def show_invalid_api_key_warning(self):
+        """提示API密钥无效"""
+        QMessageBox.warning(
+            self,
+            "API密钥错误",
+            "您输入的API密钥无效。如果您还没有API密钥，可以前往 DeepSeek 开放平台官网申请。\n\n申请地址：https://platform.deepseek.com/"
+        )
+    
+    def api_key_invalid(self):
+        """分析时发现API密钥无效（等待中的分析已一并取消）"""
+        self.update_queue_summary()
+        self.show_invalid_api_key_warning()
     
     def save_results(self):
-        """保存分析结果"""
-        if not self.result_text.toPlainText():
+        """保存选中项的分析结果"""
+        item = self.selected_item()
+        if item is None or not item.content:
             QMessageBox.warning(self, "警告", "没有可保存的结果")
             return
         
         # 获取当前日期缩写
         date_str = datetime.now().strftime("%y%m%d")
         
-        # 从岗位信息中提取职位名称
-        job_info = self.job_text.toPlainText()
-        job_title = "未知职位"
-        for line in job_info.split('\n'):
-            if "职位" in line or "岗位" in line:
-                job_title = line.split('：')[-1].strip()
-                break
-        
-        # 从简历信息中提取候选人姓名
-        resume_info = self.resume_text.toPlainText()
-        candidate_name = "未知候选人"
-        for line in resume_info.split('\n'):
-            if "姓名" in line:
-                candidate_name = line.split('：')[-1].strip()
-                break
+        # 职位名称和候选人姓名在加入队列时已从岗位信息和简历信息中提取
+        job_title = item.job_title
+        candidate_name = item.candidate
         
-        # 构建默认文件名
-        default_filename = f"{job_title}_{candidate_name}_{date_str}.txt"
+        # 构建默认文件名，解析出总分时一并写入
+        if item.scores and item.scores["overall"] is not None:
+            default_filename = f"{job_title}_{candidate_name}_{format_score(item.scores['overall'])}分_{date_str}.txt"
+        else:
+            default_filename = f"{job_title}_{candidate_name}_{date_str}.txt"
         
         file_path, _ = QFileDialog.getSaveFileName(
             self, 
@@ -993,7 +1880,7 @@ class ResumeMatchingApp(QMainWindow):
         if file_path:
             try:
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.result_text.toPlainText())
+                    f.write(item.content)
                 QMessageBox.information(self, "成功", "分析结果已保存")
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"保存结果失败: {str(e)}")
@@ -1021,27 +1908,82 @@ class ResumeMatchingApp(QMainWindow):
             QMessageBox.warning(self, "警告", f"保存设置失败: {str(e)}")
             print(f"保存设置失败: {str(e)}")
     
-    def load_job_history(self):
-        """加载历史岗位记录"""
+    def load_result_cache(self):
+        """打开分析结果缓存，失败时不使用缓存"""
         try:
-            history_path = get_resource_path('job_history.json')
-            if os.path.exists(history_path):
-                with open(history_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        return []
+            return ResultCache(get_resource_path('analysis_cache.db'), **self.settings.get("result_cache", {}))
+        except Exception as e:
+            print(f"打开结果缓存失败: {str(e)}")
+            return None
+    
+    def load_extraction_store(self):
+        """打开持久化的提取缓存，失败时只使用进程内缓存"""
+        try:
+            return ExtractionStore(get_resource_path('extraction_cache.db'), **self.settings.get("extraction_cache", {}))
+        except Exception as e:
+            print(f"打开提取缓存失败: {str(e)}")
+            return None
+    
+    def load_result_store(self):
+        """打开结构化评分结果库，失败时不记录"""
+        try:
+            return ResultStore(get_resource_path('analysis_results.db'))
+        except Exception as e:
+            print(f"打开结果库失败: {str(e)}")
+            return None
+    
+    def load_resume_index(self):
+        """打开简历库，失败时不建立索引"""
+        try:
+            return open_resume_index(
+                get_resource_path('resume_index.db'),
+                semantic=self.settings.get("semantic_search", True),
+                embedding_model=self.settings.get("embedding_model")
+            )
+        except Exception as e:
+            print(f"打开简历库失败: {str(e)}")
+            return None
+    
+    def load_dedup_index(self):
+        """打开简历指纹库，设置中关闭或打开失败时不检测重复"""
+        if not self.settings.get("dedup", True):
+            return None
+        try:
+            return DuplicateIndex(
+                get_resource_path('resume_fingerprints.db'),
+                threshold=self.settings.get("dedup_threshold", DEFAULT_DEDUP_THRESHOLD)
+            )
+        except Exception as e:
+            print(f"打开简历指纹库失败: {str(e)}")
+            return None
     
-    def save_job_history(self):
-        """保存历史岗位记录"""
+    def load_job_store(self):
+        """
+        打开历史职位库，第一次打开时导入旧的 job_history.json
+
+        数据库被锁定或已损坏时改用内存中的临时库，应用照常启动（本次保存的职位不会保留）。
+        """
+        store_path = get_resource_path('job_history.db')
         try:
-            history_path = get_resource_path('job_history.json')
             # 确保目录存在
-            os.makedirs(os.path.dirname(history_path), exist_ok=True)
-            with open(history_path, "w", encoding="utf-8") as f:
-                json.dump(self.job_history, f, ensure_ascii=False, indent=4)
+            os.makedirs(os.path.dirname(store_path), exist_ok=True)
+            store = JobStore(store_path)
+        except Exception as e:
+            print(f"打开历史职位库失败，本次使用临时历史职位库: {str(e)}")
+            store = JobStore(":memory:")
+        try:
+            store.import_json(get_resource_path('job_history.json'))
         except Exception as e:
-            QMessageBox.warning(self, "警告", f"保存历史记录失败: {str(e)}")
+            print(f"导入旧历史记录失败: {str(e)}")
+        return store
+    
+    def closeEvent(self, event):
+        """关闭窗口时取消正在进行和排队的分析"""
+        self.analysis_queue.shutdown(2000)
+        self.document_loader.shutdown()
+        if self.resume_index is not None:
+            self.resume_index.flush()
+        super().closeEvent(event)
     
     def toggle_api_key_visibility(self):
         """切换API密钥的可见性"""
@@ -1052,20 +1994,105 @@ class ResumeMatchingApp(QMainWindow):
             self.api_key_input.setEchoMode(QLineEdit.Password)
             self.toggle_api_key_btn.setText("👁‍🗨")  # 显示闭眼图标
     
-    def load_history_job(self, current_item, dialog):
-        """加载选中的历史职位"""
-        if not current_item:
-            QMessageBox.warning(self, "提示", "请先选择要加载的职位")
+    def load_history_job(self, job_id):
+        """按编号加载历史职位"""
+        # 按编号读取职位信息
+        job = self.job_store.get(job_id)
+        if not job:
+            QMessageBox.warning(self, "提示", "该职位已被删除")
+            return
+        self.job_text.setText(job["content"])
+        # 直接从简历库给出候选人名单，不重新读取文件
+        self.show_candidate_shortlist(job["content"], quiet=True)
+    
+    def show_candidate_shortlist(self, job_info, quiet=False):
+        """在简历库中检索与岗位最相关的简历，选中后直接载入简历内容"""
+        if not job_info.strip():
+            if not quiet:
+                QMessageBox.warning(self, "提示", "请先输入岗位信息")
+            return
+        if self.resume_index is None:
+            return
+        
+        start_time = time.perf_counter()
+        try:
+            candidates = self.resume_index.search(
+                job_info,
+                limit=self.settings.get("shortlist_size", 20),
+                method=self.settings.get("shortlist_method", "hybrid")
+            )
+        except Exception as e:
+            QMessageBox.warning(self, "错误", f"检索简历库失败：{str(e)}")
             return
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        self.statusBar().showMessage(f"简历库中找到 {len(candidates)} 位候选人，用时 {elapsed_ms:.0f} ms")
+        if not candidates:
+            if not quiet:
+                QMessageBox.information(self, "提示", "简历库中没有相关的简历")
+            return
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("简历库候选人")
+        dialog.setMinimumWidth(500)
+        layout = QVBoxLayout()
+        
+        list_widget = QListWidget()
+        list_widget.setSelectionMode(QListWidget.SingleSelection)
+        for candidate in candidates:
+            skills = "、".join(candidate["matched_skills"]) or "无"
+            item = QListWidgetItem(
+                f"{candidate['score']:.2f}　{candidate['candidate']}　{os.path.basename(candidate['path'])}\n"
+                f"　　匹配技能：{skills}"
+            )
+            item.setData(Qt.UserRole, candidate)
+            list_widget.addItem(item)
+        list_widget.setCurrentRow(0)
+        list_widget.itemDoubleClicked.connect(lambda item: self.load_shortlisted_resume(item, dialog))
+        layout.addWidget(list_widget)
         
-        # 获取职位信息
-        job = current_item.data(Qt.UserRole)
-        if job:
-            self.job_text.setText(job.get("content", ""))
-            dialog.accept()
+        button_layout = QHBoxLayout()
+        load_btn = QPushButton("载入选中简历")
+        load_btn.clicked.connect(lambda: self.load_shortlisted_resume(list_widget.currentItem(), dialog))
+        button_layout.addWidget(load_btn)
+        cancel_btn = QPushButton("关闭")
+        cancel_btn.clicked.connect(dialog.reject)
+        button_layout.addWidget(cancel_btn)
+        layout.addLayout(button_layout)
+        
+        dialog.setLayout(layout)
+        dialog.exec()
+    
+    def load_shortlisted_resume(self, current_item, dialog):
+        """从简历库载入选中的简历原文"""
+        if not current_item:
+            QMessageBox.warning(self, "提示", "请先选择简历")
+            return
+        candidate = current_item.data(Qt.UserRole)
+        text = self.resume_index.get_text(candidate["id"])
+        if text is None:
+            QMessageBox.warning(self, "提示", "该简历已从简历库中删除")
+            return
+        self.resume_file_path = candidate["path"]
+        self.resume_file_label.setText(os.path.basename(candidate["path"]))
+        self.resume_info = text
+        self.resume_text.setText(text)
+        dialog.accept()
 
 if __name__ == "__main__":
+    # 打包后的应用使用进程池解析文档时需要
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
+    mark_startup("qapplication")
     window = ResumeMatchingApp()
+    if "--startup-report" in sys.argv:
+        # 启动耗时报告（见 benchmarks/startup.py）：预加载完成后输出 JSON 并退出
+        def print_startup_report(warm_up_times):
+            print("STARTUP_REPORT " + json.dumps(window.startup_report(warm_up_times), ensure_ascii=False), flush=True)
+            app.quit()
+        window.warm_up_finished.connect(print_startup_report)
+        # -X importtime 的输出中以此分隔窗口显示前后的导入
+        QTimer.singleShot(0, lambda: print("STARTUP_FIRST_WINDOW", file=sys.stderr, flush=True))
     window.show()
-    sys.exit(app.exec()) 
\ No newline at end of file
+    # 第一轮事件循环处理完成（窗口已绘制）之后再做其余的准备工作
+    QTimer.singleShot(0, window.on_first_shown)
+    sys.exit(app.exec())
\ No newline at end of file
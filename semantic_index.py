@@ -0,0 +1,368 @@
+"""
+语义匹配：本地文本向量 + 内存映射的向量矩阵，按余弦相似度检索简历
+
+关键词重合会漏掉替代性技术（岗位要 PostgreSQL、简历写 MySQL）。这里在本地把岗位和
+简历编码成向量，在 CPU 上几毫秒内完成检索，不需要调用大模型：
+
+- HashingEmbedder：确定性的哈希 n-gram 向量，词项、英文字符三元组和技能类别
+  （text_tokenizer.SKILL_GROUPS）都映射到同一个向量空间，同类技术相互加分；不依赖模型文件
+- SentenceEmbedder：安装了 sentence-transformers 且在设置中指定了本地模型时使用
+
+向量归一化后按 float16 存放在内存映射文件中，检索时分块做矩阵乘法并用 argpartition 取前 K 个，
+十万份简历的一次检索远低于一秒。
+"""
+import os
+import json
+import time
+import zlib
+import threading
+
+import numpy as np
+
+from lazy_import import lazy_import, module_available
+from text_tokenizer import extract_skills, skill_concepts, tokenize
+
+# 可选：sentence-transformers 本地向量模型（导入需要数秒，只在指定了模型时导入）
+SENTENCE_TRANSFORMERS_SUPPORT = module_available("sentence_transformers")
+sentence_transformers = lazy_import("sentence_transformers")
+
+DEFAULT_DIMENSIONS = 256
+# 检索时每次参与矩阵乘法的行数（float16 需先转换为 float32）
+SEARCH_CHUNK_ROWS = 32768
+# 写入后距上次同步超过该秒数时才把内存映射和 meta.json 写回磁盘，其余在 flush() / close() 时同步
+FLUSH_INTERVAL_SECONDS = 5.0
+# 已删除（或被替换）的行超过该行数且占总行数的比例超过 COMPACT_DEAD_RATIO 时压缩矩阵
+COMPACT_MIN_DEAD_ROWS = 1024
+COMPACT_DEAD_RATIO = 0.25
+
+# 各类特征的权重
+TERM_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.3
+SKILL_WEIGHT = 2.0
+CONCEPT_WEIGHT = 1.5
+
+
+class HashingEmbedder:
+    """哈希 n-gram 向量（确定性，进程之间、机器之间结果一致）"""
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+        self._buckets = {}
+
+    def _bucket(self, feature):
+        """特征 -> (维度, 符号)；使用 crc32 而不是 hash()，后者每个进程的随机种子不同"""
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            value = zlib.crc32(feature.encode('utf-8'))
+            bucket = (value % self.dimensions, 1.0 if value & 0x80000000 else -1.0)
+            if len(self._buckets) < 1000000:
+                self._buckets[feature] = bucket
+        return bucket
+
+    def _features(self, text):
+        terms = tokenize(text)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        # 对数词频，避免高频词主导向量
+        features = {f"t:{term}": TERM_WEIGHT * (1.0 + np.log(count)) for term, count in counts.items()}
+        for term in counts:
+            # 英文词的字符三元组：postgres / postgresql、k8s 写法差异也能部分匹配
+            if term.isascii() and len(term) > 3:
+                padded = f"<{term}>"
+                for i in range(len(padded) - 2):
+                    key = f"g:{padded[i:i + 3]}"
+                    features[key] = features.get(key, 0.0) + TRIGRAM_WEIGHT
+        skills = extract_skills(text, terms)
+        for skill in skills:
+            features[f"s:{skill}"] = SKILL_WEIGHT
+        for concept in skill_concepts(skills):
+            features[f"c:{concept}"] = CONCEPT_WEIGHT
+        return features
+
+    def embed(self, text):
+        """返回 L2 归一化的 float32 向量"""
+        features = self._features(text)
+        indices = np.empty(len(features), dtype=np.int64)
+        weights = np.empty(len(features), dtype=np.float64)
+        for i, (feature, weight) in enumerate(features.items()):
+            indices[i], sign = self._bucket(feature)
+            weights[i] = sign * weight
+        vector = np.bincount(indices, weights, minlength=self.dimensions).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+class SentenceEmbedder:
+    """本地 sentence-transformers 模型（需单独安装并下载模型）"""
+    def __init__(self, model_path):
+        if not SENTENCE_TRANSFORMERS_SUPPORT:
+            raise ImportError("未安装 sentence-transformers")
+        self.model = sentence_transformers.SentenceTransformer(model_path, device="cpu")
+        self.dimensions = self.model.get_sentence_embedding_dimension()
+        self.name = f"sentence-{os.path.basename(os.path.normpath(model_path))}-{self.dimensions}"
+
+    def embed(self, text):
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+def get_embedder(model_path=None, dimensions=DEFAULT_DIMENSIONS):
+    """指定了本地模型且可用时使用模型，否则使用哈希向量"""
+    if model_path:
+        try:
+            return SentenceEmbedder(model_path)
+        except Exception as e:
+            print(f"加载向量模型失败，改用哈希向量: {str(e)}")
+    return HashingEmbedder(dimensions)
+
+
+class VectorStore:
+    """
+    内存映射的向量矩阵：每行一个归一化向量，对应一个整数键
+
+    目录中包含 vectors.bin（矩阵）、keys.bin（每行的键，-1 表示已删除）和 meta.json。
+    写入不逐次同步到磁盘（见 FLUSH_INTERVAL_SECONDS），异常退出时丢失的向量由
+    ResumeIndex.warm_up() 补充编码。删除的行先只做标记，积累到一定数量（以及关闭时）
+    把有效行前移压缩，矩阵和检索的行数不随同一份简历的反复写入而增长。
+    """
+    def __init__(self, directory, dimensions, name="", dtype="float16"):
+        self.directory = directory
+        self.dimensions = dimensions
+        self.name = name
+        self.dtype = np.dtype(dtype)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._vectors_path = os.path.join(directory, "vectors.bin")
+        self._keys_path = os.path.join(directory, "keys.bin")
+
+        meta = None
+        if os.path.exists(self._meta_path):
+            try:
+                with open(self._meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+            except Exception as e:
+                print(f"读取向量索引失败: {str(e)}")
+        expected = {"dimensions": dimensions, "name": name, "dtype": self.dtype.name}
+        if meta is None or any(meta.get(key) != value for key, value in expected.items()):
+            # 向量模型或维度变化后旧向量不能再用，重新开始
+            self.count = 0
+            self._open(0, reset=True)
+        else:
+            self.count = meta["count"]
+            self._open(meta["capacity"])
+        self._rows = {int(key): row for row, key in enumerate(self._keys[:self.count]) if key >= 0}
+
+    def _open(self, capacity, reset=False):
+        if reset:
+            for path in (self._vectors_path, self._keys_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        self.capacity = capacity
+        if capacity == 0:
+            self._vectors = np.zeros((0, self.dimensions), dtype=self.dtype)
+            self._keys = np.zeros(0, dtype=np.int64)
+            return
+        self._vectors = np.memmap(
+            self._vectors_path, dtype=self.dtype, mode="r+" if os.path.exists(self._vectors_path) else "w+",
+            shape=(capacity, self.dimensions)
+        )
+        self._keys = np.memmap(
+            self._keys_path, dtype=np.int64, mode="r+" if os.path.exists(self._keys_path) else "w+",
+            shape=(capacity,)
+        )
+
+    def _reserve(self, rows):
+        """确保还能追加 rows 行，容量不足时扩大文件（按倍数增长）"""
+        needed = self.count + rows
+        if needed <= self.capacity:
+            return
+        self._resize(max(needed, self.capacity * 2, 1024))
+
+    def _resize(self, capacity):
+        """把矩阵和键文件的容量调整为 capacity 行（调用方持有锁）"""
+        self._flush()
+        self._vectors = self._keys = None
+        for path, row_bytes in ((self._vectors_path, self.dimensions * self.dtype.itemsize), (self._keys_path, 8)):
+            with open(path, 'ab') as f:
+                f.truncate(capacity * row_bytes)
+        self._open(capacity)
+        # meta.json 中的容量与文件大小保持一致（缩小后按旧容量映射会失败）
+        self._flush()
+
+    def _compact(self):
+        """
+        把有效行按原顺序前移，去掉已删除的行并重建 键 -> 行号 的映射（调用方持有锁）
+
+        压缩期间 meta.json 中的行数记为 0：中途异常退出时下次打开视为空索引，
+        由 ResumeIndex.warm_up() 重新编码，不会读到错位的向量。
+        """
+        live = np.flatnonzero(np.asarray(self._keys[:self.count]) >= 0)
+        count = self.count
+        self.count = 0
+        self._flush()
+        # 目标行号总不大于源行号，按顺序分块前移不会覆盖尚未移动的行
+        for start in range(0, len(live), SEARCH_CHUNK_ROWS):
+            rows = live[start:start + SEARCH_CHUNK_ROWS]
+            self._vectors[start:start + len(rows)] = self._vectors[rows]
+            self._keys[start:start + len(rows)] = self._keys[rows]
+        self._keys[len(live):count] = -1
+        self.count = len(live)
+        self._rows = {int(key): row for row, key in enumerate(self._keys[:self.count])}
+        if self.capacity > max(2 * self.count, 1024):
+            # 释放多余的容量
+            self._resize(max(self.count, 1024))
+        else:
+            self._flush()
+
+    def _dead_rows(self):
+        return self.count - len(self._rows)
+
+    def _flush(self):
+        if isinstance(self._vectors, np.memmap):
+            self._vectors.flush()
+            self._keys.flush()
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "dimensions": self.dimensions, "name": self.name, "dtype": self.dtype.name,
+                "count": self.count, "capacity": self.capacity,
+            }, f)
+        os.replace(tmp_path, self._meta_path)
+        self._dirty = False
+        self._flushed_at = time.monotonic()
+
+    def _changed(self):
+        """记录有未同步的写入，距上次同步已超过 FLUSH_INTERVAL_SECONDS 时立即同步（调用方持有锁）"""
+        self._dirty = True
+        if time.monotonic() - self._flushed_at >= FLUSH_INTERVAL_SECONDS:
+            self._flush()
+
+    def flush(self):
+        """把未同步的写入写回磁盘"""
+        with self._lock:
+            if self._dirty:
+                self._flush()
+
+    def add_many(self, keys, vectors):
+        """批量写入（已存在的键覆盖原向量）"""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        with self._lock:
+            new_rows = sum(1 for key in keys if int(key) not in self._rows)
+            self._reserve(new_rows)
+            for key, vector in zip(keys, vectors):
+                key = int(key)
+                row = self._rows.get(key)
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    self._rows[key] = row
+                    self._keys[row] = key
+                self._vectors[row] = vector
+            self._changed()
+
+    def add(self, key, vector):
+        self.add_many([key], [vector])
+
+    def remove(self, key):
+        with self._lock:
+            row = self._rows.pop(int(key), None)
+            if row is None:
+                return False
+            self._keys[row] = -1
+            dead = self._dead_rows()
+            if dead >= COMPACT_MIN_DEAD_ROWS and dead > self.count * COMPACT_DEAD_RATIO:
+                self._compact()
+            else:
+                self._changed()
+            return True
+
+    def keys(self):
+        with self._lock:
+            return set(self._rows)
+
+    def similarities(self, query):
+        """返回 (键数组, 余弦相似度数组)，已删除的行不包含在内"""
+        query = np.asarray(query, dtype=np.float32)
+        with self._lock:
+            count = self.count
+            keys = np.array(self._keys[:count])
+            scores = np.empty(count, dtype=np.float32)
+            for start in range(0, count, SEARCH_CHUNK_ROWS):
+                chunk = self._vectors[start:min(start + SEARCH_CHUNK_ROWS, count)]
+                scores[start:start + len(chunk)] = chunk.astype(np.float32, copy=False) @ query
+        valid = keys >= 0
+        return keys[valid], scores[valid]
+
+    def search(self, query, k=20):
+        """返回相似度最高的 k 个 (键, 相似度)，按相似度从高到低排列"""
+        keys, scores = self.similarities(query)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(keys[i]), float(scores[i])) for i in top]
+
+    def __len__(self):
+        return len(self._rows)
+
+    def compact(self):
+        """压缩掉已删除的行"""
+        with self._lock:
+            if self._dead_rows():
+                self._compact()
+
+    def close(self):
+        """压缩掉已删除的行并同步到磁盘"""
+        with self._lock:
+            if self._dead_rows():
+                self._compact()
+            elif self._dirty:
+                self._flush()
+
+
+class SemanticIndex:
+    """文本向量索引：编码文本后写入 VectorStore"""
+    def __init__(self, directory, embedder=None, dtype="float16"):
+        self.embedder = embedder or HashingEmbedder()
+        self.store = VectorStore(directory, self.embedder.dimensions, name=self.embedder.name, dtype=dtype)
+
+    def embed(self, text):
+        return self.embedder.embed(text)
+
+    def add(self, key, text):
+        self.store.add(key, self.embedder.embed(text))
+
+    def add_vector(self, key, vector):
+        """写入已编码的向量（编码可以在持有其他锁之前完成）"""
+        self.store.add(key, vector)
+
+    def add_many(self, items):
+        """items 为 (键, 文本) 序列"""
+        items = list(items)
+        if items:
+            self.store.add_many([key for key, _ in items], [self.embedder.embed(text) for _, text in items])
+
+    def remove(self, key):
+        return self.store.remove(key)
+
+    def keys(self):
+        return self.store.keys()
+
+    def similarities(self, text):
+        return self.store.similarities(self.embedder.embed(text))
+
+    def search(self, text, k=20):
+        return self.store.search(self.embedder.embed(text), k)
+
+    def flush(self):
+        self.store.flush()
+
+    def close(self):
+        self.store.close()
+
+    def __len__(self):
+        return len(self.store)
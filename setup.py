@@ -24,7 +24,7 @@ OPTIONS = {
         'PySide6.QtWidgets',
         'openai',
         'PyPDF2',
-        'docx',
+        'openpyxl',
         'pandas.core',
         'pandas.io.parsers',
         'pandas.io.formats',
@@ -126,7 +126,7 @@ setup(
         'PySide6',
         'openai',
         'PyPDF2',
-        'python-docx',
+        'openpyxl',
         'pandas',
         'Pillow',
     ],
@@ -0,0 +1,27 @@
+from result_parser import parse_scores
+
+
+def test_json_block():
+    text = '分析……\n```json\n{"总体匹配分数": 86, "核心技术栈匹配度": "90分", "推荐级别": "推荐"}\n```'
+    scores = parse_scores(text)
+    assert scores["overall"] == 86
+    assert scores["tech_stack"] == 90
+    assert scores["recommendation"] == "推荐"
+
+
+def test_text_fallback():
+    scores = parse_scores("核心技术栈匹配度：75分\n总体匹配分数：82/100\n最终推荐：【推荐】")
+    assert scores["tech_stack"] == 75
+    assert scores["overall"] == 82
+    assert scores["recommendation"] == "推荐"
+
+
+def test_echoed_rubric_range_is_not_a_score():
+    scores = parse_scores("综合评分（0-100）：85\n核心技术栈匹配度(0~100分): 70")
+    assert scores["overall"] == 85
+    assert scores["tech_stack"] == 70
+    assert parse_scores("总体匹配分数（满分100）：90")["overall"] == 90
+
+
+def test_parenthesised_score():
+    assert parse_scores("总体匹配分数（85分）")["overall"] == 85
@@ -0,0 +1,141 @@
+"""
+中英文混合文本的分词与技能词提取（本地预筛选、简历索引共用）
+
+- 英文 / 技术词：转小写，保留 c++、c#、node.js 这类写法，并把常见别名统一（k8s → kubernetes）
+- 中文：安装了 jieba 时用搜索引擎模式分词，否则切成相邻两字（bigram），不需要词典也能匹配
+- 技能词：从固定词表中识别，用于计算岗位要求技能的覆盖率
+"""
+import re
+
+from lazy_import import lazy_import, module_available
+
+# 可选：jieba 中文分词（第一次分词时才导入）
+JIEBA_SUPPORT = module_available("jieba")
+jieba = lazy_import("jieba", on_load=lambda module: module.setLogLevel(60))
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*|[一-鿿]+")
+
+# 技术词别名 -> 统一写法
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "kube": "kubernetes",
+    "golang": "go",
+    "js": "javascript",
+    "ts": "typescript",
+    "postgres": "postgresql",
+    "pgsql": "postgresql",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "node.js": "nodejs",
+    "node": "nodejs",
+    "c++": "cpp",
+    "c#": "csharp",
+    "sklearn": "scikit-learn",
+    "tf": "tensorflow",
+    "es": "elasticsearch",
+    "mongo": "mongodb",
+    "aws": "aws",
+    "gcp": "gcp",
+}
+
+# 英文技能词表（统一写法）
+SKILL_TERMS = frozenset("""
+python java go cpp c csharp rust scala kotlin swift php ruby perl lua shell bash powershell
+javascript typescript html css react vue angular nodejs webpack flutter android ios
+spring springboot django flask fastapi gin mybatis hibernate
+mysql postgresql oracle sqlserver sqlite mongodb redis memcached elasticsearch clickhouse hbase hive
+cassandra tidb etcd zookeeper consul
+kafka rabbitmq rocketmq pulsar nginx envoy istio haproxy ingress
+kubernetes docker containerd helm harbor kubelet kube-proxy operator
+linux unix tcp http https grpc dns tcpdump wireshark
+prometheus grafana zabbix elk logstash kibana fluentd jaeger skywalking opentelemetry
+jenkins gitlab git ansible terraform saltstack puppet argocd
+aws azure gcp aliyun openstack ceph glusterfs minio
+hadoop spark flink storm airflow
+pytorch tensorflow keras scikit-learn numpy pandas opencv cuda nccl triton
+llm nlp cv rag transformer
+""".split())
+
+# 中文技能 / 方向词（直接在原文中查找）
+CHINESE_SKILL_TERMS = (
+    "运维", "自动化运维", "容器", "容器化", "云原生", "微服务", "分布式", "高可用", "监控", "日志",
+    "调度", "存储", "网络", "安全", "数据库", "中间件", "大数据", "数据仓库", "机器学习", "深度学习",
+    "推荐系统", "搜索", "算法", "前端", "后端", "全栈", "测试", "自动化测试", "性能优化", "架构",
+    "嵌入式", "客户端", "移动端", "游戏", "音视频", "区块链", "数据分析", "产品经理",
+)
+
+# 可以相互替代的技术归为同一类，用于在本地相似度中认可替代性技术和可迁移技能
+SKILL_GROUPS = {
+    "容器编排": ("kubernetes", "docker", "containerd", "helm", "openstack", "容器", "容器化", "云原生"),
+    "关系数据库": ("mysql", "postgresql", "oracle", "sqlserver", "sqlite", "tidb", "数据库"),
+    "缓存与键值存储": ("redis", "memcached", "etcd", "consul", "zookeeper"),
+    "消息队列": ("kafka", "rabbitmq", "rocketmq", "pulsar", "中间件"),
+    "搜索与分析存储": ("elasticsearch", "clickhouse", "hbase", "hive", "cassandra", "mongodb", "搜索"),
+    "监控与可观测": ("prometheus", "grafana", "zabbix", "elk", "logstash", "kibana", "fluentd", "jaeger",
+                 "skywalking", "opentelemetry", "监控", "日志"),
+    "自动化与交付": ("jenkins", "gitlab", "ansible", "terraform", "saltstack", "puppet", "argocd", "自动化运维"),
+    "网络与流量": ("nginx", "envoy", "istio", "haproxy", "ingress", "tcp", "http", "https", "grpc", "dns",
+               "tcpdump", "wireshark", "网络"),
+    "公有云": ("aws", "azure", "gcp", "aliyun"),
+    "分布式存储": ("ceph", "glusterfs", "minio", "存储"),
+    "大数据计算": ("hadoop", "spark", "flink", "storm", "airflow", "大数据", "数据仓库"),
+    "机器学习框架": ("pytorch", "tensorflow", "keras", "scikit-learn", "cuda", "nccl", "triton", "机器学习", "深度学习"),
+    "后端语言": ("python", "java", "go", "cpp", "c", "csharp", "rust", "scala", "kotlin", "php", "ruby", "后端"),
+    "前端框架": ("javascript", "typescript", "react", "vue", "angular", "webpack", "html", "css", "前端"),
+    "后端框架": ("spring", "springboot", "django", "flask", "fastapi", "gin", "nodejs"),
+    "移动端": ("android", "ios", "flutter", "swift", "kotlin", "移动端", "客户端"),
+    "脚本与系统": ("linux", "unix", "shell", "bash", "powershell", "perl", "lua", "运维"),
+}
+
+# 技能 -> 所属类别
+SKILL_CONCEPTS = {}
+for _concept, _members in SKILL_GROUPS.items():
+    for _member in _members:
+        SKILL_CONCEPTS.setdefault(_member, []).append(_concept)
+
+# 几乎所有简历和岗位都会出现、对区分度没有帮助的词
+STOPWORDS = frozenset("""
+the and for with of to in on a an is are be or as at by from we you our your
+负责 熟悉 熟练 掌握 了解 具有 具备 以上 优先 相关 工作 经验 能力 良好 以及 进行 参与 完成 使用 公司 项目
+""".split())
+
+
+def normalize_term(term):
+    """统一技术词写法"""
+    return SKILL_ALIASES.get(term, term)
+
+
+def _chinese_terms(run):
+    """把一段连续的中文切成词项"""
+    if JIEBA_SUPPORT:
+        return [word for word in jieba.lcut_for_search(run) if len(word) > 1]
+    if len(run) == 1:
+        return []
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text, stopwords=STOPWORDS):
+    """把文本切分为词项列表（小写、统一别名、去掉停用词）；stopwords 传空集合时保留所有词"""
+    terms = []
+    for match in _TOKEN_RE.findall((text or "").lower()):
+        if match[0] >= "一":
+            terms.extend(term for term in _chinese_terms(match) if term not in stopwords)
+        elif match not in stopwords:
+            terms.append(normalize_term(match))
+    return terms
+
+
+def extract_skills(text, terms=None):
+    """提取文本中出现的技能词（统一写法），terms 为已分好的词项时可避免重复分词"""
+    if terms is None:
+        terms = tokenize(text)
+    skills = {term for term in terms if term in SKILL_TERMS}
+    skills.update(term for term in CHINESE_SKILL_TERMS if term in (text or ""))
+    return skills
+
+
+def skill_concepts(skills):
+    """技能所属的技术类别（同类技术可以相互替代）"""
+    return {concept for skill in skills for concept in SKILL_CONCEPTS.get(skill, ())}
@@ -0,0 +1,271 @@
+"""
+提示词预算：发送请求前在本地估算 token 数，超出预算时压缩或截断岗位 / 简历
+
+扫描版长 PDF、大表格转成的文本会原样进入提示词，拖慢响应、增加费用，甚至超出上下文长度。
+PromptBudgeter 在构建消息时：
+
+1. 压缩文本（compact_text）：合并空白和空行，去掉页码、分隔线和反复出现的页眉页脚，
+   不改变实际内容（表格中的空单元格在提取时已跳过，见 document_reader）
+2. 统计评分规则、岗位和简历各自的 token 数；岗位超过 max_job_tokens、整个提示词超过
+   max_prompt_tokens 时按行截断，保留开头（最近的经历、技能）和结尾（教育背景），中间省略
+
+token 数默认按 DeepSeek 文档给出的比例估算（1 个英文字符约 0.3 token，1 个中文字符约
+0.6 token）；安装了 tokenizers 并在设置中指定 tokenizer.json 时按实际分词计数。
+估算值随请求记录在用量统计中，与响应 usage 中的实际值对照（见 usage_stats.py）。
+"""
+import re
+import threading
+
+from analysis_prompt import DEFAULT_TEMPLATE
+from lazy_import import lazy_import, module_available
+
+# 可选：HuggingFace tokenizers，加载 DeepSeek 的 tokenizer.json 精确计数（指定了文件时才导入）
+TOKENIZERS_SUPPORT = module_available("tokenizers")
+tokenizers = lazy_import("tokenizers")
+
+# 每个字符约等于的 token 数（DeepSeek 文档给出的经验值）
+ASCII_TOKENS_PER_CHAR = 0.3
+CJK_TOKENS_PER_CHAR = 0.6
+# 每条消息的格式开销（角色标记等）
+TOKENS_PER_MESSAGE = 4
+
+DEFAULT_BUDGET_CONFIG = {
+    # 输入（系统角色 + 评分规则 + 岗位 + 简历）的 token 上限
+    "max_prompt_tokens": 24000,
+    # 岗位信息的 token 上限，超出部分截断
+    "max_job_tokens": 4000,
+    # 是否压缩空白、页码、页眉页脚等
+    "compact": True,
+    # tokenizer.json 路径（需安装 tokenizers），未指定时按字符估算
+    "tokenizer": None,
+}
+# 截断时保留在开头的比例，其余保留结尾
+TRUNCATE_HEAD_RATIO = 0.8
+# 无论岗位多长，简历至少保留的 token 数
+MIN_RESUME_TOKENS = 2000
+# 压缩规则的版本：规则变化会改变提示词，结果缓存键中包含该版本（见 PromptBudgeter.signature）
+COMPACTION_VERSION = 2
+# 出现多次时只保留第一次的行（页眉页脚）至少的长度；较短的行可能是“项目职责：”之类的小标题
+REPEATED_LINE_MIN_CHARS = 12
+
+_SPACES_RE = re.compile(r"[ \t　\xa0​]+")
+# 页码：只匹配页脚的固定格式“第 3 页”“第3页/共5页”“3 / 5”“Page 3 of 5”“- 3 -”；
+# 单独的数字（工作年限、表格中的分数）不当作页码
+_PAGE_NUMBER_RE = re.compile(
+    r"^(?:第\s*\d+\s*页(?:\s*[/,，]?\s*共\s*\d+\s*页)?|\d+\s*/\s*\d+|page\s*\d+(?:\s*of\s*\d+)?|-\s*\d+\s*-)$",
+    re.IGNORECASE
+)
+# 分隔线
+_RULE_RE = re.compile(r"^[-=_*·.~—─━|+#]{4,}$")
+
+
+class HeuristicTokenCounter:
+    """按字符类型估算 token 数，不依赖分词器"""
+    name = "heuristic"
+
+    def count(self, text):
+        if not text:
+            return 0
+        chars = len(text)
+        # UTF-8 中 ASCII 占 1 字节、中文占 3 字节：用字节数推算中文字符数，不逐字符遍历
+        wide_chars = (len(text.encode('utf-8')) - chars) // 2
+        return int(wide_chars * CJK_TOKENS_PER_CHAR + (chars - wide_chars) * ASCII_TOKENS_PER_CHAR + 0.5)
+
+
+class FileTokenCounter:
+    """用 tokenizer.json 实际分词计数（需安装 tokenizers）"""
+    def __init__(self, path):
+        if not TOKENIZERS_SUPPORT:
+            raise ImportError("未安装 tokenizers")
+        self.tokenizer = tokenizers.Tokenizer.from_file(path)
+        self.name = path
+
+    def count(self, text):
+        if not text:
+            return 0
+        return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def get_token_counter(tokenizer_path=None):
+    """指定了 tokenizer.json 且可用时按实际分词计数，否则按字符估算"""
+    if tokenizer_path:
+        try:
+            return FileTokenCounter(tokenizer_path)
+        except Exception as e:
+            print(f"加载分词器失败，改用估算: {str(e)}")
+    return HeuristicTokenCounter()
+
+
+def count_message_tokens(messages, counter=None):
+    """消息列表的输入 token 数"""
+    counter = counter or get_prompt_budgeter().counter
+    return sum(counter.count(message.get("content") or "") + TOKENS_PER_MESSAGE for message in messages)
+
+
+def compact_text(text):
+    """
+    压缩文本：合并空白和连续空行，去掉页码、分隔线，以及反复出现的页眉页脚
+
+    只删除不含信息的内容，结果是确定的（同一岗位压缩后逐字节一致，不影响提示词前缀缓存）。
+    """
+    lines = []
+    line_counts = {}
+    for raw_line in (text or "").splitlines():
+        line = _SPACES_RE.sub(" ", raw_line).strip()
+        if not line:
+            # 连续空行只保留一个
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if _PAGE_NUMBER_RE.match(line) or _RULE_RE.match(line):
+            continue
+        if len(line) >= REPEATED_LINE_MIN_CHARS:
+            line_counts[line] = line_counts.get(line, 0) + 1
+        lines.append(line)
+
+    compacted = []
+    seen = set()
+    for line in lines:
+        if line_counts.get(line, 0) > 2:
+            # 出现三次及以上的长行（页眉页脚、每页重复的联系方式）只保留第一次
+            if line in seen:
+                continue
+            seen.add(line)
+        if line == "" and (not compacted or compacted[-1] == ""):
+            continue
+        compacted.append(line)
+    return "\n".join(compacted).strip()
+
+
+def truncate_to_tokens(text, max_tokens, counter, head_ratio=TRUNCATE_HEAD_RATIO):
+    """
+    截断到 max_tokens 以内，返回 (文本, token 数)；未超出时原样返回同一个字符串
+
+    保留开头 head_ratio 和结尾的内容，在行边界处截断，中间插入省略说明。
+    """
+    tokens = counter.count(text)
+    if tokens <= max_tokens:
+        return text, tokens
+    keep_chars = int(len(text) * max_tokens / tokens)
+    for _ in range(8):
+        head_chars = int(keep_chars * head_ratio)
+        tail_chars = keep_chars - head_chars
+        head = text[:head_chars]
+        # 回退到行边界（不超过截取长度的五分之一）
+        newline = head.rfind("\n")
+        if newline > head_chars * 0.8:
+            head = head[:newline]
+        tail = text[len(text) - tail_chars:] if tail_chars > 0 else ""
+        newline = tail.find("\n")
+        if 0 <= newline < tail_chars * 0.2:
+            tail = tail[newline + 1:]
+        omitted = len(text) - len(head) - len(tail)
+        result = f"{head}\n……（内容过长，中间约 {omitted} 字已省略）……\n{tail}"
+        tokens = counter.count(result)
+        if tokens <= max_tokens:
+            return result, tokens
+        # 按超出的比例继续缩短
+        keep_chars = int(keep_chars * max_tokens / tokens * 0.98)
+    return result, tokens
+
+
+class PromptBudgeter:
+    """在本地统计提示词 token 数，并把岗位和简历控制在预算以内（线程安全）"""
+    def __init__(self, max_prompt_tokens=DEFAULT_BUDGET_CONFIG["max_prompt_tokens"],
+                 max_job_tokens=DEFAULT_BUDGET_CONFIG["max_job_tokens"], compact=True, tokenizer=None, counter=None):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_job_tokens = max_job_tokens
+        self.compact = compact
+        self.counter = counter or get_token_counter(tokenizer)
+        # 批量分析同一岗位时，岗位只压缩、计数一次
+        self._lock = threading.Lock()
+        self._job_cache = {}
+
+    @property
+    def signature(self):
+        """影响提示词内容的配置（压缩规则版本、预算、计数方式），作为结果缓存键的一部分"""
+        compaction = COMPACTION_VERSION if self.compact else 0
+        return (
+            f"compact={compaction};max_prompt={self.max_prompt_tokens};max_job={self.max_job_tokens};"
+            f"counter={self.counter.name}"
+        )
+
+    def _prepare(self, text):
+        text = text.strip()
+        return compact_text(text) if self.compact else text
+
+    def _fit_job(self, job_info):
+        with self._lock:
+            cached = self._job_cache.get(job_info)
+        if cached is not None:
+            return cached
+        original_tokens = self.counter.count(job_info)
+        prepared = self._prepare(job_info)
+        job_text, job_tokens = truncate_to_tokens(prepared, self.max_job_tokens, self.counter)
+        cached = (job_text, job_tokens, original_tokens, job_text is not prepared)
+        with self._lock:
+            if len(self._job_cache) >= 16:
+                self._job_cache.clear()
+            self._job_cache[job_info] = cached
+        return cached
+
+    def fit(self, job_info, resume_info, template=None):
+        """
+        构建在预算以内的消息，返回 (messages, report)
+
+        report 包含 prompt_tokens（预计输入 token 数）、rubric_tokens、job_tokens、resume_tokens、
+        original_tokens（未压缩时的输入 token 数）和 truncated（被截断的部分："job"/"resume"）
+        """
+        template = template or DEFAULT_TEMPLATE
+        rubric_tokens = count_message_tokens(template.build_messages("", ""), self.counter)
+        job_text, job_tokens, original_job_tokens, job_truncated = self._fit_job(job_info)
+        original_resume_tokens = self.counter.count(resume_info)
+        resume_budget = max(MIN_RESUME_TOKENS, self.max_prompt_tokens - rubric_tokens - job_tokens)
+        prepared = self._prepare(resume_info)
+        resume_text, resume_tokens = truncate_to_tokens(prepared, resume_budget, self.counter)
+
+        truncated = []
+        if job_truncated:
+            truncated.append("job")
+        if resume_text is not prepared:
+            truncated.append("resume")
+        messages = template.build_messages(job_text, resume_text)
+        report = {
+            "prompt_tokens": count_message_tokens(messages, self.counter),
+            "rubric_tokens": rubric_tokens,
+            "job_tokens": job_tokens,
+            "resume_tokens": resume_tokens,
+            "original_tokens": rubric_tokens + original_job_tokens + original_resume_tokens,
+            "truncated": truncated,
+        }
+        return messages, report
+
+
+def format_budget(report):
+    """用于界面和命令行的提示词预算说明"""
+    text = f"预计输入 {report['prompt_tokens']} tokens"
+    if report["original_tokens"] > report["prompt_tokens"]:
+        text += f"（压缩前 {report['original_tokens']}）"
+    if report["truncated"]:
+        names = {"job": "岗位", "resume": "简历"}
+        text += "，" + "、".join(names[part] for part in report["truncated"]) + "过长已截断"
+    return text
+
+
+_budgeter = None
+_budget_config = dict(DEFAULT_BUDGET_CONFIG)
+
+
+def configure_prompt_budget(**config):
+    """设置共享预算器的配置，需在第一次 get_prompt_budgeter() 之前调用"""
+    if _budgeter is not None:
+        raise RuntimeError("提示词预算器已创建，无法再修改配置")
+    _budget_config.update(config)
+
+
+def get_prompt_budgeter():
+    """获取进程内共享的提示词预算器"""
+    global _budgeter
+    if _budgeter is None:
+        _budgeter = PromptBudgeter(**_budget_config)
+    return _budgeter
@@ -0,0 +1,134 @@
+"""
+token 用量统计：按模型累计输入 / 输出 token 和 DeepSeek 上下文缓存命中情况
+
+DeepSeek 在响应的 usage 中返回 prompt_cache_hit_tokens / prompt_cache_miss_tokens，
+命中缓存的输入 token 计费更低。统计结果持久化为 JSON，用于观察提示词前缀缓存的效果。
+
+请求前在本地估算的输入 token 数（见 token_budget.py）与实际的 prompt_tokens 一起累计，
+用于检查估算是否准确。
+"""
+import os
+import json
+import threading
+
+# 累计的计数字段
+USAGE_FIELDS = (
+    "requests",
+    "prompt_tokens",
+    "completion_tokens",
+    "prompt_cache_hit_tokens",
+    "prompt_cache_miss_tokens",
+    # 带本地估算的请求：估算的输入 token 数，以及这些请求实际的输入 token 数
+    "estimated_prompt_tokens",
+    "measured_prompt_tokens",
+)
+
+
+def usage_to_dict(usage):
+    """把响应的 usage 对象转换为字典，缺失的字段为 0"""
+    if usage is None:
+        return None
+    result = {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", None) or 0,
+        "prompt_cache_hit_tokens": getattr(usage, "prompt_cache_hit_tokens", None),
+        "prompt_cache_miss_tokens": getattr(usage, "prompt_cache_miss_tokens", None),
+    }
+    if result["prompt_cache_hit_tokens"] is None:
+        # 兼容 OpenAI 格式的 prompt_tokens_details.cached_tokens
+        details = getattr(usage, "prompt_tokens_details", None)
+        result["prompt_cache_hit_tokens"] = getattr(details, "cached_tokens", None) or 0
+    if result["prompt_cache_miss_tokens"] is None:
+        result["prompt_cache_miss_tokens"] = max(0, result["prompt_tokens"] - result["prompt_cache_hit_tokens"])
+    return result
+
+
+def cache_hit_ratio(usage):
+    """输入 token 中命中缓存的比例"""
+    total = usage.get("prompt_cache_hit_tokens", 0) + usage.get("prompt_cache_miss_tokens", 0)
+    return usage.get("prompt_cache_hit_tokens", 0) / total if total else 0.0
+
+
+def estimate_error(usage):
+    """本地估算相对实际输入 token 数的偏差（+0.1 表示多估 10%），没有估算时返回 None"""
+    measured = usage.get("measured_prompt_tokens", 0)
+    if not measured:
+        return None
+    return usage.get("estimated_prompt_tokens", 0) / measured - 1.0
+
+
+def format_token_estimate(usage):
+    """用于界面和命令行的输入 token 估算说明"""
+    text = f"输入 {usage['prompt_tokens']} tokens"
+    error = estimate_error(usage)
+    if error is not None:
+        text += f"（预估 {usage['estimated_prompt_tokens']}，偏差 {error:+.0%}）"
+    return text
+
+
+def format_cache_usage(usage):
+    """用于界面和命令行的缓存命中说明"""
+    return (
+        f"提示词缓存命中 {usage['prompt_cache_hit_tokens']}/"
+        f"{usage['prompt_cache_hit_tokens'] + usage['prompt_cache_miss_tokens']} tokens"
+        f"（{cache_hit_ratio(usage):.0%}）"
+    )
+
+
+class UsageStats:
+    """按模型累计 token 用量（线程安全）"""
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stats = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._stats = json.load(f)
+            except Exception as e:
+                print(f"加载用量统计失败: {str(e)}")
+
+    def record(self, model, usage, estimated_prompt_tokens=None):
+        """
+        记录一次请求的用量，返回转换后的字典（usage 为空时返回 None）
+
+        estimated_prompt_tokens: 请求前本地估算的输入 token 数，与实际值一起记录
+        """
+        if usage is None:
+            return None
+        usage = dict(usage) if isinstance(usage, dict) else usage_to_dict(usage)
+        if estimated_prompt_tokens is not None:
+            usage["estimated_prompt_tokens"] = estimated_prompt_tokens
+            usage["measured_prompt_tokens"] = usage["prompt_tokens"]
+        with self._lock:
+            stats = self._stats.setdefault(model, dict.fromkeys(USAGE_FIELDS, 0))
+            stats["requests"] += 1
+            for field in USAGE_FIELDS[1:]:
+                # 旧版本保存的统计没有估算字段
+                stats[field] = stats.get(field, 0) + usage.get(field, 0)
+            self._save()
+        return usage
+
+    def summary(self, model=None):
+        """累计用量（不指定模型时为所有模型之和），附带缓存命中率"""
+        with self._lock:
+            models = [model] if model else list(self._stats)
+            totals = dict.fromkeys(USAGE_FIELDS, 0)
+            for name in models:
+                for field, value in self._stats.get(name, {}).items():
+                    totals[field] = totals.get(field, 0) + value
+        totals["cache_hit_ratio"] = round(cache_hit_ratio(totals), 4)
+        error = estimate_error(totals)
+        totals["estimate_error"] = None if error is None else round(error, 4)
+        return totals
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._stats, f, ensure_ascii=False, indent=4)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"保存用量统计失败: {str(e)}")